@@ -0,0 +1,108 @@
+"""
+Build time, memory and query latency of the alternatives index.
+
+Generates --products synthetic products spread over --categories category
+trees (three levels, like OFF's categories_tags), loads them into an
+AlternativesIndex and times --queries top-k lookups. Each query result is
+checked against a brute-force scan of the same category.
+
+Usage (from backend/):
+    python benchmarks/alternatives_benchmark.py
+    python benchmarks/alternatives_benchmark.py --products 500000 --k 10
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import numpy as np
+from services.alternatives_index import AlternativesIndex, nutrient_vectors
+
+
+def synthetic_products(count: int, categories: int, seed: int = 1) -> list[dict]:
+    rng = random.Random(seed)
+    products = []
+    for index in range(count):
+        tree = rng.randrange(categories)
+        products.append({
+            "barcode": f"{index:013d}",
+            "categories": ["en:foods", f"en:group-{tree % 20}", f"en:category-{tree}"],
+            "skin_score": rng.randrange(0, 101),
+            "nova_group": rng.choice([1, 2, 3, 4, None]),
+            "kcalories_100g": rng.uniform(0, 550),
+            "protein_100g": rng.uniform(0, 30),
+            "carbs_100g": rng.uniform(0, 80),
+            "sugar_100g": rng.uniform(0, 60),
+            "fiber_100g": rng.uniform(0, 12),
+            "fat_100g": rng.uniform(0, 40),
+            "saturated_fat_100g": rng.uniform(0, 15),
+            "sodium_100g": rng.uniform(0, 1.5),
+        })
+    return products
+
+
+def brute_force(products: list[dict], query: dict, k: int) -> list[str]:
+    """Nearest better products within the query's most specific category."""
+    nova = lambda product: 5 if product["nova_group"] is None else product["nova_group"]
+    candidates = [
+        product for product in products
+        if product["categories"][-1] == query["categories"][-1]
+        and (
+            (product["skin_score"] > query["skin_score"] and nova(product) <= nova(query))
+            or (nova(product) < nova(query) and product["skin_score"] >= query["skin_score"])
+        )
+    ]
+    if not candidates:
+        return []
+    distances = np.square(nutrient_vectors(candidates) - nutrient_vectors([query])[0]).sum(axis=1)
+    return [candidates[index]["barcode"] for index in np.argsort(distances, kind="stable")[:k]]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the alternatives index")
+    parser.add_argument("--products", type=int, default=200_000)
+    parser.add_argument("--categories", type=int, default=400)
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--verify", type=int, default=50, help="Queries to check against brute force")
+    args = parser.parse_args()
+
+    products = synthetic_products(args.products, args.categories)
+    index = AlternativesIndex()
+    started = time.perf_counter()
+    for start in range(0, len(products), 10_000):
+        index.add_many(products[start:start + 10_000])
+    build_seconds = time.perf_counter() - started
+    # Loaded like build() does, minus the database
+    index.ready = True
+    stats = index.stats()
+    print(
+        f"built {stats['products']} products in {stats['categories']} categories: "
+        f"{build_seconds:.2f}s, {stats['bytes'] / 1e6:.1f} MB of arrays"
+    )
+
+    rng = random.Random(2)
+    queries = [rng.choice(products) for _ in range(args.queries)]
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        index.query(query, k=args.k)
+        latencies.append((time.perf_counter() - started) * 1000)
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"query k={args.k}: p50={quantiles[49]:.3f}ms p99={quantiles[98]:.3f}ms")
+
+    mismatches = 0
+    for query in queries[:args.verify]:
+        expected = brute_force(products, query, args.k)
+        got = [alternative.barcode for alternative in index.query(query, k=args.k)][:len(expected)]
+        if len(expected) == args.k and got != expected:
+            mismatches += 1
+    print(f"verified {min(args.verify, len(queries))} queries against brute force: {mismatches} mismatches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Cold-start profile of the app: import time and time to first response.
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter and
+reports the slowest top-level packages, then starts --runs fresh processes
+that import the app, run the lifespan startup and serve GET / over ASGI,
+and reports the median time to first response.
+
+It also works as a check: it exits non-zero when a module that should only
+load on first use (firebase_admin, the Google auth stack, asyncpg, numpy) is
+imported at startup, or when import time exceeds --budget-ms.
+
+Usage (from backend/):
+    python benchmarks/cold_start_check.py
+    python benchmarks/cold_start_check.py --runs 10 --budget-ms 1500
+    python benchmarks/cold_start_check.py --no-fast-startup
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# Modules that must not be imported just by loading the app
+DEFERRED_MODULES = ("firebase_admin", "google.auth", "google.cloud", "asyncpg", "numpy")
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+FIRST_RESPONSE = """
+import asyncio, json, time
+started = time.perf_counter()
+from main import app
+imported = time.perf_counter()
+
+async def first_response():
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/", "raw_path": b"/",
+        "root_path": "", "query_string": b"", "headers": [],
+        "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80),
+    }
+    async with app.router.lifespan_context(app):
+        await app(scope, receive, send)
+        responded = time.perf_counter()
+    return messages[0]["status"], responded
+
+status, responded = asyncio.run(first_response())
+print(json.dumps({
+    "status": status,
+    "import_ms": (imported - started) * 1000,
+    "first_response_ms": (responded - started) * 1000,
+}))
+"""
+
+
+def profile_imports(env: dict) -> list:
+    """(cumulative microseconds, module) for every import made by `import main`."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=SRC_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    modules = []
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            modules.append((int(match.group(2)), match.group(4)))
+    return modules
+
+
+def first_response(env: dict) -> dict:
+    completed = subprocess.run(
+        [sys.executable, "-c", FIRST_RESPONSE],
+        cwd=SRC_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Profile and check app cold starts")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12, help="Packages to list in the import profile")
+    parser.add_argument("--budget-ms", type=float, default=0, help="Fail above this import time; 0 disables")
+    parser.add_argument("--no-fast-startup", action="store_true", help="Profile with eager warm-up instead")
+    args = parser.parse_args()
+
+    env = dict(os.environ, FAST_STARTUP="false" if args.no_fast_startup else "true")
+
+    modules = profile_imports(env)
+    by_package = defaultdict(int)
+    for cumulative, name in modules:
+        # Only count top-level imports of each package once
+        package = name.split(".")[0]
+        if package == "main":
+            continue
+        by_package[package] = max(by_package[package], cumulative)
+    total_ms = next(cumulative for cumulative, name in reversed(modules) if name == "main") / 1000
+
+    print(f"import main: {total_ms:.0f}ms, {len(modules)} modules")
+    for package, cumulative in sorted(by_package.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {cumulative / 1000:8.1f}ms  {package}")
+
+    runs = [first_response(env) for _ in range(args.runs)]
+    print(
+        f"first response (median of {args.runs}): "
+        f"import {statistics.median(run['import_ms'] for run in runs):.0f}ms, "
+        f"first response {statistics.median(run['first_response_ms'] for run in runs):.0f}ms"
+    )
+
+    failures = []
+    imported = {name for _, name in modules}
+    for module in DEFERRED_MODULES:
+        if module in imported:
+            failures.append(f"{module} is imported at startup")
+    if args.budget_ms and total_ms > args.budget_ms:
+        failures.append(f"import time {total_ms:.0f}ms is over the {args.budget_ms:.0f}ms budget")
+    if any(run["status"] != 200 for run in runs):
+        failures.append("GET / did not return 200")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Peak memory of the food log export.
+
+Pushes a synthetic food log of --rows rows through the export serializers
+and reports the peak RSS of the process. "streamed" feeds rows partition by
+partition like ExportService does; "materialized" builds every row and the
+whole body in memory first, which is what a list-based endpoint would do.
+Each run happens in its own subprocess, so the peaks don't mix. With
+--user-id the streamed run reads that user's log from the configured
+database instead of generating rows.
+
+Usage (from backend/):
+    python benchmarks/export_benchmark.py --rows 200000
+    python benchmarks/export_benchmark.py --rows 200000 --format csv --gzip
+    python benchmarks/export_benchmark.py --user-id <firebase uid>
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+
+def synthetic_row(index: int) -> tuple:
+    day = date(2020, 1, 1) + timedelta(days=index // 6)
+    return (
+        index, day, "Europe/Berlin", "lunch", f"4000000{index % 5000:06d}",
+        f"Test product {index % 5000}", "Acme", None, Decimal("1.5"),
+        Decimal("375.75"), Decimal("12.30"), Decimal("40.10"), Decimal("9.00"),
+        Decimal("3.20"), Decimal("15.75"), 62, None,
+        datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc),
+    )
+
+
+async def synthetic_partitions(rows: int, batch_size: int):
+    for start in range(0, rows, batch_size):
+        yield [synthetic_row(index) for index in range(start, min(start + batch_size, rows))]
+
+
+async def run(mode: str, rows: int, export_format: str, compress: bool, batch_size: int, user_id: str) -> dict:
+    from services.export_service import EXPORT_FORMATS, ExportService, gzip_chunks
+
+    serialize = EXPORT_FORMATS[export_format][0]
+    started = time.perf_counter()
+    total_bytes = 0
+
+    if mode == "materialized":
+        all_rows = [synthetic_row(index) for index in range(rows)]
+
+        async def one_partition():
+            yield all_rows
+
+        chunks = serialize(one_partition())
+        body = b"".join([chunk async for chunk in (gzip_chunks(chunks) if compress else chunks)])
+        total_bytes = len(body)
+    else:
+        if user_id:
+            from db.db import AsyncSessionLocal
+            async with AsyncSessionLocal() as session:
+                async for chunk in ExportService(session).export(user_id, export_format, compress):
+                    total_bytes += len(chunk)
+        else:
+            chunks = serialize(synthetic_partitions(rows, batch_size))
+            async for chunk in (gzip_chunks(chunks) if compress else chunks):
+                total_bytes += len(chunk)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "mode": mode,
+        "seconds": elapsed,
+        "bytes": total_bytes,
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure peak RSS of the food log export")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--user-id", default="", help="Stream this user's log from the database")
+    parser.add_argument("--worker", choices=["streamed", "materialized"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = asyncio.run(run(args.worker, args.rows, args.format, args.gzip, args.batch_size, args.user_id))
+        print(json.dumps(result))
+        return
+
+    modes = ["streamed"] if args.user_id else ["streamed", "materialized"]
+    for mode in modes:
+        command = [
+            sys.executable, os.path.abspath(__file__), "--worker", mode,
+            "--rows", str(args.rows), "--format", args.format,
+            "--batch-size", str(args.batch_size), "--user-id", args.user_id,
+        ]
+        if args.gzip:
+            command.append("--gzip")
+        result = json.loads(subprocess.run(command, check=True, capture_output=True, text=True).stdout)
+        rows_per_second = args.rows / result["seconds"] if not args.user_id else 0
+        print(
+            f"{mode:>12}: peak RSS {result['peak_rss_mb']:7.1f} MB  "
+            f"{result['bytes'] / 1e6:8.1f} MB out  {result['seconds']:6.2f}s"
+            + (f"  {rows_per_second:,.0f} rows/sec" if rows_per_second else "")
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Local stand-in for the Open Food Facts product API.
+
+Serves recorded payloads (see normalize_benchmark.py --record) or generated
+ones, with configurable latency, slow tail and error rate, so the OFF client
+and the app can be exercised without touching the real service.
+
+Usage (from backend/):
+    python benchmarks/fake_off_server.py --port 8081 --latency-ms 40 --error-rate 0.05
+    OPEN_FOOD_FACTS_API_URL=http://127.0.0.1:8081/api/v2 uvicorn main:app --app-dir src
+
+Barcodes starting with "missing" always return 404 / status 0. Tests can
+script exact responses through FakeOFFState.script.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+
+class FakeOFFState:
+    def __init__(
+        self,
+        corpus_dir: Optional[str] = None,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_ms: float = 0.0,
+        error_rate: float = 0.0,
+        missing_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.corpus_dir = corpus_dir
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.error_rate = error_rate
+        self.missing_rate = missing_rate
+        self.random = random.Random(seed)
+        # (status code, extra delay in ms) for the next requests, ahead of
+        # the random latency and error rates; 200 serves the payload
+        self.script: Deque[Tuple[int, float]] = deque()
+        self.stats = {"requests": 0, "errors": 0, "missing": 0, "slow": 0}
+
+    def load_payload(self, barcode: str) -> bytes:
+        if self.corpus_dir:
+            for kind in ("trimmed", "full"):
+                path = os.path.join(self.corpus_dir, f"{barcode}.{kind}.json")
+                if os.path.exists(path):
+                    with open(path, "rb") as f:
+                        return f.read()
+        return json.dumps({"status": 1, "code": barcode, "product": synthetic_product(barcode)}).encode()
+
+
+def synthetic_product(barcode: str) -> dict:
+    rng = random.Random(barcode)
+    return {
+        "code": barcode,
+        "product_name": f"Test product {barcode}",
+        "brands": rng.choice(["Acme", "Nature Valley", "Danone", "Clif"]),
+        "categories_tags": rng.sample(["en:snacks", "en:beverages", "en:sodas", "en:cereals", "en:dairies"], 2),
+        "nutriments": {
+            "energy-kcal_100g": round(rng.uniform(0, 550), 1),
+            "proteins_100g": round(rng.uniform(0, 30), 1),
+            "carbohydrates_100g": round(rng.uniform(0, 80), 1),
+            "sugars_100g": round(rng.uniform(0, 60), 1),
+            "fiber_100g": round(rng.uniform(0, 12), 1),
+            "fat_100g": round(rng.uniform(0, 40), 1),
+            "saturated-fat_100g": round(rng.uniform(0, 15), 1),
+            "sodium_100g": round(rng.uniform(0, 1.5), 2),
+        },
+        "ingredients": [
+            {"id": f"en:{name.replace(' ', '-')}", "text": name}
+            for name in rng.sample(["sugar", "oats", "whey", "palm oil", "salt", "glucose syrup", "chia seeds"], 4)
+        ],
+        "nova_group": rng.choice([1, 2, 3, 4]),
+        "allergens_tags": [],
+        "labels_tags": [],
+    }
+
+
+def create_app(state: FakeOFFState) -> Starlette:
+    async def product(request: Request) -> Response:
+        state.stats["requests"] += 1
+        barcode = request.path_params["barcode"]
+
+        if state.script:
+            status_code, delay = state.script.popleft()
+            if delay:
+                await asyncio.sleep(delay / 1000)
+            if status_code == 200:
+                return Response(state.load_payload(barcode), media_type="application/json")
+            return JSONResponse({"status": 0, "code": barcode}, status_code=status_code)
+
+        delay = state.latency_ms + state.random.uniform(0, state.jitter_ms)
+        if state.random.random() < state.slow_rate:
+            state.stats["slow"] += 1
+            delay += state.slow_ms
+        if delay:
+            await asyncio.sleep(delay / 1000)
+
+        if state.random.random() < state.error_rate:
+            state.stats["errors"] += 1
+            return JSONResponse({"error": "injected failure"}, status_code=503)
+        if barcode.startswith("missing") or state.random.random() < state.missing_rate:
+            state.stats["missing"] += 1
+            return JSONResponse({"status": 0, "code": barcode, "status_verbose": "product not found"}, status_code=404)
+        return Response(state.load_payload(barcode), media_type="application/json")
+
+    async def stats(request: Request) -> Response:
+        return JSONResponse(state.stats)
+
+    return Starlette(routes=[
+        Route("/product/{barcode}.json", product),
+        Route("/api/v2/product/{barcode}.json", product),
+        Route("/__stats", stats),
+    ])
+
+
+class BackgroundServer:
+    """Runs the fake server on a background thread, e.g. inside a benchmark."""
+
+    def __init__(self, state: FakeOFFState, host: str = "127.0.0.1", port: int = 8081):
+        self.state = state
+        self.url = f"http://{host}:{port}/api/v2"
+        config = uvicorn.Config(create_app(state), host=host, port=port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self) -> "BackgroundServer":
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.should_exit = True
+        self.thread.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake Open Food Facts server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--corpus", help="Directory of recorded payloads")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Fraction of requests that get --slow-ms extra")
+    parser.add_argument("--slow-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--missing-rate", type=float, default=0.0, help="Fraction of requests answered with 404")
+    args = parser.parse_args()
+
+    state = FakeOFFState(
+        corpus_dir=args.corpus,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        slow_rate=args.slow_rate,
+        slow_ms=args.slow_ms,
+        error_rate=args.error_rate,
+        missing_rate=args.missing_rate,
+    )
+    uvicorn.run(create_app(state), host=args.host, port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
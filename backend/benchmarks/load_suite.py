@@ -0,0 +1,469 @@
+"""
+End-to-end load test of the API with realistic request mixes.
+
+Runs the FastAPI app in-process and drives it over ASGI with --concurrency
+virtual users for --seconds, each signed in as its own seeded user.
+Everything except Postgres is local: Open Food Facts is the fake server
+from fake_off_server.py (with configurable latency and error rate), and ID
+tokens are signed with a throwaway RSA key that the app's
+FirebaseTokenVerifier is pointed at through fetch_certs.
+
+Postgres is seeded first with "load-" users, products and a few weeks of
+food entries; seeding is idempotent and --cleanup removes them again.
+
+Reports throughput and p50/p95/p99 for every operation in the mix.
+--save-baseline writes the results to a JSON file, --baseline compares a
+run against one and exits non-zero when an operation's p95 or the overall
+throughput regressed by more than --tolerance.
+
+Usage (from backend/):
+    python benchmarks/load_suite.py --mix mixed --seconds 30 --concurrency 32
+    python benchmarks/load_suite.py --mix scan --off-latency-ms 80 --off-error-rate 0.02
+    python benchmarks/load_suite.py --mix logging --save-baseline benchmarks/load_baseline.json
+    python benchmarks/load_suite.py --mix logging --baseline benchmarks/load_baseline.json
+    python benchmarks/load_suite.py --cleanup
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import httpx
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+
+from fake_off_server import BackgroundServer, FakeOFFState, synthetic_product
+
+PROJECT_ID = "skineats-load"
+USER_PREFIX = "load-user-"
+BARCODE_PREFIX = "load-"
+SEARCH_TERMS = ["test product", "acme", "danone", "clif", "nature valley", "product 12", "valley"]
+
+
+class LocalTokenSigner:
+    """Signs Firebase-shaped ID tokens with a throwaway RSA key."""
+
+    KID = "load-suite"
+
+    def __init__(self, project_id: str = PROJECT_ID):
+        self.project_id = project_id
+        self._key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self._public_pem = self._key.public_key().public_bytes(
+            Encoding.PEM, PublicFormat.SubjectPublicKeyInfo
+        ).decode()
+
+    async def fetch_certs(self) -> Tuple[Dict[str, str], float]:
+        """Drop-in for fetch_google_certs."""
+        return {self.KID: self._public_pem}, 3600.0
+
+    def token(self, uid: str) -> str:
+        now = int(time.time())
+        claims = {
+            "iss": f"https://securetoken.google.com/{self.project_id}",
+            "aud": self.project_id,
+            "sub": uid,
+            "iat": now,
+            "auth_time": now,
+            "exp": now + 3600,
+            "email": f"{uid}@load.test",
+            "name": uid,
+        }
+        return jwt.encode(claims, self._key, algorithm="RS256", headers={"kid": self.KID})
+
+
+def seeded_barcode(index: int) -> str:
+    return f"{BARCODE_PREFIX}{index:07d}"
+
+
+async def seed(users: int, products: int, days: int, entries_per_day: int) -> None:
+    """Insert the load users, products and food log unless they exist already."""
+    from sqlalchemy import func, select
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+    from db.db import AsyncSessionLocal
+    from models.food_entry import FoodEntry
+    from models.product import Product
+    from routers.auth_router import build_sync_user_statement
+    from services.clients.off_normalizer import normalize_product
+    from services.food_entry_service import FoodEntryService, product_nutrition
+    from services.skin_score_engine import skin_score_engine
+
+    started = time.perf_counter()
+    rows = []
+    for index in range(products):
+        row = normalize_product(synthetic_product(seeded_barcode(index)))
+        row["created_at"] = row["updated_at"] = datetime.now(timezone.utc)
+        rows.append(row)
+    for row, (score, breakdown) in zip(rows, skin_score_engine.score_batch(rows)):
+        row["skin_score"] = score
+        row["skin_score_breakdown"] = breakdown
+
+    async with AsyncSessionLocal() as session:
+        for start in range(0, len(rows), 1000):
+            await session.execute(
+                pg_insert(Product)
+                .values(rows[start:start + 1000])
+                .on_conflict_do_nothing(index_elements=[Product.barcode])
+            )
+        for index in range(users):
+            uid = f"{USER_PREFIX}{index}"
+            await session.execute(build_sync_user_statement(uid, f"{uid}@load.test", uid))
+        await session.commit()
+
+        existing = await session.scalar(
+            select(func.count()).select_from(FoodEntry).where(FoodEntry.user_id.like(f"{USER_PREFIX}%"))
+        )
+        if not existing:
+            rng = random.Random(1)
+            today = date.today()
+            sample = [Product(**row) for row in rows[:min(products, 500)]]
+            for index in range(users):
+                entries = []
+                for day in range(days):
+                    for _ in range(entries_per_day):
+                        product = rng.choice(sample)
+                        servings = Decimal(rng.choice(["0.5", "1.0", "1.5", "2.0"]))
+                        entries.append({
+                            "user_id": f"{USER_PREFIX}{index}",
+                            "barcode": product.barcode,
+                            "entry_date": today - timedelta(days=day),
+                            "timezone": "UTC",
+                            "meal_type": rng.choice(["breakfast", "lunch", "dinner", "snack"]),
+                            "servings": servings,
+                            **product_nutrition(product, servings),
+                        })
+                if entries:
+                    await session.execute(pg_insert(FoodEntry).values(entries))
+            await session.commit()
+            service = FoodEntryService(session)
+            for index in range(users):
+                await service.rebuild_rollups(f"{USER_PREFIX}{index}")
+
+    print(
+        f"seeded {users} users, {products} products, {days * entries_per_day} entries per user "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+
+async def cleanup() -> None:
+    from sqlalchemy import text
+    from db.db import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as session:
+        for table, column, prefix in (
+            ("food_entries", "user_id", USER_PREFIX),
+            ("daily_nutrition_rollups", "user_id", USER_PREFIX),
+            ("user_favorites", "user_id", USER_PREFIX),
+            ("sync_tombstones", "user_id", USER_PREFIX),
+            ("users", "id", USER_PREFIX),
+            ("products", "barcode", BARCODE_PREFIX),
+        ):
+            result = await session.execute(
+                text(f"DELETE FROM {table} WHERE {column} LIKE :prefix"), {"prefix": f"{prefix}%"}
+            )
+            print(f"{table}: deleted {result.rowcount} rows")
+        await session.commit()
+
+
+@dataclass
+class VirtualUser:
+    uid: str
+    headers: Dict[str, str]
+    rng: random.Random
+    products: int
+
+
+def hot_barcode(user: VirtualUser) -> str:
+    # Scans are heavily skewed towards popular products
+    return seeded_barcode(int(user.rng.paretovariate(1.2) - 1) % user.products)
+
+
+_cold_counter = itertools.count()
+
+
+async def scan_hot(client: httpx.AsyncClient, user: VirtualUser) -> int:
+    return (await client.get(f"/products/{hot_barcode(user)}", headers=user.headers)).status_code
+
+
+async def scan_cold(client: httpx.AsyncClient, user: VirtualUser) -> int:
+    # Never seen before, so it goes through to the fake OFF server
+    barcode = f"{BARCODE_PREFIX}off-{os.getpid()}-{next(_cold_counter)}"
+    return (await client.get(f"/products/{barcode}", headers=user.headers)).status_code
+
+
+async def scan_missing(client: httpx.AsyncClient, user: VirtualUser) -> int:
+    barcode = f"missing-{user.rng.randrange(1_000)}"
+    return (await client.get(f"/products/{barcode}", headers=user.headers)).status_code
+
+
+async def alternatives(client: httpx.AsyncClient, user: VirtualUser) -> int:
+    return (await client.get(f"/products/{hot_barcode(user)}/alternatives", headers=user.headers)).status_code
+
+
+async def search(client: httpx.AsyncClient, user: VirtualUser) -> int:
+    params = {"q": user.rng.choice(SEARCH_TERMS), "limit": 20}
+    return (await client.get("/products/search", params=params, headers=user.headers)).status_code
+
+
+async def auth_sync(client: httpx.AsyncClient, user: VirtualUser) -> int:
+    return (await client.post("/auth/sync", headers=user.headers)).status_code
+
+
+async def log_entry(client: httpx.AsyncClient, user: VirtualUser) -> int:
+    body = {
+        "barcode": hot_barcode(user),
+        "servings": user.rng.choice(["0.5", "1.0", "2.0"]),
+        "meal_type": user.rng.choice(["breakfast", "lunch", "dinner", "snack"]),
+    }
+    return (await client.post("/food-entries", json=body, headers=user.headers)).status_code
+
+
+async def log_meal(client: httpx.AsyncClient, user: VirtualUser) -> int:
+    items = [{"barcode": hot_barcode(user), "meal_type": "dinner"} for _ in range(user.rng.randint(2, 6))]
+    return (await client.post("/food-entries/batch", json={"items": items}, headers=user.headers)).status_code
+
+
+async def list_day(client: httpx.AsyncClient, user: VirtualUser) -> int:
+    day = date.today() - timedelta(days=user.rng.randrange(7))
+    params = {"entry_date": day.isoformat()}
+    return (await client.get("/food-entries", params=params, headers=user.headers)).status_code
+
+
+async def daily_totals(client: httpx.AsyncClient, user: VirtualUser) -> int:
+    end = date.today()
+    params = {"start": (end - timedelta(days=29)).isoformat(), "end": end.isoformat()}
+    return (await client.get("/food-entries/daily", params=params, headers=user.headers)).status_code
+
+
+@dataclass(frozen=True)
+class Operation:
+    name: str
+    run: Callable[[httpx.AsyncClient, VirtualUser], Awaitable[int]]
+    expected: Tuple[int, ...] = (200,)
+
+
+OPERATIONS = {
+    "scan_hot": Operation("GET /products/{barcode} (seeded)", scan_hot),
+    "scan_cold": Operation("GET /products/{barcode} (via OFF)", scan_cold),
+    "scan_missing": Operation("GET /products/{barcode} (missing)", scan_missing, (404,)),
+    "alternatives": Operation("GET /products/{barcode}/alternatives", alternatives),
+    "search": Operation("GET /products/search", search),
+    "auth_sync": Operation("POST /auth/sync", auth_sync),
+    "log_entry": Operation("POST /food-entries", log_entry, (201,)),
+    "log_meal": Operation("POST /food-entries/batch", log_meal, (201,)),
+    "list_day": Operation("GET /food-entries", list_day),
+    "daily_totals": Operation("GET /food-entries/daily", daily_totals),
+}
+
+# Relative weights of each operation, roughly what the app sends
+MIXES = {
+    "scan": {"scan_hot": 80, "scan_cold": 12, "scan_missing": 3, "alternatives": 5},
+    "search": {"search": 100},
+    "auth_sync": {"auth_sync": 100},
+    "logging": {"log_entry": 40, "log_meal": 15, "list_day": 20, "daily_totals": 25},
+    "mixed": {
+        "scan_hot": 40, "scan_cold": 5, "scan_missing": 2, "search": 15, "auth_sync": 8,
+        "log_entry": 12, "log_meal": 3, "list_day": 5, "daily_totals": 10,
+    },
+}
+
+
+@dataclass
+class OperationStats:
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+
+    def summary(self, seconds: float) -> Dict[str, float]:
+        latencies = self.latencies
+        if len(latencies) > 1:
+            quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+            p50, p95, p99 = quantiles[49], quantiles[94], quantiles[98]
+        else:
+            p50 = p95 = p99 = latencies[0] if latencies else 0.0
+        return {
+            "requests": len(latencies),
+            "errors": self.errors,
+            "rps": len(latencies) / seconds,
+            "p50_ms": p50,
+            "p95_ms": p95,
+            "p99_ms": p99,
+        }
+
+
+async def drive(args) -> Dict:
+    """Seed, start the app and run the mix; returns the results as a dict."""
+    if not args.skip_seed:
+        await seed(args.users, args.products, args.days, args.entries_per_day)
+
+    import auth.auth
+    from auth.token_verifier import FirebaseTokenVerifier
+    from main import app
+    from services.alternatives_index import alternatives_index
+
+    signer = LocalTokenSigner()
+
+    # Verify against the local key instead of Google's certs
+    auth.auth.token_verifier = FirebaseTokenVerifier(project_id=PROJECT_ID, fetch_certs=signer.fetch_certs)
+
+    mix = MIXES[args.mix]
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    stats = {name: OperationStats() for name in names}
+    measuring = False
+
+    async def virtual_user(index: int, client: httpx.AsyncClient, deadline: float) -> None:
+        uid = f"{USER_PREFIX}{index % args.users}"
+        user = VirtualUser(
+            uid=uid,
+            headers={"Authorization": f"Bearer {signer.token(uid)}"},
+            rng=random.Random(index),
+            products=args.products,
+        )
+        while time.perf_counter() < deadline:
+            name = user.rng.choices(names, weights)[0]
+            operation = OPERATIONS[name]
+            started = time.perf_counter()
+            try:
+                status = await operation.run(client, user)
+            except Exception:
+                status = 0
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if measuring:
+                stats[name].latencies.append(elapsed_ms)
+                if status not in operation.expected:
+                    stats[name].errors += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        # Fast startup skips the index build; have it ready like a worker would
+        if "alternatives" in mix and alternatives_index.enabled:
+            await alternatives_index.build()
+        async with httpx.AsyncClient(transport=transport, base_url="http://load.test", timeout=60.0) as client:
+            if args.warmup:
+                deadline = time.perf_counter() + args.warmup
+                await asyncio.gather(*(virtual_user(i, client, deadline) for i in range(args.concurrency)))
+            measuring = True
+            started = time.perf_counter()
+            deadline = started + args.seconds
+            await asyncio.gather(*(virtual_user(i, client, deadline) for i in range(args.concurrency)))
+            seconds = time.perf_counter() - started
+
+    operations = {OPERATIONS[name].name: stats[name].summary(seconds) for name in names}
+    total = sum(operation["requests"] for operation in operations.values())
+    return {
+        "mix": args.mix,
+        "concurrency": args.concurrency,
+        "seconds": seconds,
+        "throughput": total / seconds,
+        "operations": operations,
+    }
+
+
+def print_report(results: Dict) -> None:
+    print(
+        f"mix={results['mix']} concurrency={results['concurrency']} "
+        f"throughput={results['throughput']:.0f} req/s over {results['seconds']:.1f}s"
+    )
+    print(f"{'operation':<38} {'requests':>8} {'errors':>6} {'req/s':>7} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for name, operation in results["operations"].items():
+        print(
+            f"{name:<38} {operation['requests']:>8} {operation['errors']:>6} {operation['rps']:>7.0f} "
+            f"{operation['p50_ms']:>6.1f}ms {operation['p95_ms']:>6.1f}ms {operation['p99_ms']:>6.1f}ms"
+        )
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Regressions of this run against a stored baseline, as printable lines."""
+    if (results["mix"], results["concurrency"]) != (baseline["mix"], baseline["concurrency"]):
+        print(
+            f"warning: baseline was recorded with mix={baseline['mix']} "
+            f"concurrency={baseline['concurrency']}"
+        )
+    regressions = []
+    if results["throughput"] < baseline["throughput"] * (1 - tolerance):
+        regressions.append(
+            f"throughput {results['throughput']:.0f} req/s, baseline {baseline['throughput']:.0f} req/s"
+        )
+    for name, operation in results["operations"].items():
+        before = baseline["operations"].get(name)
+        if before is None or not before["requests"]:
+            continue
+        change = operation["p95_ms"] / before["p95_ms"] - 1 if before["p95_ms"] else 0.0
+        marker = "REGRESSION" if change > tolerance else ""
+        print(f"  {name:<38} p95 {before['p95_ms']:>7.1f}ms -> {operation['p95_ms']:>7.1f}ms ({change:+.0%}) {marker}")
+        if marker:
+            regressions.append(f"{name}: p95 {operation['p95_ms']:.1f}ms, baseline {before['p95_ms']:.1f}ms")
+        error_rate = operation["errors"] / operation["requests"] if operation["requests"] else 0.0
+        before_error_rate = before["errors"] / before["requests"]
+        if error_rate > before_error_rate + 0.01:
+            regressions.append(f"{name}: error rate {error_rate:.1%}, baseline {before_error_rate:.1%}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the API with realistic request mixes")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="mixed")
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=5.0, help="Seconds of load before measuring")
+    parser.add_argument("--concurrency", type=int, default=32, help="Virtual users sending requests")
+    parser.add_argument("--users", type=int, default=200, help="Seeded users the virtual users sign in as")
+    parser.add_argument("--products", type=int, default=20_000, help="Seeded products")
+    parser.add_argument("--days", type=int, default=30, help="Days of seeded food log per user")
+    parser.add_argument("--entries-per-day", type=int, default=4)
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--cleanup", action="store_true", help="Delete the seeded rows and exit")
+    parser.add_argument("--off-port", type=int, default=8081)
+    parser.add_argument("--off-latency-ms", type=float, default=40.0)
+    parser.add_argument("--off-jitter-ms", type=float, default=20.0)
+    parser.add_argument("--off-error-rate", type=float, default=0.0)
+    parser.add_argument("--baseline", help="Compare against this results file")
+    parser.add_argument("--save-baseline", help="Write the results to this file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95/throughput change, e.g. 0.2 = 20%%")
+    args = parser.parse_args()
+
+    off_state = FakeOFFState(
+        latency_ms=args.off_latency_ms,
+        jitter_ms=args.off_jitter_ms,
+        error_rate=args.off_error_rate,
+        seed=1,
+    )
+    with BackgroundServer(off_state, port=args.off_port) as off_server:
+        # Settings are read when the app is imported, so this has to happen first
+        os.environ["OPEN_FOOD_FACTS_API_URL"] = off_server.url
+        os.environ.setdefault("FAST_STARTUP", "true")
+        for name in ("FIREBASE_PROJECT_ID", "FIREBASE_CLIENT_EMAIL", "FIREBASE_PRIVATE_KEY"):
+            os.environ.setdefault(name, "")
+
+        if args.cleanup:
+            asyncio.run(cleanup())
+            return
+        results = asyncio.run(drive(args))
+        print_report(results)
+        print(f"fake OFF: {off_state.stats}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"baseline written to {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Micro-benchmark for parsing and normalizing Open Food Facts payloads.
+
+Runs every recorded payload in a corpus directory through two paths:
+  * full:    the whole document parsed with the stdlib json module
+  * trimmed: only the fields normalize_product reads, parsed with orjson
+and reports payload size and per-payload time for each. A small corpus in
+benchmarks/off_corpus is used by default so the benchmark runs offline; its
+payloads were written by hand in the v2 API's shape, not recorded. Record
+real ones from the live API with --record.
+
+Usage (from backend/):
+    python benchmarks/normalize_benchmark.py --rounds 200
+    python benchmarks/normalize_benchmark.py --record corpus/ 3017620422003 5449000000996
+    python benchmarks/normalize_benchmark.py corpus/ --rounds 200
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import httpx
+import orjson
+from services.clients.off_normalizer import OFF_FIELDS, normalize_product
+
+OFF_PRODUCT_URL = "https://world.openfoodfacts.org/api/v2/product/{barcode}.json"
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "off_corpus")
+
+
+def record(corpus_dir: str, barcodes: list[str]) -> None:
+    """Save the full and the trimmed payload of each barcode."""
+    os.makedirs(corpus_dir, exist_ok=True)
+    with httpx.Client(timeout=30.0, headers={"User-Agent": "skineats-benchmark/1.0"}) as client:
+        for barcode in barcodes:
+            url = OFF_PRODUCT_URL.format(barcode=barcode)
+            full = client.get(url)
+            trimmed = client.get(url, params={"fields": OFF_FIELDS})
+            full.raise_for_status()
+            trimmed.raise_for_status()
+            with open(os.path.join(corpus_dir, f"{barcode}.full.json"), "wb") as f:
+                f.write(full.content)
+            with open(os.path.join(corpus_dir, f"{barcode}.trimmed.json"), "wb") as f:
+                f.write(trimmed.content)
+            print(f"{barcode}: full={len(full.content)}B trimmed={len(trimmed.content)}B")
+
+
+def load_corpus(corpus_dir: str, kind: str) -> list[bytes]:
+    payloads = []
+    for name in sorted(os.listdir(corpus_dir)):
+        if name.endswith(f".{kind}.json"):
+            with open(os.path.join(corpus_dir, name), "rb") as f:
+                payloads.append(f.read())
+    return payloads
+
+
+def time_path(payloads: list[bytes], loads, rounds: int) -> list[float]:
+    timings = []
+    for _ in range(rounds):
+        for payload in payloads:
+            started = time.perf_counter()
+            data = loads(payload)
+            normalize_product(data.get("product", {}))
+            timings.append((time.perf_counter() - started) * 1_000_000)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark OFF payload normalization")
+    parser.add_argument("corpus", nargs="?", default=DEFAULT_CORPUS, help="Directory of recorded payloads")
+    parser.add_argument("barcodes", nargs="*", help="Barcodes to record (with --record)")
+    parser.add_argument("--record", action="store_true", help="Fetch payloads from OFF into the corpus")
+    parser.add_argument("--rounds", type=int, default=100)
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.corpus, args.barcodes)
+        return
+
+    full = load_corpus(args.corpus, "full")
+    trimmed = load_corpus(args.corpus, "trimmed")
+    if not full or not trimmed:
+        raise SystemExit(f"No recorded payloads in {args.corpus}, run with --record first")
+
+    for label, payloads, loads in (("full", full, json.loads), ("trimmed", trimmed, orjson.loads)):
+        timings = time_path(payloads, loads, args.rounds)
+        size = statistics.mean(len(payload) for payload in payloads)
+        print(
+            f"{label:>8}: avg payload={size / 1024:8.1f}KB "
+            f"median={statistics.median(timings):8.1f}us "
+            f"p95={statistics.quantiles(timings, n=100)[94]:8.1f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+OFF client latency under injected upstream trouble.
+
+Starts the fake OFF server in-process and runs the same batch of lookups
+through OpenFoodFactsClient in a few scenarios: a healthy upstream, a slow
+tail with and without hedging, a flaky upstream (retries) and a full
+outage (circuit breaker). Reports p50/p99 and the client's counters for each.
+
+Usage (from backend/):
+    python benchmarks/off_client_benchmark.py
+    python benchmarks/off_client_benchmark.py --lookups 500 --concurrency 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fake_off_server import BackgroundServer, FakeOFFState
+from services.clients.open_food_facts_client import OpenFoodFactsClient, OpenFoodFactsUnavailable
+
+SCENARIOS = [
+    # name, server settings, client overrides
+    ("healthy", dict(latency_ms=20, jitter_ms=10), dict()),
+    ("slow tail", dict(latency_ms=20, jitter_ms=10, slow_rate=0.05, slow_ms=1500), dict()),
+    ("slow tail + hedge", dict(latency_ms=20, jitter_ms=10, slow_rate=0.05, slow_ms=1500), dict(hedge_after=0.1)),
+    ("5% errors", dict(latency_ms=20, jitter_ms=10, error_rate=0.05), dict()),
+    ("outage", dict(latency_ms=20, error_rate=1.0), dict()),
+]
+
+
+async def run_scenario(base_url: str, lookups: int, concurrency: int, overrides: dict) -> dict:
+    client = OpenFoodFactsClient(base_url=base_url)
+    for name, value in overrides.items():
+        setattr(client, name, value)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    unavailable = 0
+
+    async def lookup(index: int) -> None:
+        nonlocal unavailable
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await client.get_product(f"400000000{index:04d}")
+            except OpenFoodFactsUnavailable:
+                unavailable += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    try:
+        await asyncio.gather(*(lookup(index) for index in range(lookups)))
+    finally:
+        await client.close()
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "p50": quantiles[49],
+        "p99": quantiles[98],
+        "unavailable": unavailable,
+        "breaker": client.breaker.state,
+        **client.stats,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the OFF client against a fake upstream")
+    parser.add_argument("--lookups", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--port", type=int, default=8081)
+    args = parser.parse_args()
+
+    for name, server_settings, overrides in SCENARIOS:
+        state = FakeOFFState(seed=1, **server_settings)
+        with BackgroundServer(state, port=args.port) as server:
+            result = asyncio.run(run_scenario(server.url, args.lookups, args.concurrency, overrides))
+        print(
+            f"{name:>18}: p50={result['p50']:7.1f}ms p99={result['p99']:7.1f}ms "
+            f"requests={result['requests']} retries={result['retries']} hedges={result['hedges']} "
+            f"unavailable={result['unavailable']} rejected={result['rejected']} breaker={result['breaker']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
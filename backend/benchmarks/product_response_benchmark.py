@@ -0,0 +1,71 @@
+"""
+Cost and size of GET /products/{barcode} responses.
+
+Times, per request, what the endpoint does for one synthetic product:
+serializing it from scratch (what response_model did on every scan), serving
+the cached bytes for its version, and answering a matching If-None-Match
+with a 304. Also prints the body size of every media type and coding.
+
+Usage (from backend/):
+    python benchmarks/product_response_benchmark.py
+    python benchmarks/product_response_benchmark.py --iterations 50000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from fake_off_server import synthetic_product
+from models.product import Product
+from services.clients.off_normalizer import normalize_product
+from services.product_response_cache import (
+    CODINGS, IDENTITY, JSON, MSGPACK, ProductResponseCache, encode_product, etag_matches,
+)
+from services.skin_score_engine import skin_score_engine
+
+
+def per_call_us(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure product response serialization and caching")
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+
+    product = Product(**normalize_product(synthetic_product("4000000000001")))
+    skin_score_engine.apply([product])
+    cache = ProductResponseCache(max_bytes=1_000_000)
+    accept, accept_encoding = "application/json", "gzip, br"
+
+    def serialize():
+        encode_product(product, JSON, IDENTITY)
+
+    def cached():
+        etag, media_type, coding = cache.representation(product, accept, accept_encoding)
+        cache.get(product, etag, media_type, coding)
+
+    etag, _, _ = cache.representation(product, accept, accept_encoding)
+
+    def not_modified():
+        etag_matches(etag, cache.representation(product, accept, accept_encoding)[0])
+
+    print(f"serialize JSON each time: {per_call_us(serialize, args.iterations):7.1f}us")
+    print(f"cached bytes:             {per_call_us(cached, args.iterations):7.1f}us")
+    print(f"304 Not Modified:         {per_call_us(not_modified, args.iterations):7.1f}us")
+
+    for media_type in (JSON, MSGPACK):
+        sizes = ", ".join(
+            f"{coding}={len(encode_product(product, media_type, coding))}B"
+            for coding in (IDENTITY, *CODINGS)
+        )
+        print(f"{media_type:<20} {sizes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Scan throughput at increasing concurrency.
+
+Looks up barcodes that already exist in the products table through
+ProductService with 1, 4, 16 and 64 requests in flight and reports
+scans/sec for each level. The in-process product cache is cleared before
+every lookup so each scan really goes to Postgres; with the service on
+AsyncSession throughput should grow with concurrency until the pool
+saturates, instead of staying flat. tests/test_scan_concurrency.py checks
+the same property without a database.
+
+Usage (from backend/):
+    python benchmarks/scan_concurrency.py --scans 2000
+    python benchmarks/scan_concurrency.py --levels 1 8 32
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from sqlmodel import select
+from db.db import AsyncSessionLocal, get_pool_metrics
+from models.product import Product
+from services.product_cache import product_cache
+from services.product_service import ProductService
+
+
+async def load_barcodes(count: int) -> list[str]:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(Product.barcode).limit(count))
+        return list(result.scalars().all())
+
+
+async def scan(barcode: str) -> None:
+    product_cache.invalidate(barcode)
+    async with AsyncSessionLocal() as session:
+        service = ProductService(session)
+        try:
+            await service.get_product_by_barcode(barcode)
+        finally:
+            await service.close()
+
+
+async def run_level(barcodes: list[str], scans: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded_scan(barcode: str) -> None:
+        async with semaphore:
+            await scan(barcode)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(bounded_scan(random.choice(barcodes)) for _ in range(scans)))
+    return scans / (time.perf_counter() - started)
+
+
+async def main_async(scans: int, levels: list[int]) -> None:
+    barcodes = await load_barcodes(1000)
+    if not barcodes:
+        raise SystemExit("products table is empty, seed it first (see scripts/ingest_off_dump.py)")
+
+    baseline = None
+    for concurrency in levels:
+        throughput = await run_level(barcodes, scans, concurrency)
+        baseline = baseline or throughput
+        pool = get_pool_metrics()
+        print(
+            f"concurrency={concurrency:>3} scans/sec={throughput:>8.0f} "
+            f"speedup={throughput / baseline:>5.2f}x pool_saturation={pool.get('saturation', 0):.2f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure scan throughput against in-flight requests")
+    parser.add_argument("--scans", type=int, default=1000)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16, 64])
+    args = parser.parse_args()
+    asyncio.run(main_async(args.scans, args.levels))
+
+
+if __name__ == "__main__":
+    main()
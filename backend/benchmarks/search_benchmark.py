@@ -0,0 +1,118 @@
+"""
+Product search latency benchmark.
+
+Seeds the products table with synthetic rows (prefixed "bench-" so they can
+be removed again), then runs a mix of search queries and reports p50/p95/p99
+latency. Run once as-is and once with --no-index to see what the trigram
+indexes buy compared to the old sequential scan.
+
+Usage (from backend/):
+    python benchmarks/search_benchmark.py --seed 1000000
+    python benchmarks/search_benchmark.py --queries 500
+    python benchmarks/search_benchmark.py --queries 500 --no-index
+    python benchmarks/search_benchmark.py --cleanup
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from sqlalchemy import text
+from db.db import AsyncSessionLocal
+from services.product_service import build_search_statement
+
+WORDS = [
+    "cola", "zero", "chocolate", "peanut", "butter", "oat", "bar", "protein",
+    "yogurt", "greek", "almond", "milk", "vanilla", "crisps", "sea", "salt",
+    "granola", "honey", "berry", "cereal", "orange", "juice", "sparkling", "water",
+]
+BRANDS = ["Acme", "Nature Valley", "Coca-Cola", "Danone", "Kellogg's", "Clif", "Oatly", "Lay's"]
+QUERIES = ["cola", "choc", "peanut butter", "greek yog", "oat", "kellogg", "protein bar", "juice"]
+
+SEED_SQL = """
+INSERT INTO products (barcode, product_name, brand, created_at, updated_at)
+SELECT
+    'bench-' || g,
+    (CAST(:words AS text[]))[1 + (g * 7) % :n_words] || ' ' ||
+    (CAST(:words AS text[]))[1 + (g * 13) % :n_words] || ' ' ||
+    (CAST(:words AS text[]))[1 + (g * 31) % :n_words],
+    (CAST(:brands AS text[]))[1 + g % :n_brands],
+    now(), now()
+FROM generate_series(:start, :stop) AS g
+ON CONFLICT (barcode) DO NOTHING
+"""
+
+
+async def seed(rows: int, chunk: int = 100_000) -> None:
+    async with AsyncSessionLocal() as session:
+        await session.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        for start in range(1, rows + 1, chunk):
+            stop = min(start + chunk - 1, rows)
+            await session.execute(
+                text(SEED_SQL).bindparams(
+                    words=WORDS, n_words=len(WORDS),
+                    brands=BRANDS, n_brands=len(BRANDS),
+                    start=start, stop=stop,
+                )
+            )
+            await session.commit()
+            print(f"seeded {stop}/{rows}")
+        await session.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_products_name_trgm ON products USING gin (product_name gin_trgm_ops)"
+        ))
+        await session.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_products_brand_trgm ON products USING gin (brand gin_trgm_ops)"
+        ))
+        await session.commit()
+        await session.execute(text("ANALYZE products"))
+
+
+async def cleanup() -> None:
+    async with AsyncSessionLocal() as session:
+        await session.execute(text("DELETE FROM products WHERE barcode LIKE 'bench-%'"))
+        await session.commit()
+
+
+async def run(queries: int, limit: int, no_index: bool) -> None:
+    latencies = []
+    async with AsyncSessionLocal() as session:
+        if no_index:
+            # Forces the planner back to a sequential scan, like the old query
+            await session.execute(text("SET enable_bitmapscan = off"))
+            await session.execute(text("SET enable_indexscan = off"))
+        for _ in range(queries):
+            statement, _ = build_search_statement(random.choice(QUERIES))
+            started = time.perf_counter()
+            await session.execute(statement.limit(limit))
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"queries={queries} limit={limit} index={'off' if no_index else 'on'}")
+    print(f"p50={quantiles[49]:.2f}ms p95={quantiles[94]:.2f}ms p99={quantiles[98]:.2f}ms max={latencies[-1]:.2f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark product search latency")
+    parser.add_argument("--seed", type=int, default=0, help="Number of synthetic products to insert first")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--no-index", action="store_true", help="Disable index scans for a baseline run")
+    parser.add_argument("--cleanup", action="store_true", help="Delete the synthetic products and exit")
+    args = parser.parse_args()
+
+    if args.cleanup:
+        asyncio.run(cleanup())
+        return
+    if args.seed:
+        asyncio.run(seed(args.seed))
+    asyncio.run(run(args.queries, args.limit, args.no_index))
+
+
+if __name__ == "__main__":
+    main()
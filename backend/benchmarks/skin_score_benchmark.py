@@ -0,0 +1,65 @@
+"""
+Skin-score engine throughput in products/sec.
+
+Scores batches of synthetic products (random nutrients and ingredient lists
+drawn from a realistic vocabulary) entirely in memory, so it needs no
+database. Compare batch sizes to see how much the vectorized nutrient
+rules gain over scoring products one at a time. Ingredient matching still
+runs once per product, so throughput flattens out at large batches.
+
+Usage (from backend/):
+    python benchmarks/skin_score_benchmark.py
+    python benchmarks/skin_score_benchmark.py --products 200000 --batch-sizes 1 100 10000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from services.skin_score_engine import skin_score_engine
+
+INGREDIENTS = [
+    "sugar", "wheat flour", "palm oil", "whole milk powder", "cocoa butter", "salt",
+    "glucose syrup", "whey", "soy lecithin", "natural flavouring", "oats", "chia seeds",
+    "water", "corn syrup", "almond milk", "dextrose", "sunflower oil", "flaxseed",
+    "citric acid", "skimmed milk", "maltodextrin", "rice flour", "yeast extract",
+]
+
+
+def synthetic_products(count: int, seed: int = 42) -> list[dict]:
+    rng = random.Random(seed)
+    products = []
+    for _ in range(count):
+        products.append({
+            "sugar_100g": rng.uniform(0, 60),
+            "saturated_fat_100g": rng.uniform(0, 20),
+            "sodium_100g": rng.uniform(0, 2),
+            "fiber_100g": rng.choice([None, rng.uniform(0, 12)]),
+            "nova_group": rng.choice([None, 1, 2, 3, 4]),
+            "ingredient_list": [
+                {"text": text} for text in rng.sample(INGREDIENTS, rng.randint(3, 15))
+            ],
+        })
+    return products
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the skin-score engine")
+    parser.add_argument("--products", type=int, default=50_000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 100, 1000, 10_000])
+    args = parser.parse_args()
+
+    products = synthetic_products(args.products)
+    for batch_size in args.batch_sizes:
+        started = time.perf_counter()
+        for start in range(0, len(products), batch_size):
+            skin_score_engine.score_batch(products[start:start + batch_size])
+        elapsed = time.perf_counter() - started
+        print(f"batch_size={batch_size:>6} products/sec={len(products) / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,29 @@
 # app/auth.py
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from firebase_admin import auth
 from typing import Annotated
+from config.settings import settings
+from auth.token_verifier import FirebaseTokenVerifier, TokenVerificationError
+from observability.spans import span
 
 bearer_scheme = HTTPBearer()
 
-def get_current_user(
+# Shared by every request so signing certs and decoded claims stay cached
+token_verifier = FirebaseTokenVerifier(
+    project_id=settings.firebase_project_id,
+    cache_size=settings.auth_claims_cache_size,
+)
+
+async def get_current_user(
         creds: Annotated[HTTPAuthorizationCredentials, Depends(bearer_scheme)]
 ) -> dict:
     try:
         token = creds.credentials
 
-        decoded_token = auth.verify_id_token(token)
+        with span("auth"):
+            decoded_token = await token_verifier.verify(token)
         return decoded_token
-    except auth.InvalidIdTokenError as e:
+    except TokenVerificationError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Bearer token not provided",
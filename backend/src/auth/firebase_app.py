@@ -0,0 +1,69 @@
+import logging
+import os
+from typing import Any, Optional
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_firebase_app: Optional[Any] = None
+
+
+def get_firebase_app() -> Any:
+    """
+    The firebase_admin app, initialized on first use.
+
+    ID tokens are verified locally (see auth/token_verifier.py), so request
+    handling never needs this; importing firebase_admin and the Google auth
+    stack is deferred until something does.
+    """
+    global _firebase_app
+    if _firebase_app is not None:
+        return _firebase_app
+
+    import firebase_admin
+    from firebase_admin import credentials
+
+    # VERCEL DEPLOYMENT WORKFLOW
+    # Check if the Vercel environment variables are set
+    if settings.firebase_private_key:
+        logger.info("Initializing Firebase with Vercel environment variables...")
+        # Vercel correctly handles newlines in the private key.
+        # We replace escaped newlines with actual newlines, just in case.
+        private_key = settings.firebase_private_key.replace('\\n', '\n')
+
+        cred_options = {
+            'type': 'service_account',
+            'project_id': settings.firebase_project_id,
+            'private_key_id': '', # Not strictly required by firebase-admin
+            'private_key': private_key,
+            'client_email': settings.firebase_client_email,
+            'client_id': '', # Not strictly required
+            'auth_uri': 'https://accounts.google.com/o/oauth2/auth',
+            'token_uri': 'https://oauth2.googleapis.com/token',
+            'auth_provider_x509_cert_url': 'https://www.googleapis.com/oauth2/v1/certs',
+            'client_x509_cert_url': f'https://www.googleapis.com/robot/v1/metadata/x509/{settings.firebase_client_email}'
+        }
+        cred = credentials.Certificate(cred_options)
+
+    # LOCAL DEVELOPMENT WORKFLOW
+    # Fallback to local service account file
+    elif settings.google_application_credentials:
+        logger.info(f"Initializing Firebase with local key: {settings.google_application_credentials}")
+        os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = settings.google_application_credentials
+        cred = credentials.ApplicationDefault()
+
+    else:
+        logger.warning("Firebase credentials not found. App may fail to connect.")
+        # Allow to proceed for environments that might use ADC (like Google Cloud)
+        cred = credentials.ApplicationDefault()
+
+    try:
+        _firebase_app = firebase_admin.initialize_app(cred, options={
+            'projectId': settings.firebase_project_id,
+        })
+        logger.info(f"Firebase App initialized for project: {settings.firebase_project_id}")
+    except ValueError as e:
+        # This can happen if the app is reloaded
+        logger.info(f"Firebase App already initialized: {e}")
+        _firebase_app = firebase_admin.get_app()
+    return _firebase_app
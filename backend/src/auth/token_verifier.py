@@ -0,0 +1,164 @@
+import asyncio
+import hashlib
+import logging
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import httpx
+import jwt
+from cachetools import TLRUCache
+from cryptography import x509
+from cryptography.hazmat.primitives.serialization import load_pem_public_key
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_CERTS_URL = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+DEFAULT_CERTS_MAX_AGE = 3600.0
+
+# Returns the kid -> PEM mapping and how many seconds it may be cached for
+CertFetcher = Callable[[], Awaitable[Tuple[Dict[str, str], float]]]
+
+
+class TokenVerificationError(Exception):
+    """Raised when an ID token is malformed, expired or not signed by Google."""
+
+
+async def fetch_google_certs(url: str = GOOGLE_CERTS_URL) -> Tuple[Dict[str, str], float]:
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        response = await client.get(url)
+        response.raise_for_status()
+    max_age = DEFAULT_CERTS_MAX_AGE
+    match = re.search(r"max-age=(\d+)", response.headers.get("cache-control", ""))
+    if match:
+        max_age = float(match.group(1))
+    return response.json(), max_age
+
+
+def _load_public_key(pem: str):
+    data = pem.encode()
+    if b"BEGIN CERTIFICATE" in data:
+        return x509.load_pem_x509_certificate(data).public_key()
+    return load_pem_public_key(data)
+
+
+class FirebaseTokenVerifier:
+    """
+    Verifies Firebase ID tokens locally instead of calling firebase_admin on
+    every request.
+
+    Google's signing certs are cached for as long as their Cache-Control
+    allows and refreshed in the background shortly before they expire.
+    Decoded claims are cached by token hash until the token's own exp, so a
+    client re-sending the same token skips signature verification entirely.
+
+    Pass fetch_certs to verify against other keys, e.g. a locally generated
+    key pair in tests.
+    """
+
+    def __init__(
+        self,
+        project_id: str,
+        fetch_certs: Optional[CertFetcher] = None,
+        cache_size: int = 10_000,
+        refresh_margin: float = 300.0,
+        clock_skew: float = 60.0,
+    ):
+        self.project_id = project_id
+        self.issuer = f"https://securetoken.google.com/{project_id}"
+        self._fetch_certs = fetch_certs or fetch_google_certs
+        self._refresh_margin = refresh_margin
+        self._clock_skew = clock_skew
+        self._keys: Dict[str, Any] = {}
+        self._keys_expire_at = 0.0
+        self._last_refresh = 0.0
+        self._min_refresh_interval = 30.0
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        # Entries expire at the token's exp claim (wall-clock seconds)
+        self._claims = TLRUCache(
+            maxsize=cache_size,
+            ttu=lambda _key, claims, _now: claims["exp"],
+            timer=time.time,
+        )
+
+    async def verify(self, token: str) -> Dict[str, Any]:
+        cache_key = hashlib.sha256(token.encode()).digest()
+        claims = self._claims.get(cache_key)
+        if claims is not None:
+            return dict(claims)
+
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except jwt.PyJWTError as e:
+            raise TokenVerificationError(f"Malformed ID token: {e}") from e
+
+        public_key = await self._get_key(kid)
+        try:
+            claims = jwt.decode(
+                token,
+                public_key,
+                algorithms=["RS256"],
+                audience=self.project_id,
+                issuer=self.issuer,
+                leeway=self._clock_skew,
+                options={"require": ["exp", "iat", "sub", "aud", "iss"]},
+            )
+        except jwt.PyJWTError as e:
+            raise TokenVerificationError(f"Invalid ID token: {e}") from e
+
+        subject = claims["sub"]
+        if not isinstance(subject, str) or not subject or len(subject) > 128:
+            raise TokenVerificationError("ID token has an invalid subject")
+        if claims.get("auth_time", 0) > time.time() + self._clock_skew:
+            raise TokenVerificationError("ID token has an auth_time in the future")
+
+        # Match firebase_admin.auth.verify_id_token, which exposes sub as uid
+        claims["uid"] = subject
+        self._claims[cache_key] = claims
+        return dict(claims)
+
+    async def _get_key(self, kid: Optional[str]):
+        now = time.time()
+        if not self._keys or now >= self._keys_expire_at:
+            await self.refresh()
+        elif now >= self._keys_expire_at - self._refresh_margin:
+            self._schedule_refresh()
+
+        public_key = self._keys.get(kid)
+        if public_key is None:
+            # Google may have rotated keys before our copy expired
+            await self.refresh(force=True)
+            public_key = self._keys.get(kid)
+        if public_key is None:
+            raise TokenVerificationError(f"ID token signed with unknown key: {kid}")
+        return public_key
+
+    def _schedule_refresh(self) -> None:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._background_refresh())
+
+    async def _background_refresh(self) -> None:
+        try:
+            await self.refresh(force=True)
+        except Exception as e:
+            # The current keys are still valid, the next request will retry
+            logger.warning(f"Background refresh of signing certs failed: {e}")
+
+    async def refresh(self, force: bool = False) -> None:
+        """Re-fetch the signing certs unless another caller just did."""
+        async with self._refresh_lock:
+            if not force and self._keys and time.time() < self._keys_expire_at:
+                return
+            # Also stops tokens with made-up kids from hammering Google
+            if force and time.time() - self._last_refresh < self._min_refresh_interval:
+                return
+            # Counted as a refresh even if it fails, so errors don't cause a retry storm
+            self._last_refresh = time.time()
+            certs, max_age = await self._fetch_certs()
+            self._keys = {kid: _load_public_key(pem) for kid, pem in certs.items()}
+            self._keys_expire_at = time.time() + max_age
+            logger.info(f"Loaded {len(self._keys)} signing certs, valid for {max_age:.0f}s")
+
+    def clear(self) -> None:
+        self._claims.clear()
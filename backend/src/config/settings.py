@@ -10,12 +10,120 @@ class Settings(BaseSettings):
     
     # --- For Development (reading from .env file) ---
     open_food_facts_api_url: str
+    # Service account key file, used when the Firebase variables below are empty
+    google_application_credentials: str = ""
 
     # --- For Production (Vercel) ---
     # These will be read from Vercel's environment variables
     firebase_project_id: str
     firebase_client_email: str
     firebase_private_key: str
+
+    # --- Startup ---
+    # Skip eager warm-up in the lifespan (Firebase app, DB engine, alternatives
+    # index) and let each be created on first use. On by default on Vercel,
+    # where every cold start is paid by a user request.
+    fast_startup: bool = bool(os.getenv("VERCEL"))
+
+    # --- Database ---
+    # Pooling profile: "serverless", "worker" or "test". Left empty, Vercel
+    # deployments use "serverless" and everything else uses "worker".
+    db_pool_profile: str = ""
+    # Set when connecting through pgbouncer/Supavisor in transaction mode,
+    # which can't keep server-side prepared statements between transactions
+    db_pgbouncer: bool = False
+
+    # --- Auth ---
+    # Decoded ID-token claims kept in memory until each token's exp
+    auth_claims_cache_size: int = 10_000
+    # POST /auth/sync only rewrites users.updated_at when it is older than this
+    user_sync_coalesce_minutes: int = 15
+
+    # --- Product cache ---
+    # Found products are kept longer than misses so that barcodes OFF
+    # doesn't know yet are retried reasonably soon.
+    product_cache_max_size: int = 10_000
+    product_cache_ttl_seconds: int = 3600
+    product_negative_cache_max_size: int = 5_000
+    product_negative_cache_ttl_seconds: int = 300
+
+    # --- Ingredient matching ---
+    # Optional path to a prebuilt matcher (see scripts/build_ingredient_matcher.py)
+    ingredient_matcher_artifact: str = ""
+
+    # --- Open Food Facts client ---
+    off_timeout_seconds: float = 3.0  # per attempt
+    off_http2: bool = False
+    off_max_connections: int = 20
+    off_max_keepalive_connections: int = 10
+    off_keepalive_expiry_seconds: float = 30.0
+    off_max_retries: int = 2
+    off_retry_backoff_seconds: float = 0.2
+    # Send a second request when the first takes longer than this; 0 disables
+    off_hedge_after_seconds: float = 0.0
+    off_breaker_failure_threshold: int = 5
+    off_breaker_reset_seconds: float = 30.0
+
+    # --- Product freshness ---
+    # Rows younger than product_fresh_days are served as-is; older rows are
+    # still served but queued for a background refresh from OFF, with rows
+    # past product_stale_days refreshed first.
+    product_fresh_days: int = 7
+    product_stale_days: int = 30
+    # OFF requests per second for background refreshes; 0 disables them
+    product_refresh_rate_per_second: float = 2.0
+    product_refresh_max_queued: int = 10_000
+
+    # --- Product responses ---
+    # Serialized GET /products/{barcode} bodies, one per product version and
+    # encoding (JSON/msgpack, gzip/br), bounded by total size in bytes
+    product_response_cache_max_bytes: int = 32_000_000
+
+    # --- Alternative suggestions ---
+    # In-memory nutrient index behind GET /products/{barcode}/alternatives,
+    # built at startup (or on first use with fast_startup). Needs memory and
+    # warm-up time, so serverless deployments may want it off.
+    alternatives_index_enabled: bool = True
+    alternatives_max_results: int = 20
+
+    # --- Observability ---
+    # Add a Server-Timing header (auth, db, off, ...) to every response
+    server_timing_header: bool = True
+    # When set, GET /metrics requires "Authorization: Bearer <metrics_token>"
+    metrics_token: str = ""
+    # Route and DB timings aren't public: where this is on (Vercel and
+    # production by default) /metrics is only served once a token is set
+    metrics_token_required: bool = bool(os.getenv("VERCEL")) or os.getenv("ENVIRONMENT_TYPE") == "production"
+
+    # --- Batch product lookup ---
+    product_batch_max_size: int = 200
+    off_batch_concurrency: int = 8
+
+    # --- Food entries ---
+    # Longest range GET /food-entries/daily will return, in days
+    nutrition_range_max_days: int = 366
+    # Most items POST /food-entries/batch accepts in one meal
+    food_entry_batch_max_size: int = 100
+    # Rows fetched per round trip when streaming a food log export
+    export_batch_size: int = 1_000
+
+    # --- Favorite usage write-behind ---
+    # Favorite usage_count/last_used increments are buffered in memory and
+    # flushed as one UPDATE this often; 0 writes them inline with each entry.
+    # Off by default on Vercel, where a frozen or recycled instance would
+    # lose whatever is still buffered.
+    favorite_usage_flush_seconds: float = 0.0 if os.getenv("VERCEL") else 5.0
+    # Flush early once this many (user, product) counters are pending. Along
+    # with the interval this bounds what a crash can lose.
+    favorite_usage_max_pending: int = 1_000
+
+    # --- Delta sync ---
+    sync_page_max_size: int = 2_000
+    # Changes newer than this are left for the next sync, so rows written by
+    # transactions that haven't committed yet can't be skipped by the cursor
+    sync_settle_seconds: float = 5.0
+    # Clients whose cursor is older than this must do a full sync again
+    sync_tombstone_retention_days: int = 90
     
     # Model config to load from a .env file for local dev
     model_config = SettingsConfigDict(
@@ -26,4 +134,3 @@ class Settings(BaseSettings):
 
 # Create a single, importable instance of the settings
 settings = Settings()
-    
\ No newline at end of file
@@ -1,18 +1,18 @@
 import os
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from uuid import uuid4
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import NullPool
-from dotenv import load_dotenv
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
-if not os.getenv("VERCEL"):
-    # You can control which .env file to load locally
-    env_file = ".env.development"
-    load_dotenv(env_file)
+from config.settings import settings
+from observability.spans import record_span
 
-DATABASE_URL = os.getenv("DATABASE_URL")
-
-if not DATABASE_URL:
-    raise ValueError("DATABASE_URL not found in environment variables")
+IS_VERCEL = bool(os.getenv("VERCEL"))
 
 # Ensure async driver (asyncpg) regardless of provided scheme
 def _to_async_url(url: str) -> str:
@@ -22,32 +22,185 @@ def _to_async_url(url: str) -> str:
         url = url.replace("postgresql://", "postgresql+asyncpg://", 1)
     return url
 
-ASYNC_DATABASE_URL = _to_async_url(DATABASE_URL)
-IS_VERCEL = bool(os.getenv("VERCEL"))
+def _database_url() -> str:
+    if not IS_VERCEL:
+        # You can control which .env file to load locally
+        from dotenv import load_dotenv
+        load_dotenv(".env.development")
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise ValueError("DATABASE_URL not found in environment variables")
+    return _to_async_url(database_url)
+
+
+@dataclass(frozen=True)
+class PoolProfile:
+    pool_size: int
+    max_overflow: int
+    pool_recycle: int  # seconds, -1 keeps connections forever
+    pool_timeout: float  # seconds to wait for a free connection
+    statement_cache_size: int  # asyncpg prepared statements per connection
+    null_pool: bool = False
 
-engine_kwargs = {
-    "echo": False,
-    "future": True,
-    "pool_pre_ping": True,
+
+POOL_PROFILES = {
+    # One request at a time per instance, usually behind an external pooler.
+    # A single connection is kept so warm invocations skip the TCP/TLS
+    # handshake, and recycled early since the instance may be frozen.
+    "serverless": PoolProfile(
+        pool_size=1, max_overflow=1, pool_recycle=300, pool_timeout=10, statement_cache_size=100
+    ),
+    # Long-running uvicorn worker serving many concurrent requests
+    "worker": PoolProfile(
+        pool_size=10, max_overflow=10, pool_recycle=1800, pool_timeout=30, statement_cache_size=500
+    ),
+    # Tests may run each case on its own event loop, so never reuse connections
+    "test": PoolProfile(
+        pool_size=0, max_overflow=0, pool_recycle=-1, pool_timeout=30, statement_cache_size=0, null_pool=True
+    ),
 }
 
-if IS_VERCEL:
-    engine_kwargs["poolclass"] = NullPool
-else:
-    engine_kwargs["pool_size"] = 1
-    engine_kwargs["max_overflow"] = 0
+def pool_profile_name() -> str:
+    name = settings.db_pool_profile or ("serverless" if IS_VERCEL else "worker")
+    if name not in POOL_PROFILES:
+        raise ValueError(f"Unknown db_pool_profile: {name}")
+    return name
+
+
+class PoolMetrics:
+    """Checkout wait times and timeouts for the engine's connection pool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_seconds_total += seconds
+        if seconds > self.wait_seconds_max:
+            self.wait_seconds_max = seconds
+
+
+pool_metrics = PoolMetrics()
+
+
+class _InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            pool_metrics.record_wait(waited)
+            record_span("db_pool", waited)
+
+
+_engine: Optional[AsyncEngine] = None
 
-engine = create_async_engine(
-    ASYNC_DATABASE_URL,
-    **engine_kwargs,
-)
 
-AsyncSessionLocal = sessionmaker(
-    bind=engine,
+def get_engine() -> AsyncEngine:
+    """
+    The process-wide engine, created on first use.
+
+    Creating it loads the asyncpg dialect, so it is deferred until a request
+    actually needs the database rather than paid on every cold start.
+    """
+    global _engine
+    if _engine is None:
+        _engine = _create_engine()
+    return _engine
+
+
+def _create_engine() -> AsyncEngine:
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    profile = POOL_PROFILES[pool_profile_name()]
+    engine_kwargs: Dict[str, Any] = {
+        "echo": False,
+        "future": True,
+        "pool_pre_ping": True,
+    }
+
+    connect_args = {
+        "statement_cache_size": profile.statement_cache_size,
+        "prepared_statement_cache_size": profile.statement_cache_size,
+    }
+    if settings.db_pgbouncer:
+        # Transaction-mode poolers hand each transaction a different server
+        # connection, so named prepared statements can't be reused or must be unique
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    engine_kwargs["connect_args"] = connect_args
+
+    if profile.null_pool:
+        engine_kwargs["poolclass"] = NullPool
+    else:
+        engine_kwargs["poolclass"] = _InstrumentedQueuePool
+        engine_kwargs["pool_size"] = profile.pool_size
+        engine_kwargs["max_overflow"] = profile.max_overflow
+        engine_kwargs["pool_recycle"] = profile.pool_recycle
+        engine_kwargs["pool_timeout"] = profile.pool_timeout
+
+    engine = create_async_engine(_database_url(), **engine_kwargs)
+
+    # Time every statement, so requests can report how long they spent in Postgres
+    event.listen(engine.sync_engine, "before_cursor_execute", _start_statement_timer)
+    event.listen(engine.sync_engine, "after_cursor_execute", _record_statement_time)
+    return engine
+
+
+def _start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+    # One statement runs at a time per connection. A failed one never reaches
+    # after_cursor_execute; the next statement simply overwrites its start.
+    conn.info["statement_started"] = time.perf_counter()
+
+def _record_statement_time(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("statement_started", None)
+    if started is not None:
+        record_span("db", time.perf_counter() - started)
+
+
+class _LazySessionmaker(sessionmaker):
+    """sessionmaker that binds to the engine the first time a session is made."""
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
+
+
+AsyncSessionLocal = _LazySessionmaker(
     class_=AsyncSession,
     expire_on_commit=False
 )
 
 async def get_db():
     async with AsyncSessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+def get_pool_metrics() -> Dict[str, Any]:
+    """Snapshot of pool usage, including how saturated the pool currently is."""
+    metrics: Dict[str, Any] = {
+        "profile": pool_profile_name(),
+        "checkouts": pool_metrics.checkouts,
+        "timeouts": pool_metrics.timeouts,
+        "wait_seconds_total": pool_metrics.wait_seconds_total,
+        "wait_seconds_max": pool_metrics.wait_seconds_max,
+    }
+    if _engine is None:
+        # Nothing has needed the database yet; don't create the engine for this
+        return metrics
+    pool = _engine.sync_engine.pool
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        capacity = pool.size() + POOL_PROFILES[pool_profile_name()].max_overflow
+        metrics["size"] = pool.size()
+        metrics["checked_out"] = pool.checkedout()
+        metrics["overflow"] = max(pool.overflow(), 0)
+        metrics["saturation"] = pool.checkedout() / capacity if capacity else 0.0
+    return metrics
@@ -0,0 +1,6 @@
+from sqlmodel import SQLModel, Field
+from typing import List
+from config.settings import settings
+
+class BatchProductRequest(SQLModel):
+    barcodes: List[str] = Field(min_length=1, max_length=settings.product_batch_max_size)
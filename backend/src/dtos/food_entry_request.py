@@ -0,0 +1,62 @@
+from pydantic import field_validator
+from sqlmodel import SQLModel, Field
+from typing import List, Optional
+from decimal import Decimal
+from datetime import date
+from config.settings import settings
+
+class FoodEntryCreate(SQLModel):
+    barcode: str = Field(max_length=50)
+    # Defaults to today in the entry's timezone
+    entry_date: Optional[date] = None
+    timezone: str = Field(default="UTC", max_length=50)
+    meal_type: Optional[str] = Field(default=None, max_length=20)
+    servings: Decimal = Field(default=Decimal("1.0"), gt=0)
+
+    # Left empty, these are computed from the product's per-100g values
+    calories: Optional[Decimal] = None
+    protein_g: Optional[Decimal] = None
+    carbs_g: Optional[Decimal] = None
+    sugar_g: Optional[Decimal] = None
+    fiber_g: Optional[Decimal] = None
+    fat_g: Optional[Decimal] = None
+
+    custom_food_name: Optional[str] = Field(default=None, max_length=255)
+    notes: Optional[str] = None
+
+class FoodEntryUpdate(SQLModel):
+    entry_date: Optional[date] = None
+    timezone: Optional[str] = Field(default=None, max_length=50)
+    meal_type: Optional[str] = Field(default=None, max_length=20)
+    servings: Optional[Decimal] = Field(default=None, gt=0)
+
+    calories: Optional[Decimal] = None
+    protein_g: Optional[Decimal] = None
+    carbs_g: Optional[Decimal] = None
+    sugar_g: Optional[Decimal] = None
+    fiber_g: Optional[Decimal] = None
+    fat_g: Optional[Decimal] = None
+
+    custom_food_name: Optional[str] = Field(default=None, max_length=255)
+    notes: Optional[str] = None
+
+    @field_validator("entry_date", "timezone", "servings")
+    @classmethod
+    def _not_null(cls, value):
+        # Optional only so a PATCH can leave them out; the columns are NOT NULL
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
+class FoodEntryItem(SQLModel):
+    barcode: str = Field(max_length=50)
+    servings: Decimal = Field(default=Decimal("1.0"), gt=0)
+    meal_type: Optional[str] = Field(default=None, max_length=20)
+    notes: Optional[str] = None
+
+class FoodEntryBatchCreate(SQLModel):
+    """Several items logged together, e.g. one meal; macros are computed server-side."""
+    items: List[FoodEntryItem] = Field(min_length=1, max_length=settings.food_entry_batch_max_size)
+    # Defaults to today in the given timezone
+    entry_date: Optional[date] = None
+    timezone: str = Field(default="UTC", max_length=50)
@@ -0,0 +1,34 @@
+from sqlmodel import SQLModel
+from typing import Optional
+from decimal import Decimal
+from datetime import date, datetime
+
+class FoodEntryResponse(SQLModel):
+    id: int
+    barcode: str
+    entry_date: date
+    timezone: str
+    meal_type: Optional[str]
+    servings: Decimal
+
+    calories: Optional[Decimal]
+    protein_g: Optional[Decimal]
+    carbs_g: Optional[Decimal]
+    sugar_g: Optional[Decimal]
+    fiber_g: Optional[Decimal]
+    fat_g: Optional[Decimal]
+
+    custom_food_name: Optional[str]
+    notes: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+
+class DailyNutritionResponse(SQLModel):
+    entry_date: date
+    calories: Decimal
+    protein_g: Decimal
+    carbs_g: Decimal
+    sugar_g: Decimal
+    fiber_g: Decimal
+    fat_g: Decimal
+    entry_count: int
@@ -0,0 +1,12 @@
+from sqlmodel import SQLModel
+from typing import Optional
+from datetime import datetime
+
+class UserFavoriteResponse(SQLModel):
+    id: int
+    barcode: str
+    custom_food_name: Optional[str]
+    usage_count: int
+    last_used: datetime
+    created_at: datetime
+    updated_at: datetime
@@ -3,72 +3,51 @@ import sys
 from contextlib import asynccontextmanager
 from typing import Annotated
 
-import firebase_admin
-from firebase_admin import credentials
 from fastapi import FastAPI, Depends
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from config.settings import settings
+from auth.firebase_app import get_firebase_app
+from db.db import get_engine
 from routers.auth_router import router as auth_router
+from routers.product_router import router as product_router
+from routers.food_entry_router import router as food_entry_router
+from routers.sync_router import router as sync_router
+from routers.metrics_router import metrics_exposed, router as metrics_router
+from observability.middleware import TimingMiddleware
 from auth.auth import get_current_user
+from services.clients.open_food_facts_client import close_off_client
+from services.alternatives_index import alternatives_index
+from services.favorite_usage_buffer import favorite_usage_buffer
+from services.product_refresher import product_refresher
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # --- Startup ---
-    cred_options = {}
-    
-    # VERCEL DEPLOYMENT WORKFLOW
-    # Check if the Vercel environment variables are set
-    if settings.firebase_private_key:
-        print("Initializing Firebase with Vercel environment variables...")
-        # Vercel correctly handles newlines in the private key.
-        # We replace escaped newlines with actual newlines, just in case.
-        private_key = settings.firebase_private_key.replace('\\n', '\n')
-        
-        cred_options = {
-            'type': 'service_account',
-            'project_id': settings.firebase_project_id,
-            'private_key_id': '', # Not strictly required by firebase-admin
-            'private_key': private_key,
-            'client_email': settings.firebase_client_email,
-            'client_id': '', # Not strictly required
-            'auth_uri': 'https://accounts.google.com/o/oauth2/auth',
-            'token_uri': 'https://oauth2.googleapis.com/token',
-            'auth_provider_x509_cert_url': 'https://www.googleapis.com/oauth2/v1/certs',
-            'client_x509_cert_url': f'https://www.googleapis.com/robot/v1/metadata/x509/{settings.firebase_client_email}'
-        }
-        cred = credentials.Certificate(cred_options)
-        
-    # LOCAL DEVELOPMENT WORKFLOW
-    # Fallback to local service account file
-    elif settings.google_application_credentials:
-        print(f"Initializing Firebase with local key: {settings.google_application_credentials}")
-        os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = settings.google_application_credentials
-        cred = credentials.ApplicationDefault()
-        
-    else:
-        print("Firebase credentials not found. App may fail to connect.")
-        # Allow to proceed for environments that might use ADC (like Google Cloud)
-        cred = credentials.ApplicationDefault()
-
-
-    # Initialize the Firebase app
-    try:
-        firebase_admin.initialize_app(cred, options={
-            'projectId': settings.firebase_project_id,
-        })
-        print(f"Firebase App initialized for project: {settings.firebase_project_id}")
-    except ValueError as e:
-        # This can happen if the app is reloaded
-        print(f"Firebase App already initialized: {e}")
+    if not settings.fast_startup:
+        # Long-running workers warm up here instead of on the first request
+        get_firebase_app()
+        get_engine()
+        alternatives_index.start_build()
+    product_refresher.start()
+    favorite_usage_buffer.start()
     yield
     # --- Shutdown ---
-    pass
+    await product_refresher.stop()
+    await favorite_usage_buffer.stop()
+    await alternatives_index.stop()
+    await close_off_client()
 
 app = FastAPI(lifespan=lifespan)
+app.add_middleware(TimingMiddleware, server_timing=settings.server_timing_header)
 app.include_router(auth_router)
+app.include_router(product_router)
+app.include_router(food_entry_router)
+app.include_router(sync_router)
+if metrics_exposed():
+    app.include_router(metrics_router)
 
 # --- Example Endpoints ---
 
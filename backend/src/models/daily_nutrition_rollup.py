@@ -0,0 +1,34 @@
+from datetime import datetime, date, timezone
+from decimal import Decimal
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column as SAColumn, ForeignKey, String
+
+# Columns summed from FoodEntry into each daily rollup
+NUTRITION_FIELDS = ("calories", "protein_g", "carbs_g", "sugar_g", "fiber_g", "fat_g")
+
+class DailyNutritionRollup(SQLModel, table=True):
+    """
+    Per-user, per-day totals of the nutrition columns on FoodEntry.
+
+    Kept up to date incrementally by FoodEntryService in the same transaction
+    as the entry write, so trend queries never have to sum raw entries.
+    """
+    __tablename__ = "daily_nutrition_rollups"
+
+    user_id: str = Field(
+        sa_column=SAColumn(
+            String(128), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+        )
+    )
+    # The entry's local date, in the timezone it was logged in
+    entry_date: date = Field(primary_key=True)
+
+    calories: Decimal = Field(default=Decimal("0"))
+    protein_g: Decimal = Field(default=Decimal("0"))
+    carbs_g: Decimal = Field(default=Decimal("0"))
+    sugar_g: Decimal = Field(default=Decimal("0"))
+    fiber_g: Decimal = Field(default=Decimal("0"))
+    fat_g: Decimal = Field(default=Decimal("0"))
+    entry_count: int = Field(default=0)
+
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -34,7 +34,13 @@ class FoodEntry(SQLModel, table=True):
 
     custom_food_name: Optional[str] = Field(default=None, max_length=255)
     notes: Optional[str] = Field(default=None)
-    created_at: datetime = Field(default_factory=datetime.now(timezone.utc))
+    # The lambda body resolves timezone from the module, not the field above
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # Bumped on every change so clients can sync edits (see SyncService)
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column_kwargs={"onupdate": lambda: datetime.now(timezone.utc)},
+    )
 
     # Relationships
     user: "User" = Relationship(back_populates="food_entries")
@@ -43,4 +49,5 @@ class FoodEntry(SQLModel, table=True):
     __table_args__ = (
         Index("idx_food_entries_user_date", "user_id", "entry_date", postgresql_using=None, postgresql_ops=None),
         Index("idx_food_entries_user_created", "user_id", "created_at"),
+        Index("idx_food_entries_user_updated", "user_id", "updated_at", "id"),
     )
@@ -2,7 +2,7 @@ from datetime import datetime, timezone
 from typing import Optional, List, Dict, Any, TYPE_CHECKING
 from decimal import Decimal
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Index, Column as SAColumn, Text
+from sqlalchemy import DDL, Index, Column as SAColumn, Text, event
 from sqlalchemy.dialects.postgresql import ARRAY as PG_ARRAY, JSONB
 
 if TYPE_CHECKING:
@@ -41,16 +41,18 @@ class Product(SQLModel, table=True):
         default=None, sa_column=SAColumn(JSONB)
     )
     nova_group: Optional[int] = None
-    ecoscore: Optional[str]
+    ecoscore: Optional[str] = None
     allergen_tags: Optional[List[str]] = Field(
         default=None, sa_column=SAColumn(PG_ARRAY(Text()))
     )
-    labels_tag: Optional[List[str]]
+    labels_tag: Optional[List[str]] = Field(
+        default=None, sa_column=SAColumn(PG_ARRAY(Text()))
+    )
 
     # Metadata
     image_url: Optional[str] = None
-    created_at: datetime = Field(default_factory=datetime.now(timezone.utc))
-    updated_at: datetime = Field(default_factory=datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
     # Relationships
     food_entries: List["FoodEntry"] = Relationship(back_populates="product")
@@ -60,5 +62,34 @@ class Product(SQLModel, table=True):
     __table_args__ = (
         Index("idx_products_name", "product_name"),
         Index("idx_products_brand", "brand"),
+        # Trigram indexes serve substring search (ILIKE '%q%') and similarity ranking
+        Index(
+            "idx_products_name_trgm",
+            "product_name",
+            postgresql_using="gin",
+            postgresql_ops={"product_name": "gin_trgm_ops"},
+        ),
+        Index(
+            "idx_products_brand_trgm",
+            "brand",
+            postgresql_using="gin",
+            postgresql_ops={"brand": "gin_trgm_ops"},
+        ),
     )
 
+
+# The trigram indexes need the pg_trgm extension to exist first
+event.listen(
+    Product.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+)
+
+
+# Register the tables Product's relationships point at, so the mapper can be
+# configured wherever Product is imported on its own (services, scripts), and
+# the tombstone listeners that record deletes of synced rows
+from models.food_entry import FoodEntry  # noqa: E402,F401
+from models.sync_tombstone import SyncTombstone  # noqa: E402,F401
+from models.user import User  # noqa: E402,F401
+from models.user_favorites import UserFavorite  # noqa: E402,F401
@@ -0,0 +1,47 @@
+from datetime import datetime, timezone
+from typing import Optional
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index, Column as SAColumn, ForeignKey, String, event, insert
+from models.food_entry import FoodEntry
+from models.user_favorites import UserFavorite
+
+# Entity names as they appear in sync responses
+FOOD_ENTRY = "food_entry"
+USER_FAVORITE = "user_favorite"
+
+class SyncTombstone(SQLModel, table=True):
+    """
+    Record of a deleted FoodEntry or UserFavorite, so offline clients that
+    sync later learn about the delete. Pruned after sync_tombstone_retention_days.
+    """
+    __tablename__ = "sync_tombstones"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: str = Field(
+        sa_column=SAColumn(String(128), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    )
+    entity: str = Field(max_length=20, nullable=False)
+    entity_id: int = Field(nullable=False)
+    deleted_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        Index("idx_sync_tombstones_user_deleted", "user_id", "deleted_at", "id"),
+    )
+
+
+def _record_delete(entity: str):
+    def listener(mapper, connection, target) -> None:
+        # Runs inside the deleting flush, so the tombstone commits with the delete
+        connection.execute(
+            insert(SyncTombstone.__table__).values(
+                user_id=target.user_id,
+                entity=entity,
+                entity_id=target.id,
+                deleted_at=datetime.now(timezone.utc),
+            )
+        )
+    return listener
+
+
+event.listen(FoodEntry, "after_delete", _record_delete(FOOD_ENTRY))
+event.listen(UserFavorite, "after_delete", _record_delete(USER_FAVORITE))
@@ -22,8 +22,13 @@ class UserFavorite(SQLModel, table=True):
 
     usage_count: int = Field(default=0)
 
-    last_used: datetime = Field(default_factory=datetime.now(timezone.utc))
-    created_at: datetime = Field(default_factory=datetime.now(timezone.utc))
+    last_used: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # Bumped on every change so clients can sync edits (see SyncService)
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column_kwargs={"onupdate": lambda: datetime.now(timezone.utc)},
+    )
 
     user: "User" = Relationship(back_populates="user_favorites")
     product: Optional["Product"] = Relationship(back_populates="favorites")
@@ -31,4 +36,5 @@ class UserFavorite(SQLModel, table=True):
     __table_args__ = (
         UniqueConstraint("user_id", "barcode", name="uq_user_favorites_user_barcode"),
         Index("idx_favorites_user", "user_id", "usage_count"),
+        Index("idx_favorites_user_updated", "user_id", "updated_at", "id"),
     )
\ No newline at end of file
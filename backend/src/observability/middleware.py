@@ -0,0 +1,55 @@
+import time
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from observability.metrics import metrics
+from observability.spans import begin_request
+
+request_seconds = metrics.histogram(
+    "skineats_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+)
+
+
+class TimingMiddleware:
+    """
+    Times every HTTP request and adds a Server-Timing header.
+
+    Plain ASGI rather than BaseHTTPMiddleware, so streaming responses pass
+    straight through. Spans recorded while the request runs (see
+    observability.spans) end up in the header as long as they finish before
+    the response starts.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = True):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = begin_request()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", timings.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            # The route template, not the raw path, keeps label cardinality bounded
+            route = scope.get("route")
+            request_seconds.observe(
+                time.perf_counter() - timings.started,
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status_code),
+            )
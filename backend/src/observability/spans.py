@@ -0,0 +1,65 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+from observability.metrics import metrics
+
+span_seconds = metrics.histogram(
+    "skineats_span_duration_seconds",
+    "Time spent in instrumented sections (auth, db, db_pool, off)",
+    ("span",),
+)
+
+
+class RequestTimings:
+    """Span durations of one request, summed per span name."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        # name -> [seconds, occurrences]
+        self.spans: Dict[str, List[float]] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        entry = self.spans.get(name)
+        if entry is None:
+            self.spans[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, durations in milliseconds."""
+        parts = []
+        for name, (seconds, count) in self.spans.items():
+            part = f"{name};dur={seconds * 1000:.1f}"
+            if count > 1:
+                part += f';desc="{count:.0f}x"'
+            parts.append(part)
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current_request: ContextVar[Optional[RequestTimings]] = ContextVar("current_request_timings", default=None)
+
+
+def begin_request() -> RequestTimings:
+    timings = RequestTimings()
+    _current_request.set(timings)
+    return timings
+
+
+def record_span(name: str, seconds: float) -> None:
+    """Add a finished span to the histograms and to the current request, if any."""
+    span_seconds.observe(seconds, name)
+    timings = _current_request.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, time.perf_counter() - started)
@@ -1,6 +1,8 @@
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, Depends
-from sqlmodel import select
+from sqlalchemy import exists, false, literal_column, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from config.settings import settings
 from auth.auth import get_current_user
 from models.user import User
 from db.db import get_db
@@ -19,38 +21,25 @@ async def sync_user(
 ):
     """
     Sync a Firebase-authenticated user into the local SQLAlchemy database.
-    If user already exists, update their updated_at timestamp.
+    If user already exists, update their updated_at timestamp (at most once
+    per user_sync_coalesce_minutes).
     """
     uid = decoded_token.get("uid")
     user_email = decoded_token.get("email")
     user_display_name = decoded_token.get("name")
 
-    result = await db.execute(select(User).where(User.id == uid))
-    user = result.scalar_one_or_none()
-    if not user:
-        new_user = User(
-            id=uid,
-            email=user_email,
-            display_name=user_display_name,
-            created_at=datetime.now(datetime.UTC),
-            updated_at=datetime.now(datetime.UTC),
+    result = await db.execute(build_sync_user_statement(uid, user_email, user_display_name))
+    user = result.one_or_none()
+    if user is None:
+        # A concurrent first sync inserted the row after this statement's
+        # snapshot was taken; a new statement can see it
+        result = await db.execute(
+            select(User.id, User.email, User.display_name, false().label("inserted")).where(User.id == uid)
         )
-        db.add(new_user)
-        await db.commit()
-        await db.refresh(new_user)
-        return {
-            "status": "created",
-            "user": {
-                "id": new_user.id,
-                "email": new_user.email,
-                "display_name": new_user.display_name,
-            },
-        }
-    user.updated_at = datetime.now(datetime.UTC)
-    db.add(user)
+        user = result.one()
     await db.commit()
     return {
-        "status": "exists",
+        "status": "created" if user.inserted else "exists",
         "user": {
             "id": user.id,
             "email": user.email,
@@ -58,4 +47,53 @@ async def sync_user(
         },
     }
 
-    
\ No newline at end of file
+
+def build_sync_user_statement(uid: str, email: str, display_name: str):
+    """
+    Build a single statement that inserts the user or bumps updated_at.
+
+    updated_at is only rewritten when it is older than the configured
+    coalescing window, so most app launches don't write at all. The upsert
+    returns nothing when it skips the update, so the existing row is read
+    back in the same statement. That read uses the statement's snapshot, so
+    it comes back empty when a concurrent sync inserted the row; sync_user
+    then reads it again.
+    """
+    now = datetime.now(timezone.utc)
+    coalesce_before = now - timedelta(minutes=settings.user_sync_coalesce_minutes)
+
+    insert_statement = pg_insert(User).values(
+        id=uid,
+        email=email,
+        display_name=display_name,
+        created_at=now,
+        updated_at=now,
+    )
+    upserted = insert_statement.on_conflict_do_update(
+        index_elements=[User.id],
+        set_={"updated_at": insert_statement.excluded.updated_at},
+        where=User.updated_at < coalesce_before,
+    ).returning(
+        User.id,
+        User.email,
+        User.display_name,
+        # xmax is 0 only for rows this statement inserted
+        literal_column("xmax = 0").label("inserted"),
+    ).cte("upserted")
+
+    return select(
+        upserted.c.id,
+        upserted.c.email,
+        upserted.c.display_name,
+        upserted.c.inserted,
+    ).union_all(
+        select(
+            User.id,
+            User.email,
+            User.display_name,
+            false().label("inserted"),
+        ).where(
+            User.id == uid,
+            ~exists(select(upserted.c.id)),
+        )
+    )
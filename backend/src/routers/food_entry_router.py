@@ -0,0 +1,136 @@
+from datetime import date
+from typing import List, Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from auth.auth import get_current_user
+from config.settings import settings
+from db.db import get_db
+from dtos.food_entry_request import FoodEntryBatchCreate, FoodEntryCreate, FoodEntryUpdate
+from dtos.food_entry_response import DailyNutritionResponse, FoodEntryResponse
+from services.clients.open_food_facts_client import OpenFoodFactsUnavailable
+from services.export_service import EXPORT_FORMATS, ExportService
+from services.food_entry_service import FoodEntryService
+
+
+router = APIRouter(
+    prefix="/food-entries",
+    tags=["food entries"]
+)
+
+def get_food_entry_service(db: AsyncSession = Depends(get_db)) -> FoodEntryService:
+    return FoodEntryService(db)
+
+@router.post("", response_model=FoodEntryResponse, status_code=status.HTTP_201_CREATED)
+async def create_food_entry(
+    request: FoodEntryCreate,
+    decoded_token: dict = Depends(get_current_user),
+    service: FoodEntryService = Depends(get_food_entry_service),
+):
+    try:
+        return await service.create_entry(decoded_token["uid"], request)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except OpenFoodFactsUnavailable:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Product lookup is temporarily unavailable",
+            headers={"Retry-After": "30"},
+        )
+
+@router.post("/batch", response_model=List[FoodEntryResponse], status_code=status.HTTP_201_CREATED)
+async def create_food_entries(
+    request: FoodEntryBatchCreate,
+    decoded_token: dict = Depends(get_current_user),
+    service: FoodEntryService = Depends(get_food_entry_service),
+):
+    """
+    Log several items at once, e.g. a meal.
+    Macros are computed from each product's per-100g values times servings.
+    """
+    try:
+        return await service.create_entries(decoded_token["uid"], request)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("", response_model=List[FoodEntryResponse])
+async def list_food_entries(
+    entry_date: date,
+    decoded_token: dict = Depends(get_current_user),
+    service: FoodEntryService = Depends(get_food_entry_service),
+):
+    """Entries logged on one (local) day."""
+    return await service.get_entries_for_date(decoded_token["uid"], entry_date)
+
+@router.get("/daily", response_model=List[DailyNutritionResponse])
+async def get_daily_nutrition(
+    start: date = Query(),
+    end: date = Query(),
+    decoded_token: dict = Depends(get_current_user),
+    service: FoodEntryService = Depends(get_food_entry_service),
+):
+    """
+    Per-day nutrition totals between start and end inclusive.
+    Days without entries are omitted.
+    """
+    if end < start:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end is before start")
+    if (end - start).days >= settings.nutrition_range_max_days:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range is limited to {settings.nutrition_range_max_days} days",
+        )
+    return await service.get_daily_totals(decoded_token["uid"], start, end)
+
+@router.get("/export")
+async def export_food_log(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    gzip: bool = False,
+    decoded_token: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Download the user's whole food log, oldest day first.
+    Streamed straight from the database, so any history size is fine.
+    """
+    _, media_type, extension = EXPORT_FORMATS[format]
+    filename = f"food-log.{extension}"
+    if gzip:
+        media_type = "application/gzip"
+        filename += ".gz"
+    return StreamingResponse(
+        ExportService(db).export(decoded_token["uid"], format, compress=gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@router.patch("/{entry_id}", response_model=FoodEntryResponse)
+async def update_food_entry(
+    entry_id: int,
+    request: FoodEntryUpdate,
+    decoded_token: dict = Depends(get_current_user),
+    service: FoodEntryService = Depends(get_food_entry_service),
+):
+    try:
+        entry = await service.update_entry(decoded_token["uid"], entry_id, request)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if entry is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Food entry not found: {entry_id}",
+        )
+    return entry
+
+@router.delete("/{entry_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_food_entry(
+    entry_id: int,
+    decoded_token: dict = Depends(get_current_user),
+    service: FoodEntryService = Depends(get_food_entry_service),
+):
+    if not await service.delete_entry(decoded_token["uid"], entry_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Food entry not found: {entry_id}",
+        )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
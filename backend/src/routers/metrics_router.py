@@ -0,0 +1,46 @@
+import secrets
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from config.settings import settings
+from db.db import get_pool_metrics
+from observability.metrics import metrics, render_gauges
+from services.alternatives_index import alternatives_index
+from services.clients.circuit_breaker import CircuitBreaker
+from services.clients.open_food_facts_client import current_off_client
+from services.favorite_usage_buffer import favorite_usage_buffer
+from services.product_cache import product_cache
+from services.product_refresher import product_refresher
+from services.product_response_cache import product_response_cache
+
+
+router = APIRouter(tags=["metrics"])
+
+def metrics_exposed() -> bool:
+    """Whether the app should serve /metrics at all; see metrics_token_required."""
+    return bool(settings.metrics_token) or not settings.metrics_token_required
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics(authorization: Optional[str] = Header(default=None)):
+    """Prometheus text exposition of request/span histograms and component stats."""
+    if settings.metrics_token and not secrets.compare_digest(
+        authorization or "", f"Bearer {settings.metrics_token}"
+    ):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+
+    off_client = current_off_client()
+    lines = metrics.render()
+    lines.extend(render_gauges("skineats_product_cache", product_cache.stats(), "Product cache stats"))
+    lines.extend(render_gauges("skineats_product_response_cache", product_response_cache.stats(), "Serialized product response cache stats"))
+    lines.extend(render_gauges("skineats_db_pool", get_pool_metrics(), "Connection pool stats"))
+    if off_client is not None:
+        lines.extend(render_gauges("skineats_off_client", off_client.stats, "Open Food Facts client stats"))
+        lines.extend(render_gauges(
+            "skineats_off_breaker",
+            {"open": off_client.breaker.state != CircuitBreaker.CLOSED, "opened": off_client.breaker.opened},
+            "Open Food Facts circuit breaker",
+        ))
+    lines.extend(render_gauges("skineats_product_refresher", product_refresher.stats, "Background refresh stats"))
+    lines.extend(render_gauges("skineats_favorite_usage", favorite_usage_buffer.stats, "Favorite usage write-behind stats"))
+    lines.extend(render_gauges("skineats_alternatives_index", alternatives_index.stats(), "Alternatives index stats"))
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
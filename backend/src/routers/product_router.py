@@ -0,0 +1,155 @@
+import json
+from typing import AsyncIterator, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from auth.auth import get_current_user
+from config.settings import settings
+from db.db import get_db
+from dtos.batch_product_request import BatchProductRequest
+from dtos.product_response import ProductResponse
+from services.clients.open_food_facts_client import OpenFoodFactsUnavailable
+from services.product_response_cache import IDENTITY, etag_matches, product_response_cache, product_responses
+from services.product_service import ProductService
+
+
+router = APIRouter(
+    prefix="/products",
+    tags=["products"]
+)
+
+async def get_product_service(db: AsyncSession = Depends(get_db)):
+    service = ProductService(db)
+    try:
+        yield service
+    finally:
+        await service.close()
+
+@router.post("/batch")
+async def get_products_batch(
+    request: BatchProductRequest,
+    decoded_token: dict = Depends(get_current_user),
+    service: ProductService = Depends(get_product_service),
+):
+    """
+    Look up many barcodes in one request.
+    Results are streamed as newline-delimited JSON, one line per barcode,
+    in the order they become available rather than the order requested.
+    """
+    async def stream() -> AsyncIterator[str]:
+        async for barcode, product in service.iter_products_by_barcodes(request.barcodes):
+            line = {
+                "barcode": barcode,
+                "found": product is not None,
+                "product": (
+                    ProductResponse.model_validate(product).model_dump(mode="json")
+                    if product is not None else None
+                ),
+            }
+            yield json.dumps(line) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@router.get("/search")
+async def search_products(
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = None,
+    decoded_token: dict = Depends(get_current_user),
+    service: ProductService = Depends(get_product_service),
+):
+    """
+    Search products by name or brand.
+    Pass the returned next_cursor back to fetch the following page; offset
+    is still accepted for older clients but gets slower the deeper it goes.
+    """
+    if offset and not cursor:
+        products = await service.search_products(q, limit=limit, offset=offset)
+        next_cursor = None
+    else:
+        try:
+            products, next_cursor = await service.search_products_page(q, limit=limit, cursor=cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {
+        "items": [ProductResponse.model_validate(product) for product in products],
+        "next_cursor": next_cursor,
+    }
+
+@router.get("/{barcode}/alternatives")
+async def get_product_alternatives(
+    barcode: str,
+    limit: int = Query(default=5, ge=1, le=settings.alternatives_max_results),
+    decoded_token: dict = Depends(get_current_user),
+    service: ProductService = Depends(get_product_service),
+):
+    """
+    Healthier alternatives to a product: similar nutrients, same category,
+    better skin score or NOVA group. Nearest first.
+    """
+    try:
+        product = await service.get_product_by_barcode(barcode)
+    except OpenFoodFactsUnavailable:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Product lookup is temporarily unavailable",
+            headers={"Retry-After": "30"},
+        )
+    if not product:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Product not found: {barcode}",
+        )
+    alternatives = await service.get_alternatives(product, limit=limit)
+    return {
+        "items": [
+            {"product": ProductResponse.model_validate(alternative_product), "distance": alternative.distance}
+            for alternative_product, alternative in alternatives
+        ],
+    }
+
+@router.get("/{barcode}", response_model=ProductResponse)
+async def get_product(
+    barcode: str,
+    request: Request,
+    decoded_token: dict = Depends(get_current_user),
+    service: ProductService = Depends(get_product_service),
+):
+    """
+    Look up a product by barcode.
+    Send the returned ETag back in If-None-Match to get a bodiless 304 while
+    the product is unchanged. Accept: application/msgpack and gzip/br
+    Accept-Encoding are honoured.
+    """
+    try:
+        product = await service.get_product_by_barcode(barcode)
+    except OpenFoodFactsUnavailable:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Product lookup is temporarily unavailable",
+            headers={"Retry-After": "30"},
+        )
+    if not product:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Product not found: {barcode}",
+        )
+
+    etag, media_type, coding = product_response_cache.representation(
+        product, request.headers.get("accept"), request.headers.get("accept-encoding")
+    )
+    headers = {
+        "ETag": etag,
+        "Vary": "Accept, Accept-Encoding",
+        # Clients may keep it but must revalidate, which is what the ETag is for
+        "Cache-Control": "private, no-cache",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        product_responses.inc("not_modified")
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    encoded = product_response_cache.get(product, etag, media_type, coding)
+    if coding != IDENTITY:
+        headers["Content-Encoding"] = coding
+    return Response(encoded.body, media_type=media_type, headers=headers)
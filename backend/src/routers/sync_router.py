@@ -0,0 +1,44 @@
+import json
+from typing import AsyncIterator, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from auth.auth import get_current_user
+from config.settings import settings
+from db.db import get_db
+from services.sync_service import SyncService, decode_sync_cursor
+
+
+router = APIRouter(
+    prefix="/sync",
+    tags=["sync"]
+)
+
+@router.get("")
+async def sync_changes(
+    cursor: Optional[str] = None,
+    limit: int = Query(default=500, ge=1, le=settings.sync_page_max_size),
+    decoded_token: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Food entries and favorites changed since `cursor`, as newline-delimited JSON.
+
+    Omit the cursor for a full sync. Lines are {"type": "food_entry" |
+    "user_favorite", "data": ...} and {"type": "deleted", "entity", "id"},
+    then a final {"type": "cursor", "cursor", "has_more"}; call again with that
+    cursor while has_more is true. A {"type": "reset"} line means the cursor
+    is too old and the client has to drop its copy and sync from scratch.
+    """
+    try:
+        position = decode_sync_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    service = SyncService(db)
+
+    async def stream() -> AsyncIterator[str]:
+        async for change in service.iter_changes(decoded_token["uid"], position, limit):
+            yield json.dumps(change) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
@@ -0,0 +1,35 @@
+"""
+Build the ingredient matcher once and save it as a JSON artifact.
+
+Point INGREDIENT_MATCHER_ARTIFACT at the output file and every process
+loads the compiled automaton at startup instead of rebuilding it.
+
+Usage (from backend/src):
+    python -m scripts.build_ingredient_matcher ingredient_matcher.json
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ingredient_matcher import IngredientMatcher
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the ingredient matcher artifact")
+    parser.add_argument("output", help="Where to write the artifact")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    matcher = IngredientMatcher()
+    matcher.save(args.output)
+    print(
+        f"Wrote {len(matcher.concepts)} concepts to {args.output} "
+        f"in {(time.perf_counter() - started) * 1000:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
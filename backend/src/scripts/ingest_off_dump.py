@@ -0,0 +1,256 @@
+"""
+Bulk-load an Open Food Facts data dump into the products table.
+
+Streams the JSONL or CSV export (optionally gzipped) record by record, so
+memory stays flat regardless of dump size. Every record goes through the
+same normalization and skin scoring as live lookups and is written with
+batched upserts. Progress is checkpointed after each committed batch so an
+interrupted run can pick up where it left off.
+
+Usage (from backend/src):
+    python -m scripts.ingest_off_dump openfoodfacts-products.jsonl.gz
+    python -m scripts.ingest_off_dump en.openfoodfacts.org.products.csv.gz --batch-size 2000
+    python -m scripts.ingest_off_dump ../tests/fixtures/off_dump.jsonl --dry-run
+"""
+import argparse
+import asyncio
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orjson
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from models.product import Product
+from services.clients.off_normalizer import normalize_product
+from services.ingredient_matcher import with_detected_allergens
+from services.skin_score_engine import skin_score_engine
+
+logger = logging.getLogger(__name__)
+
+# Nutriment columns as they appear in the OFF CSV export
+CSV_NUTRIMENT_COLUMNS = (
+    "energy-kcal_100g",
+    "proteins_100g",
+    "carbohydrates_100g",
+    "sugars_100g",
+    "fiber_100g",
+    "fat_100g",
+    "saturated-fat_100g",
+    "sodium_100g",
+)
+CSV_TAG_COLUMNS = ("categories_tags", "allergens_tags", "labels_tags")
+
+# Columns that an upsert must not overwrite on an existing row
+_IMMUTABLE_COLUMNS = {"barcode", "created_at"}
+# asyncpg binds at most this many parameters per statement, so a batch is
+# written as several upserts of at most MAX_BIND_PARAMETERS // columns rows
+MAX_BIND_PARAMETERS = 32_767
+
+
+def _open_dump(path: str) -> io.TextIOBase:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace", newline="")
+    return open(path, "rt", encoding="utf-8", errors="replace", newline="")
+
+
+def _csv_ingredients(text: str) -> List[Dict[str, str]]:
+    """
+    Split an ingredients_text value into the API's ingredients shape.
+
+    Only top-level commas and semicolons separate ingredients, so
+    "chocolate (sugar, milk), salt" keeps its sub-ingredients together.
+    OFF marks allergens as _milk_; the underscores are dropped.
+    """
+    ingredients = []
+    depth = 0
+    current: List[str] = []
+    for char in text.replace("_", ""):
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth = max(depth - 1, 0)
+        elif char in ",;" and depth == 0:
+            ingredients.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    ingredients.append("".join(current))
+    return [{"text": ingredient.strip()} for ingredient in ingredients if ingredient.strip()]
+
+
+def _csv_row_to_raw(row: Dict[str, str]) -> Dict[str, Any]:
+    """Reshape a flat CSV export row into the nested API document shape."""
+    raw: Dict[str, Any] = {key: value for key, value in row.items() if value}
+    nutriments = {}
+    for column in CSV_NUTRIMENT_COLUMNS:
+        value = row.get(column)
+        if value:
+            try:
+                nutriments[column] = float(value)
+            except ValueError:
+                pass
+    raw["nutriments"] = nutriments
+    for column in CSV_TAG_COLUMNS:
+        value = row.get(column)
+        raw[column] = value.split(",") if value else []
+    # The export has no parsed ingredients, only the label text
+    raw["ingredients"] = _csv_ingredients(row.get("ingredients_text") or "")
+    return raw
+
+
+def iter_raw_products(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield raw OFF product documents one at a time from a dump file."""
+    name = path[:-3] if path.endswith(".gz") else path
+    with _open_dump(path) as handle:
+        if name.endswith((".csv", ".tsv")):
+            csv.field_size_limit(sys.maxsize)
+            # The official export is tab separated despite its extension
+            for row in csv.DictReader(handle, delimiter="\t", quoting=csv.QUOTE_NONE):
+                yield _csv_row_to_raw(row)
+        else:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    logger.warning("Skipping malformed JSON line")
+                    # Keep the record count aligned with the checkpoint
+                    yield {}
+
+
+def _load_checkpoint(checkpoint_path: str, dump_path: str) -> int:
+    if not os.path.exists(checkpoint_path):
+        return 0
+    with open(checkpoint_path) as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("dump") != os.path.abspath(dump_path):
+        logger.warning("Checkpoint belongs to a different dump, starting from scratch")
+        return 0
+    return int(checkpoint.get("records", 0))
+
+
+def _save_checkpoint(checkpoint_path: str, dump_path: str, records: int) -> None:
+    tmp_path = f"{checkpoint_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"dump": os.path.abspath(dump_path), "records": records}, f)
+    os.replace(tmp_path, checkpoint_path)
+
+
+def _upsert_statement(rows: List[Dict[str, Any]]):
+    statement = pg_insert(Product).values(rows)
+    return statement.on_conflict_do_update(
+        index_elements=[Product.barcode],
+        set_={
+            column: statement.excluded[column]
+            for column in rows[0]
+            if column not in _IMMUTABLE_COLUMNS
+        },
+    )
+
+
+async def ingest(
+    dump_path: str,
+    batch_size: int = 1000,
+    checkpoint_path: Optional[str] = None,
+    dry_run: bool = False,
+) -> Dict[str, float]:
+    """
+    Stream a dump into the products table.
+
+    Returns counters for the run: records read, rows written, records
+    skipped (no barcode) and throughput in rows/sec.
+    """
+    checkpoint_path = checkpoint_path or f"{dump_path}.checkpoint.json"
+    resume_from = _load_checkpoint(checkpoint_path, dump_path)
+    if resume_from:
+        logger.info(f"Resuming after {resume_from} records")
+
+    session_factory = None
+    if not dry_run:
+        # Imported lazily so --dry-run works without a database
+        from db.db import AsyncSessionLocal
+        session_factory = AsyncSessionLocal
+
+    records = 0
+    written = 0
+    skipped = 0
+    # Keyed by barcode: a single upsert can't touch the same row twice
+    batch: Dict[str, Dict[str, Any]] = {}
+    started = time.perf_counter()
+
+    async def flush() -> None:
+        nonlocal written
+        rows = list(batch.values())
+        for row, evaluation in zip(rows, skin_score_engine.evaluate(rows)):
+            row["skin_score"] = evaluation.skin_score
+            row["skin_score_breakdown"] = evaluation.breakdown
+            row["allergen_tags"] = with_detected_allergens(row["allergen_tags"], evaluation.allergens)
+        if rows and session_factory is not None:
+            chunk_size = MAX_BIND_PARAMETERS // len(rows[0])
+            async with session_factory() as session:
+                for start in range(0, len(rows), chunk_size):
+                    await session.execute(_upsert_statement(rows[start:start + chunk_size]))
+                await session.commit()
+        written += len(batch)
+        batch.clear()
+        if not dry_run:
+            _save_checkpoint(checkpoint_path, dump_path, records)
+        elapsed = time.perf_counter() - started
+        logger.info(f"{records} records read, {written} rows written ({written / elapsed:.0f} rows/sec)")
+
+    for raw_product in iter_raw_products(dump_path):
+        records += 1
+        if records <= resume_from:
+            continue
+        row = normalize_product(raw_product)
+        if not row["barcode"]:
+            skipped += 1
+            continue
+        row["barcode"] = row["barcode"][:50]
+        row["created_at"] = row["updated_at"] = datetime.now(timezone.utc)
+        batch[row["barcode"]] = row
+        if len(batch) >= batch_size:
+            await flush()
+    await flush()
+
+    elapsed = time.perf_counter() - started
+    stats = {
+        "records": records,
+        "written": written,
+        "skipped": skipped,
+        "seconds": elapsed,
+        "rows_per_sec": written / elapsed if elapsed else 0.0,
+    }
+    logger.info(
+        f"Done: {written} rows in {elapsed:.1f}s ({stats['rows_per_sec']:.0f} rows/sec), "
+        f"{skipped} records skipped"
+    )
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ingest an Open Food Facts dump into products")
+    parser.add_argument("dump", help="Path to a .jsonl/.csv dump, optionally .gz")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <dump>.checkpoint.json)")
+    parser.add_argument("--dry-run", action="store_true", help="Parse and normalize only, don't write")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    stats = asyncio.run(ingest(args.dump, args.batch_size, args.checkpoint, args.dry_run))
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
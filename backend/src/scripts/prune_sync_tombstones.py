@@ -0,0 +1,36 @@
+"""
+Delete sync tombstones older than sync_tombstone_retention_days.
+
+Clients whose cursor predates the cutoff are told to do a full sync, so the
+tombstones are no longer needed. Run this periodically, e.g. daily.
+
+Usage (from backend/src):
+    python -m scripts.prune_sync_tombstones
+"""
+import asyncio
+import logging
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.db import AsyncSessionLocal
+from services.sync_service import SyncService
+
+logger = logging.getLogger(__name__)
+
+
+async def prune() -> int:
+    async with AsyncSessionLocal() as session:
+        pruned = await SyncService(session).prune_tombstones()
+    logger.info(f"Pruned {pruned} sync tombstones")
+    return pruned
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    asyncio.run(prune())
+
+
+if __name__ == "__main__":
+    main()
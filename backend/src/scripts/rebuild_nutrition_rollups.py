@@ -0,0 +1,44 @@
+"""
+Rebuild daily_nutrition_rollups from the raw food entries.
+
+The rollups are maintained incrementally by FoodEntryService; run this once
+to backfill entries logged before the table existed, or to repair a user
+whose totals have drifted.
+
+Usage (from backend/src):
+    python -m scripts.rebuild_nutrition_rollups
+    python -m scripts.rebuild_nutrition_rollups --user-id <firebase uid>
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from typing import Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.db import AsyncSessionLocal
+from services.food_entry_service import FoodEntryService
+
+logger = logging.getLogger(__name__)
+
+
+async def rebuild(user_id: Optional[str] = None) -> int:
+    async with AsyncSessionLocal() as session:
+        days = await FoodEntryService(session).rebuild_rollups(user_id)
+    logger.info(f"Rebuilt {days} daily rollups")
+    return days
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild daily nutrition rollups from food entries")
+    parser.add_argument("--user-id", help="Only rebuild this user's rollups")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    asyncio.run(rebuild(args.user_id))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Recompute skin_score and skin_score_breakdown for every product, and add
+allergens detected in the ingredients to allergen_tags.
+
+Run this after changing the rules in services/skin_score_engine.py or the
+concepts in services/ingredient_matcher.py. Products
+are read in barcode order a page at a time (only the columns the rules look
+at), scored as one batch per page and written back with a bulk UPDATE by
+primary key.
+
+Usage (from backend/src):
+    python -m scripts.rescore_products
+    python -m scripts.rescore_products --batch-size 10000
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, update
+from db.db import AsyncSessionLocal
+from models.product import Product
+from services.ingredient_matcher import with_detected_allergens
+from services.skin_score_engine import skin_score_engine
+
+logger = logging.getLogger(__name__)
+
+SCORED_COLUMNS = (
+    Product.barcode,
+    Product.sugar_100g,
+    Product.saturated_fat_100g,
+    Product.sodium_100g,
+    Product.fiber_100g,
+    Product.nova_group,
+    Product.ingredient_list,
+    Product.allergen_tags,
+)
+
+
+async def rescore_all(batch_size: int = 5000) -> int:
+    rescored = 0
+    last_barcode = ""
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as session:
+        while True:
+            result = await session.execute(
+                select(*SCORED_COLUMNS)
+                .where(Product.barcode > last_barcode)
+                .order_by(Product.barcode)
+                .limit(batch_size)
+            )
+            rows = [dict(row) for row in result.mappings()]
+            if not rows:
+                break
+
+            evaluations = skin_score_engine.evaluate(rows)
+            await session.execute(
+                update(Product),
+                [
+                    {
+                        "barcode": row["barcode"],
+                        "skin_score": evaluation.skin_score,
+                        "skin_score_breakdown": evaluation.breakdown,
+                        "allergen_tags": with_detected_allergens(row["allergen_tags"], evaluation.allergens),
+                    }
+                    for row, evaluation in zip(rows, evaluations)
+                ],
+            )
+            await session.commit()
+
+            rescored += len(rows)
+            last_barcode = rows[-1]["barcode"]
+            elapsed = time.perf_counter() - started
+            logger.info(f"{rescored} products rescored ({rescored / elapsed:.0f} products/sec)")
+    return rescored
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recompute skin scores for all products")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    asyncio.run(rescore_all(args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
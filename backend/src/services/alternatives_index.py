@@ -0,0 +1,293 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlmodel import select
+
+from config.settings import settings
+from db.db import AsyncSessionLocal
+from models.product import Product
+from .skin_score_engine import ProductLike
+
+# numpy is imported where it is used, so loading the app doesn't pay for it
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Nutrient columns of the vectors, each divided by a typical spread so that
+# kcal doesn't drown out everything measured in grams
+NUTRIENT_SCALES: Tuple[Tuple[str, float], ...] = (
+    ("kcalories_100g", 100.0),
+    ("protein_100g", 10.0),
+    ("carbs_100g", 15.0),
+    ("sugar_100g", 10.0),
+    ("fiber_100g", 3.0),
+    ("fat_100g", 10.0),
+    ("saturated_fat_100g", 5.0),
+    ("sodium_100g", 0.5),
+)
+_COLUMNS = tuple(column for column, _ in NUTRIENT_SCALES)
+_SCALES = tuple(scale for _, scale in NUTRIENT_SCALES)
+
+# Stand-ins for missing values: unknown scores are never "better", and an
+# unknown NOVA group counts as worse than 4
+_NO_SKIN_SCORE = -1
+_NO_NOVA_GROUP = 5
+
+# Columns read when building the index from the database
+INDEX_COLUMNS = (
+    Product.barcode,
+    Product.categories,
+    Product.skin_score,
+    Product.nova_group,
+    *(getattr(Product, column) for column in _COLUMNS),
+)
+
+
+@dataclass(frozen=True)
+class Alternative:
+    barcode: str
+    distance: float
+    skin_score: Optional[int]
+    nova_group: Optional[int]
+
+
+def _field(product: ProductLike, name: str) -> Any:
+    return product.get(name) if isinstance(product, dict) else getattr(product, name)
+
+
+def nutrient_vectors(products: Sequence[ProductLike]) -> "np.ndarray":
+    """Scaled float32 nutrient matrix, one row per product; missing values are 0."""
+    import numpy as np
+
+    matrix = np.array(
+        [[float(_field(product, column) or 0) for column in _COLUMNS] for product in products],
+        dtype=np.float32,
+    ).reshape(len(products), len(_COLUMNS))
+    return matrix / np.array(_SCALES, dtype=np.float32)
+
+
+class _CategoryPartition:
+    """Products of one category as parallel arrays, grown by doubling."""
+
+    def __init__(self, capacity: int = 16):
+        import numpy as np
+
+        self.vectors = np.empty((capacity, len(_COLUMNS)), dtype=np.float32)
+        self.skin_scores = np.empty(capacity, dtype=np.int16)
+        self.nova_groups = np.empty(capacity, dtype=np.int8)
+        self.barcodes: List[str] = []
+        self.rows: Dict[str, int] = {}
+
+    @property
+    def size(self) -> int:
+        return len(self.barcodes)
+
+    def upsert(self, barcode: str, vector: "np.ndarray", skin_score: int, nova_group: int) -> None:
+        row = self.rows.get(barcode)
+        if row is None:
+            row = self.size
+            if row == len(self.vectors):
+                self._grow(row * 2)
+            self.barcodes.append(barcode)
+            self.rows[barcode] = row
+        self.vectors[row] = vector
+        self.skin_scores[row] = skin_score
+        self.nova_groups[row] = nova_group
+
+    def remove(self, barcode: str) -> None:
+        row = self.rows.pop(barcode, None)
+        if row is None:
+            return
+        # Move the last row into the hole
+        last = self.size - 1
+        moved = self.barcodes.pop()
+        if row != last:
+            self.barcodes[row] = moved
+            self.rows[moved] = row
+            self.vectors[row] = self.vectors[last]
+            self.skin_scores[row] = self.skin_scores[last]
+            self.nova_groups[row] = self.nova_groups[last]
+
+    def nbytes(self) -> int:
+        return self.vectors.nbytes + self.skin_scores.nbytes + self.nova_groups.nbytes
+
+    def _grow(self, capacity: int) -> None:
+        import numpy as np
+
+        self.vectors = np.resize(self.vectors, (capacity, len(_COLUMNS)))
+        self.skin_scores = np.resize(self.skin_scores, capacity)
+        self.nova_groups = np.resize(self.nova_groups, capacity)
+
+
+class AlternativesIndex:
+    """
+    In-memory nearest-neighbour index for "healthier alternative" suggestions.
+
+    Every product is stored once per category as a scaled float32 vector of
+    its *_100g nutrients. A query takes the scanned product's categories from
+    most to least specific, keeps the products there with a better skin_score
+    or NOVA group (and no worse on the other), and ranks them by squared
+    euclidean distance, all as array operations over one partition.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._partitions: Dict[str, _CategoryPartition] = {}
+        self._categories: Dict[str, Tuple[str, ...]] = {}
+        self._build_task: Optional[asyncio.Task] = None
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._categories)
+
+    def add(self, product: ProductLike) -> None:
+        self.add_many([product])
+
+    def add_many(self, products: Sequence[ProductLike]) -> None:
+        """Insert or update products, e.g. after they were fetched or refreshed."""
+        if not self.enabled or not products:
+            return
+        vectors = nutrient_vectors(products)
+        for product, vector in zip(products, vectors):
+            barcode = _field(product, "barcode")
+            categories = tuple(dict.fromkeys(_field(product, "categories") or ()))
+            for category in set(self._categories.get(barcode, ())) - set(categories):
+                self._partitions[category].remove(barcode)
+            if not categories:
+                self._categories.pop(barcode, None)
+                continue
+            skin_score, nova_group = _ranking_values(product)
+            for category in categories:
+                partition = self._partitions.get(category)
+                if partition is None:
+                    partition = self._partitions[category] = _CategoryPartition()
+                partition.upsert(barcode, vector, skin_score, nova_group)
+            self._categories[barcode] = categories
+
+    def query(self, product: ProductLike, k: int = 5) -> List[Alternative]:
+        """
+        Up to k products similar to `product` that score better, nearest first.
+        Empty until build() has finished, rather than a guess from part of the catalogue.
+        """
+        if not self.ready:
+            return []
+        import numpy as np
+
+        vector = nutrient_vectors([product])[0]
+        skin_score, nova_group = _ranking_values(product)
+        found: Dict[str, Alternative] = {}
+
+        # OFF lists categories from broad to specific; search specific first
+        for category in reversed(_field(product, "categories") or ()):
+            partition = self._partitions.get(category)
+            if partition is None or not partition.size:
+                continue
+            size = partition.size
+            skin_scores = partition.skin_scores[:size]
+            nova_groups = partition.nova_groups[:size]
+            better = np.flatnonzero(
+                ((skin_scores > skin_score) & (nova_groups <= nova_group))
+                | ((nova_groups < nova_group) & (skin_scores >= skin_score))
+            )
+            if not better.size:
+                continue
+
+            distances = np.square(partition.vectors[better] - vector).sum(axis=1)
+            wanted = min(k + len(found), better.size)
+            nearest = np.argpartition(distances, wanted - 1)[:wanted]
+            for index in nearest[np.argsort(distances[nearest])]:
+                row = better[index]
+                barcode = partition.barcodes[row]
+                if barcode in found:
+                    continue
+                found[barcode] = Alternative(
+                    barcode=barcode,
+                    distance=float(distances[index]),
+                    skin_score=_or_none(int(skin_scores[row]), _NO_SKIN_SCORE),
+                    nova_group=_or_none(int(nova_groups[row]), _NO_NOVA_GROUP),
+                )
+            if len(found) >= k:
+                break
+
+        return sorted(found.values(), key=lambda alternative: alternative.distance)[:k]
+
+    async def build(self, batch_size: int = 10_000) -> int:
+        """Load every categorized product from the database, a keyset page at a time."""
+        started = time.perf_counter()
+        last_barcode = ""
+        async with AsyncSessionLocal() as session:
+            while True:
+                result = await session.execute(
+                    select(*INDEX_COLUMNS)
+                    .where(Product.barcode > last_barcode, Product.categories.is_not(None))
+                    .order_by(Product.barcode)
+                    .limit(batch_size)
+                )
+                rows = [dict(row) for row in result.mappings()]
+                if not rows:
+                    break
+                self.add_many(rows)
+                last_barcode = rows[-1]["barcode"]
+                # Let requests run between pages while building at startup
+                await asyncio.sleep(0)
+        self.ready = True
+        logger.info(
+            f"Alternatives index built: {len(self)} products in {len(self._partitions)} "
+            f"categories, {self.stats()['bytes'] / 1e6:.1f} MB, {time.perf_counter() - started:.1f}s"
+        )
+        return len(self)
+
+    def start_build(self) -> None:
+        """
+        Build in the background; queries return nothing until it is ready.
+        Called at startup by workers and on first use otherwise; a no-op while
+        a build is running or once one has succeeded, so a failed build is
+        retried by the next call.
+        """
+        if not self.enabled or self.ready:
+            return
+        if self._build_task is None or self._build_task.done():
+            self._build_task = asyncio.create_task(self._build_logged())
+
+    async def stop(self) -> None:
+        if self._build_task is not None and not self._build_task.done():
+            self._build_task.cancel()
+            try:
+                await self._build_task
+            except asyncio.CancelledError:
+                pass
+
+    async def _build_logged(self) -> None:
+        try:
+            await self.build()
+        except Exception as e:
+            logger.exception(f"Building the alternatives index failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "products": len(self),
+            "categories": len(self._partitions),
+            "bytes": sum(partition.nbytes() for partition in self._partitions.values()),
+        }
+
+
+def _ranking_values(product: ProductLike) -> Tuple[int, int]:
+    skin_score = _field(product, "skin_score")
+    nova_group = _field(product, "nova_group")
+    return (
+        _NO_SKIN_SCORE if skin_score is None else int(skin_score),
+        _NO_NOVA_GROUP if nova_group is None else int(nova_group),
+    )
+
+
+def _or_none(value: int, missing: int) -> Optional[int]:
+    return None if value == missing else value
+
+
+# One index per process, built in the app lifespan or on the first query
+alternatives_index = AlternativesIndex(enabled=settings.alternatives_index_enabled)
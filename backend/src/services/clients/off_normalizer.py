@@ -0,0 +1,95 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+# Product column -> OFF nutriment key, per 100g
+NUTRIMENT_FIELDS: Tuple[Tuple[str, str], ...] = (
+    ("kcalories_100g", "energy-kcal_100g"),
+    ("protein_100g", "proteins_100g"),
+    ("carbs_100g", "carbohydrates_100g"),
+    ("sugar_100g", "sugars_100g"),
+    ("fiber_100g", "fiber_100g"),
+    ("fat_100g", "fat_100g"),
+    ("saturated_fat_100g", "saturated-fat_100g"),
+    ("sodium_100g", "sodium_100g"),
+)
+
+# Top-level OFF fields normalize_product reads. Sent as the fields= parameter
+# so OFF leaves out images, translations and everything else we'd discard.
+OFF_FIELDS = ",".join((
+    "code",
+    "product_name",
+    "brands",
+    "categories_tags",
+    "nutriments",
+    "ingredients",
+    "nova_group",
+    "ecoscore_grade",
+    "allergens_tags",
+    "labels_tags",
+    "image_url",
+    "image_front_url",
+))
+
+MAX_CATEGORIES = 5
+
+
+def _tag_to_text(tag: str) -> str:
+    if tag.startswith("en:"):
+        tag = tag[3:]
+    return tag.replace("-", " ")
+
+
+def _ingredient_list(ingredients: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    ingredient_list = []
+    for ingredient in ingredients:
+        taxonomy_id = ingredient.get("id")
+        text = ingredient.get("text")
+        if text is not None:
+            entry = {"text": text.lower()}
+        elif taxonomy_id is not None:
+            entry = {"text": (taxonomy_id[3:] if taxonomy_id.startswith("en:") else taxonomy_id).lower()}
+        else:
+            continue
+        # Keep the taxonomy id so ingredient matching can use it directly
+        if taxonomy_id is not None:
+            entry["id"] = taxonomy_id
+        ingredient_list.append(entry)
+    return ingredient_list
+
+
+def normalize_product(raw_product: Dict[str, Any], barcode: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Map a raw OFF product document onto Product column names.
+    Shared by the live lookup path and the offline dump ingestion.
+    """
+    get = raw_product.get
+    nutriments = get("nutriments") or {}
+
+    nova_group = None
+    raw_nova = get("nova_group")
+    if raw_nova:
+        try:
+            nova_group = int(raw_nova)
+        except (ValueError, TypeError):
+            nova_group = None
+
+    product_name = get("product_name") or "Unknown Product"
+    brands = get("brands")
+    brand = brands.split(",", 1)[0].strip() if brands else None
+
+    row = {
+        # The scanned barcode stays the key even if OFF canonicalizes it
+        # (leading zeros); dumps have no scanned barcode, so use "code"
+        "barcode": barcode or get("code"),
+        "product_name": product_name[:255],
+        "brand": brand[:100] if brand else None,
+        "categories": [_tag_to_text(tag) for tag in (get("categories_tags") or [])[:MAX_CATEGORIES]],
+        "ingredient_list": _ingredient_list(get("ingredients") or []),
+        "nova_group": nova_group,
+        "ecoscore": get("ecoscore_grade"),
+        "allergen_tags": [_tag_to_text(tag) for tag in get("allergens_tags") or []],
+        "labels_tag": get("labels_tags") or [],
+        "image_url": get("image_url") or get("image_front_url"),
+    }
+    for column, key in NUTRIMENT_FIELDS:
+        row[column] = nutriments.get(key, 0)
+    return row
@@ -1,90 +1,163 @@
-from threading import TIMEOUT_MAX
+import asyncio
+import logging
+import random
 import httpx
+import orjson
 from typing import Dict, Optional, Any
-from ...config.settings import settings
+from config.settings import settings
+from observability.spans import span
+from .circuit_breaker import CircuitBreaker
+from .off_normalizer import OFF_FIELDS, normalize_product
+
+logger = logging.getLogger(__name__)
+
+
+class OpenFoodFactsUnavailable(Exception):
+    """OFF couldn't be reached, kept failing, refused the request, or the circuit breaker is open."""
+
+
+class _RetryableError(Exception):
+    pass
+
 
 class OpenFoodFactsClient:
-    OPEN_FOOD_FACTS_API_URL = settings.open_food_facts_api_url
-    TIMEOUT = 10.0
+    USER_AGENT = "SkinEats/1.0"
+
+    def __init__(self, base_url: Optional[str] = None):
+        self.base_url = base_url or settings.open_food_facts_api_url
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.off_timeout_seconds),
+            limits=httpx.Limits(
+                max_connections=settings.off_max_connections,
+                max_keepalive_connections=settings.off_max_keepalive_connections,
+                keepalive_expiry=settings.off_keepalive_expiry_seconds,
+            ),
+            http2=settings.off_http2,
+            headers={"User-Agent": self.USER_AGENT},
+        )
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.off_breaker_failure_threshold,
+            reset_timeout=settings.off_breaker_reset_seconds,
+        )
+        self.max_retries = settings.off_max_retries
+        self.retry_backoff = settings.off_retry_backoff_seconds
+        self.hedge_after = settings.off_hedge_after_seconds
+        self.stats = {"requests": 0, "retries": 0, "hedges": 0, "failures": 0, "rejected": 0}
 
-    def __init__(self):
-        self.client = httpx.AsyncClient(timeout=TIMEOUT)
-    
     async def close(self):
         await self.client.aclose()
 
-    async def get_product(self, barcode: str) -> Optional[Dict[str, any]]:
-        try:
-            url = f"{OPEN_FOOD_FACTS_API_URL}/product/{barcode}.json"
-            response = await self.client.get(url)
-            response.raise_for_status()
+    async def get_product(self, barcode: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch and normalize one product.
 
-            data = response.json()
+        Returns None when OFF doesn't know the barcode (404 or status 0) and
+        raises OpenFoodFactsUnavailable when it couldn't be asked or refused
+        to answer, so callers can tell a real miss from an outage.
+        """
+        if not self.breaker.allow_request():
+            self.stats["rejected"] += 1
+            raise OpenFoodFactsUnavailable("Circuit breaker is open")
+        try:
+            with span("off"):
+                data = await self._get_with_retries(barcode)
+        except OpenFoodFactsUnavailable:
+            self.stats["failures"] += 1
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+        self.breaker.record_success()
 
-            if data.get("status") == 0:
-                return None
-            return self._normalize_product(data.get("product", {}), barcode)
-        except httpx.HTTPError as e:
-            return None
-        except Exception as e:
+        if data is None or data.get("status") == 0:
             return None
+        return normalize_product(data.get("product") or {}, barcode)
 
-def _normalize_product(self, raw_product: Dict[str, Any]):
-    nutriments = raw_product.get("nutriments", {})
-        
-        # Extract nutrition data per 100g
-    nutrition_data = {
-            "calories_100g": nutriments.get("energy-kcal_100g", 0),
-            "protein_100g": nutriments.get("proteins_100g", 0),
-            "carbs_100g": nutriments.get("carbohydrates_100g", 0),
-            "sugar_100g": nutriments.get("sugars_100g", 0),
-            "fat_100g": nutriments.get("fat_100g", 0),
-            "saturated_fat_100g": nutriments.get("saturated-fat_100g", 0),
-            "fiber_100g": nutriments.get("fiber_100g", 0),
-            "sodium_100g": nutriments.get("sodium_100g", 0),
-            "salt_100g": nutriments.get("salt_100g", 0),
-    }
-        
-    # Parse ingredients list
-    ingredients_list = []
-    ingredients_data = raw_product.get("ingredients", [])
-    for ingredient in ingredients_data:
-        if "text" in ingredient:
-            ingredients_list.append(ingredient["text"].lower())
-        elif "id" in ingredient:
-            ingredients_list.append(ingredient["id"].replace("en:", "").lower())
-    
-    # Get allergens
-    allergens = []
-    allergens_tags = raw_product.get("allergens_tags", [])
-    for tag in allergens_tags:
-        allergen = tag.replace("en:", "").replace("-", " ")
-        allergens.append(allergen)
-    
-    # Get categories
-    categories = []
-    categories_tags = raw_product.get("categories_tags", [])
-    for tag in categories_tags[:5]:  # Limit to top 5 categories
-        category = tag.replace("en:", "").replace("-", " ")
-        categories.append(category)
-    
-    # Parse NOVA group (string to int)
-    nova_group = None
-    if raw_product.get("nova_group"):
+    async def _get_with_retries(self, barcode: str) -> Optional[Dict[str, Any]]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await self._get_hedged(barcode)
+            except _RetryableError as e:
+                last_error = e
+                if attempt == self.max_retries:
+                    break
+                self.stats["retries"] += 1
+                # Full jitter so a burst of failures doesn't retry in lockstep
+                await asyncio.sleep(random.uniform(0, self.retry_backoff * 2 ** attempt))
+        logger.warning(f"OpenFoodFacts request failed for {barcode}: {last_error}")
+        raise OpenFoodFactsUnavailable(str(last_error)) from last_error
+
+    async def _get_hedged(self, barcode: str) -> Optional[Dict[str, Any]]:
+        """Send a second request if the first one is slower than hedge_after."""
+        if self.hedge_after <= 0:
+            return await self._fetch(barcode)
+
+        pending = {asyncio.ensure_future(self._fetch(barcode))}
         try:
-            nova_group = int(raw_product["nova_group"])
-        except (ValueError, TypeError):
-            nova_group = None
-    
-    return {
-        "barcode": raw_product.get("code"),
-        "name": raw_product.get("product_name", "Unknown Product"),
-        "brand": raw_product.get("brands", "").split(",")[0].strip() or None,
-        "image_url": raw_product.get("image_url") or raw_product.get("image_front_url"),
-        "nutrition_data": nutrition_data,
-        "ingredients_text": raw_product.get("ingredients_text"),
-        "ingredients_list": ingredients_list,
-        "nova_group": nova_group,
-        "allergens": allergens,
-        "categories": categories,
-    }
\ No newline at end of file
+            done, pending = await asyncio.wait(pending, timeout=self.hedge_after)
+            if done:
+                return done.pop().result()
+            self.stats["hedges"] += 1
+            pending.add(asyncio.ensure_future(self._fetch(barcode)))
+            failed = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Both may finish in the same wait; prefer a success either way
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    failed = task
+            # Both attempts failed
+            return failed.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _fetch(self, barcode: str) -> Optional[Dict[str, Any]]:
+        url = f"{self.base_url}/product/{barcode}.json"
+        self.stats["requests"] += 1
+        try:
+            # Only request the fields we map, OFF documents are otherwise huge
+            response = await self.client.get(url, params={"fields": OFF_FIELDS})
+        except httpx.TransportError as e:
+            raise _RetryableError(f"{type(e).__name__}: {e}") from e
+
+        if response.status_code == 429 or response.status_code >= 500:
+            raise _RetryableError(f"OpenFoodFacts returned {response.status_code}")
+        if response.status_code == 404:
+            # Unknown barcode
+            return None
+        if response.status_code >= 400:
+            # 403 and friends mean OFF is refusing us (user agent, rate
+            # limits), not that the product is missing, so it must not be
+            # negative-cached. Retrying won't help either.
+            logger.warning(f"OpenFoodFacts refused the request for {barcode}: {response.status_code}")
+            raise OpenFoodFactsUnavailable(f"OpenFoodFacts returned {response.status_code}")
+        try:
+            return orjson.loads(response.content)
+        except orjson.JSONDecodeError as e:
+            raise _RetryableError(f"Invalid JSON from OpenFoodFacts: {e}") from e
+
+
+# One client per process, so connections (and TLS sessions) are reused
+_off_client: Optional[OpenFoodFactsClient] = None
+
+
+def get_off_client() -> OpenFoodFactsClient:
+    global _off_client
+    if _off_client is None:
+        _off_client = OpenFoodFactsClient()
+    return _off_client
+
+
+def current_off_client() -> Optional[OpenFoodFactsClient]:
+    """The shared client if one has been created, without creating it."""
+    return _off_client
+
+
+async def close_off_client() -> None:
+    global _off_client
+    if _off_client is not None:
+        await _off_client.close()
+        _off_client = None
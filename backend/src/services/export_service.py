@@ -0,0 +1,118 @@
+from decimal import Decimal
+from typing import Any, AsyncIterator, Callable, Dict, Sequence, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from config.settings import settings
+from models.food_entry import FoodEntry
+from models.product import Product
+import csv
+import io
+import orjson
+import zlib
+
+# Columns of one exported food log row, in output order
+EXPORT_COLUMNS = (
+    FoodEntry.id,
+    FoodEntry.entry_date,
+    FoodEntry.timezone,
+    FoodEntry.meal_type,
+    FoodEntry.barcode,
+    Product.product_name,
+    Product.brand,
+    FoodEntry.custom_food_name,
+    FoodEntry.servings,
+    FoodEntry.calories,
+    FoodEntry.protein_g,
+    FoodEntry.carbs_g,
+    FoodEntry.sugar_g,
+    FoodEntry.fiber_g,
+    FoodEntry.fat_g,
+    Product.skin_score,
+    FoodEntry.notes,
+    FoodEntry.created_at,
+)
+EXPORT_FIELDS = tuple(column.key for column in EXPORT_COLUMNS)
+
+Partitions = AsyncIterator[Sequence[Sequence[Any]]]
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        # As a string, so amounts round-trip exactly
+        return str(value)
+    raise TypeError
+
+
+async def ndjson_chunks(partitions: Partitions) -> AsyncIterator[bytes]:
+    """One JSON object per row, one output chunk per fetched partition."""
+    async for rows in partitions:
+        yield b"".join(
+            orjson.dumps(dict(zip(EXPORT_FIELDS, row)), default=_json_default, option=orjson.OPT_APPEND_NEWLINE)
+            for row in rows
+        )
+
+
+async def csv_chunks(partitions: Partitions) -> AsyncIterator[bytes]:
+    """A header line, then the rows, one output chunk per fetched partition."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    async for rows in partitions:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Header only, for an empty log
+        yield buffer.getvalue().encode()
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Gzip a byte stream incrementally, without buffering the whole body."""
+    compressor = zlib.compressobj(level=6, wbits=31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+# format -> (serializer, media type, file extension)
+EXPORT_FORMATS: Dict[str, Tuple[Callable[[Partitions], AsyncIterator[bytes]], str, str]] = {
+    "ndjson": (ndjson_chunks, "application/x-ndjson", "ndjson"),
+    "csv": (csv_chunks, "text/csv", "csv"),
+}
+
+
+class ExportService:
+    """
+    Streams a user's whole food log, joined to product names, as NDJSON or CSV.
+
+    Rows come from a server-side cursor a partition at a time and are
+    serialized and sent before the next partition is fetched, so memory use
+    depends on export_batch_size, not on how long the history is.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def iter_rows(self, user_id: str) -> Partitions:
+        statement = (
+            select(*EXPORT_COLUMNS)
+            .select_from(FoodEntry)
+            .outerjoin(Product, Product.barcode == FoodEntry.barcode)
+            .where(FoodEntry.user_id == user_id)
+            .order_by(FoodEntry.entry_date, FoodEntry.id)
+            .execution_options(yield_per=settings.export_batch_size)
+        )
+        result = await self.db.stream(statement)
+        try:
+            async for rows in result.partitions():
+                yield rows
+        finally:
+            await result.close()
+
+    def export(self, user_id: str, export_format: str, compress: bool = False) -> AsyncIterator[bytes]:
+        serialize = EXPORT_FORMATS[export_format][0]
+        chunks = serialize(self.iter_rows(user_id))
+        return gzip_chunks(chunks) if compress else chunks
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from sqlalchemy import DateTime, Integer, String, column, update, values
+from config.settings import settings
+from db.db import AsyncSessionLocal
+from models.user_favorites import UserFavorite
+
+logger = logging.getLogger(__name__)
+
+# (user_id, barcode) -> (uses, last used at)
+FavoriteUsage = Dict[Tuple[str, str], Tuple[int, datetime]]
+
+
+def build_favorite_usage_statement(usage: FavoriteUsage):
+    """
+    One UPDATE that adds uses to many favorites and bumps their last_used.
+
+    Only products the user has already favorited are touched; other
+    barcodes are ignored.
+    """
+    rows = values(
+        column("user_id", String),
+        column("barcode", String),
+        column("uses", Integer),
+        column("used_at", DateTime),
+        name="favorite_usage",
+    ).data([(user_id, barcode, uses, used_at) for (user_id, barcode), (uses, used_at) in usage.items()])
+    return (
+        update(UserFavorite)
+        .where(UserFavorite.user_id == rows.c.user_id, UserFavorite.barcode == rows.c.barcode)
+        .values(usage_count=UserFavorite.usage_count + rows.c.uses, last_used=rows.c.used_at)
+    )
+
+
+class FavoriteUsageBuffer:
+    """
+    Write-behind buffer for UserFavorite.usage_count and last_used.
+
+    Logging a favorite only adds to an in-memory counter per (user_id,
+    barcode). A background task flushes all pending counters as one batched
+    UPDATE every flush_interval seconds, earlier once max_pending pairs are
+    buffered, and on shutdown. A crash loses at most one window of usage,
+    which is acceptable for a "most used" ordering but not for anything a
+    user entered.
+    """
+
+    def __init__(self, flush_interval: float, max_pending: int):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: FavoriteUsage = {}
+        self._flush_now = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"recorded": 0, "flushes": 0, "flushed_rows": 0, "failed_flushes": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.flush_interval > 0
+
+    def record(self, user_id: str, barcode: str, uses: int, used_at: datetime) -> None:
+        key = (user_id, barcode)
+        pending_uses, last_used = self._pending.get(key, (0, used_at))
+        self._pending[key] = (pending_uses + uses, max(last_used, used_at))
+        self.stats["recorded"] += uses
+        if len(self._pending) >= self.max_pending:
+            self._flush_now.set()
+
+    async def flush(self) -> int:
+        """Write every pending counter in one statement; returns pairs flushed."""
+        async with self._flush_lock:
+            usage, self._pending = self._pending, {}
+            if not usage:
+                return 0
+            try:
+                async with AsyncSessionLocal() as session:
+                    await session.execute(build_favorite_usage_statement(usage))
+                    await session.commit()
+            except Exception as e:
+                # Put the counters back so the next flush retries them
+                for key, (uses, used_at) in usage.items():
+                    pending_uses, last_used = self._pending.get(key, (0, used_at))
+                    self._pending[key] = (pending_uses + uses, max(last_used, used_at))
+                self.stats["failed_flushes"] += 1
+                logger.exception(f"Flushing {len(usage)} favorite usage counters failed: {e}")
+                return 0
+            self.stats["flushes"] += 1
+            self.stats["flushed_rows"] += len(usage)
+            return len(usage)
+
+    def start(self) -> None:
+        if self.enabled and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            # Let an in-flight flush finish first: cancelling it mid-write
+            # would drop the counters it already took out of _pending
+            async with self._flush_lock:
+                self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_now.clear()
+            await self.flush()
+
+
+# One buffer per process, flushed by the app lifespan
+favorite_usage_buffer = FavoriteUsageBuffer(
+    flush_interval=settings.favorite_usage_flush_seconds,
+    max_pending=settings.favorite_usage_max_pending,
+)
@@ -0,0 +1,330 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from sqlmodel import select
+from sqlalchemy import delete, func, insert, literal
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from dtos.food_entry_request import FoodEntryBatchCreate, FoodEntryCreate, FoodEntryUpdate
+from models.daily_nutrition_rollup import DailyNutritionRollup, NUTRITION_FIELDS
+from models.food_entry import FoodEntry
+from models.product import Product
+from .favorite_usage_buffer import build_favorite_usage_statement, favorite_usage_buffer
+from .product_service import ProductService
+import logging
+
+logger = logging.getLogger(__name__)
+
+# FoodEntry nutrition column -> the Product column it is derived from
+PRODUCT_NUTRITION_COLUMNS = {
+    "calories": "kcalories_100g",
+    "protein_g": "protein_100g",
+    "carbs_g": "carbs_100g",
+    "sugar_g": "sugar_100g",
+    "fiber_g": "fiber_100g",
+    "fat_g": "fat_100g",
+}
+
+_CENT = Decimal("0.01")
+
+
+def local_date(timezone_name: str, at: Optional[datetime] = None) -> date:
+    """The calendar date of `at` (default: now) in the given IANA timezone."""
+    try:
+        zone = ZoneInfo(timezone_name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown timezone: {timezone_name}")
+    at = at or datetime.now(timezone.utc)
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=timezone.utc)
+    return at.astimezone(zone).date()
+
+
+def nutrition_amounts(entry: FoodEntry) -> Dict[str, Decimal]:
+    """An entry's contribution to its day's rollup; missing values count as 0."""
+    return {field: getattr(entry, field) or Decimal("0") for field in NUTRITION_FIELDS}
+
+
+def product_nutrition(product: Product, servings: Decimal) -> Dict[str, Optional[Decimal]]:
+    """Nutrition for `servings` of a product, one serving being 100g."""
+    amounts = {}
+    for field, column in PRODUCT_NUTRITION_COLUMNS.items():
+        per_100g = getattr(product, column)
+        amounts[field] = (
+            (Decimal(str(per_100g)) * servings).quantize(_CENT) if per_100g is not None else None
+        )
+    return amounts
+
+
+def batch_product_nutrition(
+    products: Sequence[Product], servings: Sequence[Decimal]
+) -> List[Dict[str, Optional[Decimal]]]:
+    """
+    product_nutrition for many (product, servings) pairs, with the same Decimal
+    rounding so an item stores the same macros whichever endpoint logged it.
+    Products may repeat; their per-100g values are converted once.
+    """
+    per_100g: Dict[int, List[Optional[Decimal]]] = {}
+    for product in products:
+        if id(product) not in per_100g:
+            per_100g[id(product)] = [
+                None if getattr(product, column) is None else Decimal(str(getattr(product, column)))
+                for column in PRODUCT_NUTRITION_COLUMNS.values()
+            ]
+
+    fields = list(PRODUCT_NUTRITION_COLUMNS)
+    return [
+        {
+            field: None if value is None else (value * amount).quantize(_CENT)
+            for field, value in zip(fields, per_100g[id(product)])
+        }
+        for product, amount in zip(products, servings)
+    ]
+
+
+class FoodEntryService:
+    """
+    Food entries plus their per-day nutrition rollups.
+
+    Every create, update and delete applies the entry's delta to
+    daily_nutrition_rollups with an upsert in the same transaction, so the
+    rollups always match the raw entries and range queries only read them.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_entry(self, user_id: str, data: FoodEntryCreate) -> FoodEntry:
+        product = await ProductService(self.db).get_product_by_barcode(data.barcode)
+        if product is None:
+            raise ValueError(f"Product not found: {data.barcode}")
+
+        columns = data.model_dump()
+        columns["entry_date"] = data.entry_date or local_date(data.timezone)
+        for field, amount in product_nutrition(product, data.servings).items():
+            if columns[field] is None:
+                columns[field] = amount
+
+        entry = FoodEntry(user_id=user_id, **columns)
+        self.db.add(entry)
+        await self.db.flush()
+        await self._apply_to_rollup(user_id, entry.entry_date, nutrition_amounts(entry), 1)
+        await self._record_favorite_usage(user_id, {entry.barcode: 1}, entry.created_at)
+        await self.db.commit()
+        logger.info(f"Created food entry {entry.id} for {user_id} on {entry.entry_date}")
+        return entry
+
+    async def create_entries(self, user_id: str, data: FoodEntryBatchCreate) -> List[FoodEntry]:
+        """
+        Log several items at once, e.g. a whole meal.
+
+        Products are loaded with one query, macros computed per item with the
+        same rounding as create_entry, and the entries and the day's rollup
+        are written in a single transaction (favorite usage too, unless it is
+        buffered). Unlike create_entry, every barcode must already be in the
+        database.
+        """
+        entry_date = data.entry_date or local_date(data.timezone)
+        barcodes = {item.barcode for item in data.items}
+        result = await self.db.execute(select(Product).where(Product.barcode.in_(barcodes)))
+        products = {product.barcode: product for product in result.scalars().all()}
+        missing = sorted(barcodes - products.keys())
+        if missing:
+            raise ValueError(f"Products not found: {', '.join(missing)}")
+
+        amounts = batch_product_nutrition(
+            [products[item.barcode] for item in data.items],
+            [item.servings for item in data.items],
+        )
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                "user_id": user_id,
+                "barcode": item.barcode,
+                "entry_date": entry_date,
+                "timezone": data.timezone,
+                "meal_type": item.meal_type,
+                "servings": item.servings,
+                "custom_food_name": None,
+                "notes": item.notes,
+                "created_at": now,
+                "updated_at": now,
+                **item_amounts,
+            }
+            for item, item_amounts in zip(data.items, amounts)
+        ]
+        # Batches are far below insertmanyvalues' page size, so this is sent
+        # as one multi-row INSERT ... RETURNING
+        entries = list(await self.db.scalars(insert(FoodEntry).returning(FoodEntry), rows))
+
+        totals = {field: Decimal("0") for field in NUTRITION_FIELDS}
+        for entry in entries:
+            for field, amount in nutrition_amounts(entry).items():
+                totals[field] += amount
+        await self._apply_to_rollup(user_id, entry_date, totals, len(entries))
+        await self._record_favorite_usage(user_id, Counter(item.barcode for item in data.items), now)
+        await self.db.commit()
+        logger.info(f"Created {len(entries)} food entries for {user_id} on {entry_date}")
+        return entries
+
+    async def update_entry(
+        self, user_id: str, entry_id: int, data: FoodEntryUpdate
+    ) -> Optional[FoodEntry]:
+        entry = await self._get_owned_entry(user_id, entry_id, for_update=True)
+        if entry is None:
+            return None
+
+        old_date = entry.entry_date
+        old_amounts = nutrition_amounts(entry)
+        changes = data.model_dump(exclude_unset=True)
+
+        if changes.get("timezone") and "entry_date" not in changes:
+            # Re-derive the local date the entry was logged on
+            changes["entry_date"] = local_date(changes["timezone"], entry.created_at)
+        elif "timezone" in changes:
+            local_date(changes["timezone"])  # validate only
+
+        new_servings = changes.get("servings")
+        if new_servings is not None and new_servings != entry.servings:
+            # Scale the amounts the caller didn't set explicitly
+            ratio = new_servings / entry.servings
+            for field in NUTRITION_FIELDS:
+                current = getattr(entry, field)
+                if field not in changes and current is not None:
+                    changes[field] = (current * ratio).quantize(_CENT)
+
+        for field, value in changes.items():
+            setattr(entry, field, value)
+
+        new_amounts = nutrition_amounts(entry)
+        if entry.entry_date != old_date:
+            await self._apply_to_rollup(user_id, old_date, _negate(old_amounts), -1)
+            await self._apply_to_rollup(user_id, entry.entry_date, new_amounts, 1)
+        elif new_amounts != old_amounts:
+            delta = {field: new_amounts[field] - old_amounts[field] for field in NUTRITION_FIELDS}
+            await self._apply_to_rollup(user_id, old_date, delta, 0)
+
+        await self.db.commit()
+        return entry
+
+    async def delete_entry(self, user_id: str, entry_id: int) -> bool:
+        entry = await self._get_owned_entry(user_id, entry_id, for_update=True)
+        if entry is None:
+            return False
+        await self.db.delete(entry)
+        await self._apply_to_rollup(user_id, entry.entry_date, _negate(nutrition_amounts(entry)), -1)
+        await self.db.commit()
+        return True
+
+    async def get_entries_for_date(self, user_id: str, entry_date: date) -> List[FoodEntry]:
+        result = await self.db.execute(
+            select(FoodEntry)
+            .where(FoodEntry.user_id == user_id, FoodEntry.entry_date == entry_date)
+            .order_by(FoodEntry.created_at)
+        )
+        return list(result.scalars().all())
+
+    async def get_daily_totals(
+        self, user_id: str, start: date, end: date
+    ) -> List[DailyNutritionRollup]:
+        """Per-day totals between start and end inclusive, read from the rollups only."""
+        result = await self.db.execute(
+            select(DailyNutritionRollup)
+            .where(
+                DailyNutritionRollup.user_id == user_id,
+                DailyNutritionRollup.entry_date >= start,
+                DailyNutritionRollup.entry_date <= end,
+            )
+            .order_by(DailyNutritionRollup.entry_date)
+        )
+        return list(result.scalars().all())
+
+    async def rebuild_rollups(self, user_id: Optional[str] = None) -> int:
+        """
+        Recompute rollups from the raw entries, for one user or everyone.
+        Only needed to backfill existing entries or repair drift.
+        """
+        rollups = DailyNutritionRollup.__table__
+        entries = FoodEntry.__table__
+
+        clear = delete(DailyNutritionRollup)
+        totals = select(
+            entries.c.user_id,
+            entries.c.entry_date,
+            *(func.coalesce(func.sum(entries.c[field]), 0) for field in NUTRITION_FIELDS),
+            func.count(),
+            literal(datetime.now(timezone.utc)),
+        ).group_by(entries.c.user_id, entries.c.entry_date)
+        if user_id is not None:
+            clear = clear.where(DailyNutritionRollup.user_id == user_id)
+            totals = totals.where(entries.c.user_id == user_id)
+
+        await self.db.execute(clear)
+        result = await self.db.execute(
+            pg_insert(rollups).from_select(
+                ["user_id", "entry_date", *NUTRITION_FIELDS, "entry_count", "updated_at"],
+                totals,
+            )
+        )
+        await self.db.commit()
+        return result.rowcount
+
+    async def _record_favorite_usage(
+        self, user_id: str, uses: Dict[str, int], used_at: datetime
+    ) -> None:
+        if favorite_usage_buffer.enabled:
+            # Written behind by the buffer, outside this transaction
+            for barcode, count in uses.items():
+                favorite_usage_buffer.record(user_id, barcode, count, used_at)
+            return
+        usage = {(user_id, barcode): (count, used_at) for barcode, count in uses.items()}
+        await self.db.execute(build_favorite_usage_statement(usage))
+
+    async def _get_owned_entry(
+        self, user_id: str, entry_id: int, for_update: bool = False
+    ) -> Optional[FoodEntry]:
+        statement = select(FoodEntry).where(FoodEntry.id == entry_id, FoodEntry.user_id == user_id)
+        if for_update:
+            # Concurrent edits of one entry must not both apply their delta
+            statement = statement.with_for_update()
+        result = await self.db.execute(statement)
+        return result.scalars().first()
+
+    async def _apply_to_rollup(
+        self, user_id: str, entry_date: date, amounts: Dict[str, Decimal], count: int
+    ) -> None:
+        """Add `amounts` and `count` to one day's rollup, creating the row if needed."""
+        rollups = DailyNutritionRollup.__table__
+        statement = pg_insert(DailyNutritionRollup).values(
+            user_id=user_id,
+            entry_date=entry_date,
+            entry_count=count,
+            updated_at=datetime.now(timezone.utc),
+            **amounts,
+        )
+        excluded = statement.excluded
+        statement = statement.on_conflict_do_update(
+            index_elements=[rollups.c.user_id, rollups.c.entry_date],
+            set_={
+                **{field: rollups.c[field] + excluded[field] for field in NUTRITION_FIELDS},
+                "entry_count": rollups.c.entry_count + excluded.entry_count,
+                "updated_at": excluded.updated_at,
+            },
+        )
+        await self.db.execute(statement)
+
+        if count < 0:
+            # Drop days whose last entry was removed
+            await self.db.execute(
+                delete(DailyNutritionRollup).where(
+                    DailyNutritionRollup.user_id == user_id,
+                    DailyNutritionRollup.entry_date == entry_date,
+                    DailyNutritionRollup.entry_count <= 0,
+                )
+            )
+
+
+def _negate(amounts: Dict[str, Decimal]) -> Dict[str, Decimal]:
+    return {field: -value for field, value in amounts.items()}
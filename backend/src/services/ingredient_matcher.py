@@ -0,0 +1,237 @@
+import json
+import os
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from config.settings import settings
+
+ARTIFACT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class IngredientConcept:
+    """
+    One ingredient from the OFF taxonomy, the trigger groups it belongs to
+    and the names it appears under in ingredient lists.
+
+    Concepts without groups are still matched: they shadow shorter terms
+    they contain, so "coconut milk" doesn't count as "milk".
+    """
+    id: str  # OFF taxonomy id, e.g. "en:whey"
+    groups: Tuple[str, ...]
+    synonyms: Tuple[str, ...]
+
+
+# Trigger groups and which kind of annotation each one is. Allergen groups
+# map to the OFF allergen tag they mean, as stored in Product.allergen_tags.
+ALLERGEN_TAGS = {"dairy": "milk", "gluten": "gluten", "soy": "soybeans", "egg": "eggs", "nuts": "nuts"}
+ALLERGEN_GROUPS = tuple(ALLERGEN_TAGS)
+SKIN_TRIGGER_GROUPS = ("dairy", "high_glycemic_sweetener", "omega_3")
+
+INGREDIENT_CONCEPTS: Tuple[IngredientConcept, ...] = (
+    # Dairy and derivatives
+    IngredientConcept("en:milk", ("dairy",), ("milk", "whole milk", "skimmed milk", "semi-skimmed milk")),
+    IngredientConcept("en:milk-powder", ("dairy",), ("milk powder", "whole milk powder", "skimmed milk powder")),
+    IngredientConcept("en:whey", ("dairy",), ("whey", "whey powder", "whey protein", "whey protein concentrate")),
+    IngredientConcept("en:casein", ("dairy",), ("casein", "caseinate", "sodium caseinate")),
+    IngredientConcept("en:cream", ("dairy",), ("cream", "sour cream")),
+    IngredientConcept("en:lactose", ("dairy",), ("lactose",)),
+    IngredientConcept("en:butter", ("dairy",), ("butter", "butterfat", "milk fat")),
+    IngredientConcept("en:cheese", ("dairy",), ("cheese",)),
+    IngredientConcept("en:yogurt", ("dairy",), ("yogurt", "yoghurt")),
+    # High-glycemic sweeteners
+    IngredientConcept("en:sugar", ("high_glycemic_sweetener",), ("sugar", "cane sugar", "invert sugar")),
+    IngredientConcept("en:glucose-syrup", ("high_glycemic_sweetener",), ("glucose syrup",)),
+    IngredientConcept("en:glucose-fructose-syrup", ("high_glycemic_sweetener",), ("glucose-fructose syrup",)),
+    IngredientConcept(
+        "en:corn-syrup", ("high_glycemic_sweetener",), ("corn syrup", "high fructose corn syrup")
+    ),
+    IngredientConcept("en:dextrose", ("high_glycemic_sweetener",), ("dextrose",)),
+    IngredientConcept("en:maltodextrin", ("high_glycemic_sweetener",), ("maltodextrin",)),
+    # Omega-3 sources
+    IngredientConcept("en:flaxseed", ("omega_3",), ("flaxseed", "flaxseeds", "linseed")),
+    IngredientConcept("en:chia-seed", ("omega_3",), ("chia", "chia seeds")),
+    IngredientConcept("en:walnut", ("omega_3", "nuts"), ("walnut", "walnuts")),
+    IngredientConcept("en:salmon", ("omega_3",), ("salmon",)),
+    IngredientConcept("en:sardine", ("omega_3",), ("sardine", "sardines")),
+    # Other allergens
+    IngredientConcept("en:wheat", ("gluten",), ("wheat", "wheat flour", "durum wheat semolina")),
+    IngredientConcept("en:barley", ("gluten",), ("barley", "barley malt")),
+    IngredientConcept("en:soya", ("soy",), ("soy", "soya", "soy lecithin", "soya lecithin")),
+    IngredientConcept("en:egg", ("egg",), ("egg", "eggs", "egg yolk", "egg white")),
+    IngredientConcept("en:hazelnut", ("nuts",), ("hazelnut", "hazelnuts")),
+    IngredientConcept("en:almond", ("nuts",), ("almond", "almonds")),
+    IngredientConcept("en:cashew", ("nuts",), ("cashew", "cashews")),
+    # Names that contain a trigger term but aren't that trigger
+    IngredientConcept("en:coconut-milk", (), ("coconut milk",)),
+    IngredientConcept("en:almond-milk", ("nuts",), ("almond milk",)),
+    IngredientConcept("en:oat-milk", (), ("oat milk",)),
+    IngredientConcept("en:soy-milk", ("soy",), ("soy milk", "soya milk")),
+    IngredientConcept("en:rice-milk", (), ("rice milk",)),
+    IngredientConcept("en:peanut-butter", (), ("peanut butter",)),
+    IngredientConcept("en:cocoa-butter", (), ("cocoa butter",)),
+    IngredientConcept("en:shea-butter", (), ("shea butter",)),
+    IngredientConcept("en:cream-of-tartar", (), ("cream of tartar",)),
+    IngredientConcept("en:buckwheat", (), ("buckwheat",)),
+)
+
+
+class IngredientMatcher:
+    """
+    Aho-Corasick automaton over every synonym of every concept.
+
+    A product's ingredient text is scanned once, whatever the number of
+    terms, and OFF taxonomy ids are resolved with a dict lookup. Matches must
+    sit on word boundaries, and overlapping matches resolve leftmost-longest,
+    the same way a regex alternation of all terms would.
+    """
+
+    def __init__(self, concepts: Sequence[IngredientConcept] = INGREDIENT_CONCEPTS):
+        self.concepts = tuple(concepts)
+        self._concept_by_id = {concept.id: index for index, concept in enumerate(self.concepts)}
+        # Pattern i is _pattern_lengths[i] characters long and means concept _pattern_concepts[i]
+        self._pattern_concepts: List[int] = []
+        self._pattern_lengths: List[int] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        for index, concept in enumerate(self.concepts):
+            for synonym in concept.synonyms:
+                self._add_pattern(synonym.lower(), index)
+        self._build_failure_links()
+
+    def _add_pattern(self, pattern: str, concept_index: int) -> None:
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = next_state
+        self._out[state].append(len(self._pattern_concepts))
+        self._pattern_concepts.append(concept_index)
+        self._pattern_lengths.append(len(pattern))
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                if state:
+                    fallback = self._fail[state]
+                    while fallback and char not in self._goto[fallback]:
+                        fallback = self._fail[fallback]
+                    self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._out[next_state].extend(self._out[self._fail[next_state]])
+
+    def find(self, text: str) -> List[Tuple[int, int, IngredientConcept]]:
+        """Return (start, end, concept) for each match in lowercase text."""
+        goto, fail, out = self._goto, self._fail, self._out
+        candidates = []
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern in out[state]:
+                end = position + 1
+                start = end - self._pattern_lengths[pattern]
+                if _is_boundary(text, start - 1) and _is_boundary(text, end):
+                    candidates.append((start, end, self._pattern_concepts[pattern]))
+
+        # Keep the leftmost-longest, non-overlapping matches
+        candidates.sort(key=lambda match: (match[0], match[0] - match[1]))
+        matches = []
+        covered_until = 0
+        for start, end, concept_index in candidates:
+            if start >= covered_until:
+                matches.append((start, end, self.concepts[concept_index]))
+                covered_until = end
+        return matches
+
+    def match_groups(self, text: str, taxonomy_ids: Iterable[str] = ()) -> Set[str]:
+        """Trigger groups present in an ingredient text and/or list of taxonomy ids."""
+        groups: Set[str] = set()
+        for taxonomy_id in taxonomy_ids:
+            concept_index = self._concept_by_id.get(taxonomy_id)
+            if concept_index is not None:
+                groups.update(self.concepts[concept_index].groups)
+        if text:
+            for _, _, concept in self.find(text):
+                groups.update(concept.groups)
+        return groups
+
+    def annotate(self, text: str, taxonomy_ids: Iterable[str] = ()) -> Dict[str, List[str]]:
+        """Split the matched groups into allergens and skin triggers."""
+        return annotation(self.match_groups(text, taxonomy_ids))
+
+    def save(self, path: str) -> None:
+        """Write the compiled automaton so other processes can skip building it."""
+        artifact = {
+            "version": ARTIFACT_VERSION,
+            "concepts": [[c.id, list(c.groups), list(c.synonyms)] for c in self.concepts],
+            "pattern_concepts": self._pattern_concepts,
+            "pattern_lengths": self._pattern_lengths,
+            "goto": self._goto,
+            "fail": self._fail,
+            "out": self._out,
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(artifact, f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> "IngredientMatcher":
+        with open(path, encoding="utf-8") as f:
+            artifact = json.load(f)
+        if artifact.get("version") != ARTIFACT_VERSION:
+            raise ValueError(f"Unsupported ingredient matcher artifact version: {artifact.get('version')}")
+        matcher = cls.__new__(cls)
+        matcher.concepts = tuple(
+            IngredientConcept(id, tuple(groups), tuple(synonyms))
+            for id, groups, synonyms in artifact["concepts"]
+        )
+        matcher._concept_by_id = {concept.id: index for index, concept in enumerate(matcher.concepts)}
+        matcher._pattern_concepts = artifact["pattern_concepts"]
+        matcher._pattern_lengths = artifact["pattern_lengths"]
+        matcher._goto = artifact["goto"]
+        matcher._fail = artifact["fail"]
+        matcher._out = artifact["out"]
+        return matcher
+
+
+def annotation(groups: Iterable[str]) -> Dict[str, List[str]]:
+    """Matched trigger groups split into allergens and skin triggers."""
+    groups = set(groups)
+    return {
+        "allergens": sorted(groups.intersection(ALLERGEN_GROUPS)),
+        "skin_triggers": sorted(groups.intersection(SKIN_TRIGGER_GROUPS)),
+    }
+
+
+def with_detected_allergens(allergen_tags: Optional[List[str]], allergens: Iterable[str]) -> List[str]:
+    """OFF's allergen tags plus those of allergen groups found in the ingredients."""
+    tags = list(allergen_tags or [])
+    for group in allergens:
+        tag = ALLERGEN_TAGS[group]
+        if tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def _is_boundary(text: str, index: int) -> bool:
+    return index < 0 or index >= len(text) or not text[index].isalnum()
+
+
+def _load_default_matcher(path: Optional[str]) -> IngredientMatcher:
+    if path and os.path.exists(path):
+        return IngredientMatcher.load(path)
+    return IngredientMatcher()
+
+
+# Built (or loaded) once per process and shared by the scan path and batch jobs
+ingredient_matcher = _load_default_matcher(settings.ingredient_matcher_artifact)
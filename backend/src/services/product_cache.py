@@ -0,0 +1,112 @@
+import threading
+from typing import Optional, Dict, Any
+from cachetools import TTLCache
+from sqlalchemy import event
+from config.settings import settings
+from models.product import Product
+
+
+class _CountingTTLCache(TTLCache):
+    """TTLCache that counts LRU evictions (expired entries are not counted)."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.evictions = 0
+
+    def popitem(self):
+        item = super().popitem()
+        self.evictions += 1
+        return item
+
+
+class ProductCache:
+    """
+    In-process product cache that sits in front of the products table.
+
+    Found products live in an LRU/TTL cache. Barcodes that Open Food Facts
+    doesn't know are kept in a separate, shorter-lived negative cache so a
+    repeated scan of an unknown product doesn't hit OFF every time.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        negative_max_size: int,
+        negative_ttl_seconds: float,
+    ):
+        self._products = _CountingTTLCache(max_size, ttl_seconds)
+        self._missing = _CountingTTLCache(negative_max_size, negative_ttl_seconds)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    def get(self, barcode: str) -> Optional[Product]:
+        """Return a detached copy of the cached product, or None on a miss"""
+        with self._lock:
+            snapshot = self._products.get(barcode)
+            if snapshot is None:
+                if barcode not in self._missing:
+                    self.misses += 1
+                return None
+            self.hits += 1
+        return Product(**snapshot)
+
+    def is_known_missing(self, barcode: str) -> bool:
+        with self._lock:
+            if barcode in self._missing:
+                self.negative_hits += 1
+                return True
+            return False
+
+    def set(self, product: Product) -> None:
+        snapshot = product.model_dump()
+        with self._lock:
+            self._products[product.barcode] = snapshot
+            self._missing.pop(product.barcode, None)
+
+    def set_missing(self, barcode: str) -> None:
+        with self._lock:
+            self._missing[barcode] = True
+
+    def invalidate(self, barcode: str) -> None:
+        with self._lock:
+            self._products.pop(barcode, None)
+            self._missing.pop(barcode, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._products.clear()
+            self._missing.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": self._products.currsize,
+                "max_size": self._products.maxsize,
+                "negative_size": self._missing.currsize,
+                "negative_max_size": self._missing.maxsize,
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "evictions": self._products.evictions,
+                "negative_evictions": self._missing.evictions,
+            }
+
+
+# Create a single, process-wide cache
+product_cache = ProductCache(
+    max_size=settings.product_cache_max_size,
+    ttl_seconds=settings.product_cache_ttl_seconds,
+    negative_max_size=settings.product_negative_cache_max_size,
+    negative_ttl_seconds=settings.product_negative_cache_ttl_seconds,
+)
+
+
+# Keep the cache coherent with ORM writes to the Product row
+@event.listens_for(Product, "after_insert")
+@event.listens_for(Product, "after_update")
+@event.listens_for(Product, "after_delete")
+def _invalidate_product(mapper, connection, target: Product) -> None:
+    product_cache.invalidate(target.barcode)
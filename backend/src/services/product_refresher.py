@@ -0,0 +1,208 @@
+import asyncio
+import heapq
+import itertools
+import logging
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlmodel import select
+
+from config.settings import settings
+from db.db import AsyncSessionLocal
+from models.product import Product
+from .alternatives_index import alternatives_index
+from .clients.open_food_facts_client import OpenFoodFactsUnavailable, get_off_client
+from .product_cache import product_cache
+from .skin_score_engine import skin_score_engine
+
+logger = logging.getLogger(__name__)
+
+FRESH = "fresh"
+STALE = "stale"
+EXPIRED = "expired"
+
+
+def freshness(product: Product, now: Optional[datetime] = None) -> str:
+    """Freshness tier of a product row, based on when it was last refreshed."""
+    now = now or datetime.now(timezone.utc)
+    updated_at = product.updated_at
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    age = now - updated_at
+    if age < timedelta(days=settings.product_fresh_days):
+        return FRESH
+    if age < timedelta(days=settings.product_stale_days):
+        return STALE
+    return EXPIRED
+
+
+def _same(old: Any, new: Any) -> bool:
+    if isinstance(old, Decimal) and isinstance(new, (int, float)):
+        return old == Decimal(str(new))
+    return old == new
+
+
+class ProductRefresher:
+    """
+    Stale-while-revalidate for product rows.
+
+    Scans of stale products are answered from the DB/cache as usual and the
+    barcode is queued here. A background worker drains the queue at a fixed
+    rate against OFF, most-scanned barcodes first (expired ones ahead of
+    merely stale ones), and writes back only the columns that changed.
+    """
+
+    def __init__(self, rate_per_second: float, max_queued: int):
+        self.rate_per_second = rate_per_second
+        self.max_queued = max_queued
+        self.popularity: Counter = Counter()
+        # Heap of (tier, -popularity, sequence, barcode). A barcode is only
+        # pushed again when its priority improves a lot, and _queued holds its
+        # current entry, so older entries are skipped on pop and dropped when
+        # the heap is compacted.
+        self._heap: List[Tuple[int, int, int, str]] = []
+        self._queued: Dict[str, Tuple[int, int, int, str]] = {}
+        self._in_flight: Optional[str] = None
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"queued": 0, "refreshed": 0, "unchanged": 0, "failed": 0, "dropped": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate_per_second > 0
+
+    def note_scan(self, product: Product) -> None:
+        """Count a scan and queue a refresh if the product isn't fresh."""
+        if not self.enabled:
+            return
+        barcode = product.barcode
+        self.popularity[barcode] += 1
+        if len(self.popularity) > self.max_queued * 10:
+            self._decay_popularity()
+        tier = freshness(product)
+        if tier == FRESH or barcode == self._in_flight:
+            return
+        priority = 0 if tier == EXPIRED else 1
+        popularity = self.popularity[barcode]
+        current = self._queued.get(barcode)
+        if current is None:
+            if len(self._queued) >= self.max_queued:
+                self.stats["dropped"] += 1
+                return
+            self.stats["queued"] += 1
+        elif priority >= current[0] and popularity < -current[1] * 2:
+            # Already queued and its place in line hasn't changed much
+            return
+        entry = (priority, -popularity, next(self._sequence), barcode)
+        self._queued[barcode] = entry
+        heapq.heappush(self._heap, entry)
+        if len(self._heap) > self.max_queued * 2:
+            self._compact()
+        self._wakeup.set()
+
+    def _compact(self) -> None:
+        """Drop superseded heap entries, keeping one per queued barcode."""
+        self._heap = list(self._queued.values())
+        heapq.heapify(self._heap)
+
+    def _decay_popularity(self) -> None:
+        """Halve every count and forget barcodes that drop to zero."""
+        self.popularity = Counter({
+            barcode: count // 2 for barcode, count in self.popularity.items() if count > 1
+        })
+
+    def _pop(self) -> Optional[str]:
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            barcode = entry[3]
+            if self._queued.get(barcode) == entry:
+                del self._queued[barcode]
+                return barcode
+        return None
+
+    def start(self) -> None:
+        if self.enabled and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        interval = 1.0 / self.rate_per_second
+        while True:
+            barcode = self._pop()
+            if barcode is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            # Scans during the refresh still see the old row; don't queue it again
+            self._in_flight = barcode
+            try:
+                await self.refresh(barcode)
+            except OpenFoodFactsUnavailable:
+                # OFF is degraded; the next scan will queue it again
+                self.stats["failed"] += 1
+            except Exception as e:
+                self.stats["failed"] += 1
+                logger.exception(f"Refreshing product {barcode} failed: {e}")
+            finally:
+                self._in_flight = None
+            await asyncio.sleep(interval)
+
+    async def refresh(self, barcode: str) -> Dict[str, Any]:
+        """Re-fetch one product from OFF and write back the changed columns."""
+        product_data = await get_off_client().get_product(barcode)
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(select(Product).where(Product.barcode == barcode))
+            product = result.scalars().first()
+            if product is None:
+                return {}
+
+            changes: Dict[str, Any] = {}
+            if product_data:
+                product_data.pop("barcode", None)
+                for column, value in product_data.items():
+                    if not _same(getattr(product, column), value):
+                        changes[column] = value
+                if changes:
+                    updated = Product(**{**product.model_dump(), **changes})
+                    skin_score_engine.apply([updated])
+                    # OFF's allergen tags lack the ones we detect, so compare
+                    # them only after scoring has added those back
+                    for column in ("skin_score", "skin_score_breakdown", "allergen_tags"):
+                        if getattr(updated, column) != getattr(product, column):
+                            changes[column] = getattr(updated, column)
+                        else:
+                            changes.pop(column, None)
+                    alternatives_index.add(updated)
+
+            # Always bump updated_at so the row counts as fresh again
+            await session.execute(
+                update(Product)
+                .where(Product.barcode == barcode)
+                .values(**changes, updated_at=datetime.now(timezone.utc))
+            )
+            await session.commit()
+
+        product_cache.invalidate(barcode)
+        self.stats["refreshed" if changes else "unchanged"] += 1
+        if changes:
+            logger.info(f"Refreshed product {barcode}: {sorted(changes)}")
+        return changes
+
+
+# One background refresher per process, started in the app lifespan
+product_refresher = ProductRefresher(
+    rate_per_second=settings.product_refresh_rate_per_second,
+    max_queued=settings.product_refresh_max_queued,
+)
@@ -0,0 +1,193 @@
+import hashlib
+import zlib
+from dataclasses import dataclass
+from datetime import timezone
+from typing import Any, Dict, Optional, Tuple
+
+import msgpack
+import orjson
+from cachetools import LRUCache
+
+from config.settings import settings
+from dtos.product_response import ProductResponse
+from models.product import Product
+from observability.metrics import metrics
+
+try:
+    import brotli
+except ImportError:
+    # Optional: without it only gzip is offered
+    brotli = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+MSGPACK_TYPES = (MSGPACK, "application/x-msgpack", "application/vnd.msgpack")
+
+IDENTITY = "identity"
+GZIP = "gzip"
+BROTLI = "br"
+# Preferred first when the client weights them equally
+CODINGS = (BROTLI, GZIP) if brotli is not None else (GZIP,)
+
+# Bump when ProductResponse or its encoding changes, so clients holding an
+# old ETag don't get a 304 for a body that would now look different
+REPRESENTATION_VERSION = "1"
+
+_ETAG_SUFFIXES = {JSON: "json", MSGPACK: "msgpack", GZIP: ".gz", BROTLI: ".br", IDENTITY: ""}
+
+# How each product response was answered; the 304 ratio is what re-scans save
+product_responses = metrics.counter(
+    "skineats_product_responses_total",
+    "Product responses by outcome: not_modified, cached, encoded",
+    ("outcome",),
+)
+
+
+def _parse_weights(header: str) -> Dict[str, float]:
+    """'gzip;q=0.8, br' -> {'gzip': 0.8, 'br': 1.0}"""
+    weights = {}
+    for part in header.split(","):
+        token, *params = part.split(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[token] = weight
+    return weights
+
+
+def negotiate_media_type(accept: Optional[str]) -> str:
+    """msgpack when the client asks for it at least as strongly as JSON, else JSON."""
+    if not accept:
+        return JSON
+    weights = _parse_weights(accept)
+    msgpack_weight = max(weights.get(media_type, 0.0) for media_type in MSGPACK_TYPES)
+    json_weight = weights.get(JSON, weights.get("application/*", weights.get("*/*", 0.0)))
+    return MSGPACK if msgpack_weight > 0 and msgpack_weight >= json_weight else JSON
+
+
+def negotiate_coding(accept_encoding: Optional[str]) -> str:
+    """The best content coding the client accepts, identity if none."""
+    weights = _parse_weights(accept_encoding or "")
+    best, best_weight = IDENTITY, 0.0
+    for coding in CODINGS:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def product_version(product: Product) -> str:
+    """
+    Fingerprint of a product row's current state, without serializing the body.
+
+    updated_at changes on every OFF refresh. scripts/rescore_products.py
+    rewrites the score columns and allergen_tags in place without touching
+    updated_at, so those are hashed too (keys sorted, since JSONB doesn't
+    keep their order).
+    """
+    updated_at = product.updated_at
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(f"{REPRESENTATION_VERSION}:{product.barcode}:{updated_at.timestamp()}:{product.skin_score}:".encode())
+    digest.update(orjson.dumps(
+        [product.skin_score_breakdown, product.allergen_tags], option=orjson.OPT_SORT_KEYS
+    ))
+    return digest.hexdigest()
+
+
+def product_etag(version: str, media_type: str, coding: str) -> str:
+    """Strong ETag of one representation; every encoding gets its own."""
+    return f'"{version}-{_ETAG_SUFFIXES[media_type]}{_ETAG_SUFFIXES[coding]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison, so W/ prefixes are ignored."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def encode_product(product: Product, media_type: str, coding: str) -> bytes:
+    """The response body, byte for byte what FastAPI's response_model would send for JSON."""
+    response = ProductResponse.model_validate(product)
+    if media_type == MSGPACK:
+        body = msgpack.packb(response.model_dump(mode="json"))
+    else:
+        body = response.model_dump_json().encode()
+    if coding == GZIP:
+        return zlib.compress(body, level=9, wbits=31)
+    if coding == BROTLI:
+        return brotli.compress(body, quality=9)
+    return body
+
+
+@dataclass(frozen=True)
+class EncodedProduct:
+    etag: str
+    media_type: str
+    coding: str
+    body: bytes
+
+
+class ProductResponseCache:
+    """
+    Serialized product responses, one entry per product version and encoding.
+
+    Entries are keyed by ETag, so a refreshed or rescored product simply gets
+    new keys and its old bodies age out of the LRU. Bounded by total body
+    size rather than entry count.
+    """
+
+    def __init__(self, max_bytes: int):
+        self._entries: LRUCache = LRUCache(maxsize=max_bytes, getsizeof=lambda entry: len(entry.body))
+        self.hits = 0
+        self.misses = 0
+
+    def representation(
+        self, product: Product, accept: Optional[str], accept_encoding: Optional[str]
+    ) -> Tuple[str, str, str]:
+        """(etag, media type, coding) of the response this request would get."""
+        media_type = negotiate_media_type(accept)
+        coding = negotiate_coding(accept_encoding)
+        return product_etag(product_version(product), media_type, coding), media_type, coding
+
+    def get(self, product: Product, etag: str, media_type: str, coding: str) -> EncodedProduct:
+        entry = self._entries.get(etag)
+        if entry is not None:
+            self.hits += 1
+            product_responses.inc("cached")
+            return entry
+        self.misses += 1
+        product_responses.inc("encoded")
+        entry = EncodedProduct(etag, media_type, coding, encode_product(product, media_type, coding))
+        # Larger than the whole cache: serve it without storing
+        if len(entry.body) <= self._entries.maxsize:
+            self._entries[etag] = entry
+        return entry
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._entries.currsize,
+            "max_bytes": self._entries.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# One cache per process, shared by every request
+product_response_cache = ProductResponseCache(max_bytes=settings.product_response_cache_max_bytes)
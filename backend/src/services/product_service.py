@@ -1,49 +1,211 @@
-from sqlmodel import Session, select
-from models.product import Product, ProductResponse
-from .clients.open_food_facts_client import OpenFoodFactsClient
+from sqlmodel import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from models.product import Product
+from .alternatives_index import Alternative, alternatives_index
+from .clients.open_food_facts_client import OpenFoodFactsUnavailable, get_off_client
+from .product_cache import product_cache
+from .product_refresher import product_refresher
+from .single_flight import SingleFlight
+from .skin_score_engine import skin_score_engine
+from config.settings import settings
+from observability.metrics import metrics
+from db.db import AsyncSessionLocal
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List, Tuple, AsyncIterator
+import asyncio
+import base64
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
+# In-flight OFF fetches, shared by every ProductService in this process
+_off_fetches = SingleFlight()
+
+# Where each product lookup was answered from; cache and OFF hit ratios
+# are ratios of these
+product_lookups = metrics.counter(
+    "skineats_product_lookups_total",
+    "Product lookups by source: cache, negative_cache, db, off, off_missing",
+    ("source",),
+)
+
 class ProductService:
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
-        self.off_client = OpenFoodFactsClient()
+        self.off_client = get_off_client()
     
     async def close(self):
-        """Close external clients"""
-        await self.off_client.close()
+        """Nothing to close: the OFF client is shared and closed on shutdown"""
+        pass
     
     async def get_product_by_barcode(self, barcode: str) -> Optional[Product]:
+        """
+        Look up a product, falling back to OpenFoodFacts on a DB miss.
+        Raises OpenFoodFactsUnavailable when the product isn't in the DB
+        and OFF can't be reached.
+        """
+
+        # 0. Serve from the in-process cache when possible
+        cached = product_cache.get(barcode)
+        if cached is not None:
+            product_lookups.inc("cache")
+            product_refresher.note_scan(cached)
+            return cached
+        if product_cache.is_known_missing(barcode):
+            product_lookups.inc("negative_cache")
+            logger.info(f"Product known to be missing (cached): {barcode}")
+            return None
 
         statement = select(Product).where(Product.barcode == barcode)
-        product = self.db.exec(statement).first()
+        result = await self.db.execute(statement)
+        product = result.scalars().first()
         
         if product:
             logger.info(f"Product found in database: {barcode}")
+            product_lookups.inc("db")
+            product_cache.set(product)
+            # Stale rows are still served; the refresher updates them later
+            product_refresher.note_scan(product)
             return product
         
-        # 2. Product not in DB - fetch from OpenFoodFacts
+        # 2. Product not in DB - fetch from OpenFoodFacts. Concurrent misses
+        # for the same barcode share one upstream fetch and one insert.
+        return await _off_fetches.do(barcode, lambda: self._fetch_and_store(barcode))
+
+    async def _fetch_and_store(self, barcode: str) -> Optional[Product]:
         logger.info(f"Fetching product from OpenFoodFacts: {barcode}")
         product_data = await self.off_client.get_product(barcode)
         
         if not product_data:
             logger.warning(f"Product not found in OpenFoodFacts: {barcode}")
+            product_lookups.inc("off_missing")
+            product_cache.set_missing(barcode)
             return None
+        product_lookups.inc("off")
         
-        # 3. Save product to database
+        # 3. Save product to database. Another worker may have inserted the
+        # same barcode in the meantime, so a conflict is not an error.
         product = Product(**product_data)
-        self.db.add(product)
-        self.db.commit()
-        self.db.refresh(product)
+        skin_score_engine.apply([product])
+        statement = (
+            pg_insert(Product)
+            .values(**product.model_dump())
+            .on_conflict_do_nothing(index_elements=[Product.barcode])
+        )
+        # The fetch is shared with other requests and may outlive the one
+        # that started it, so it writes through its own session
+        async with AsyncSessionLocal() as session:
+            await session.execute(statement)
+            await session.commit()
+        product_cache.set(product)
+        alternatives_index.add(product)
         
         logger.info(f"Product saved to database: {barcode}")
         return product
     
-    def search_products(
+    async def iter_products_by_barcodes(
+        self,
+        barcodes: List[str],
+    ) -> AsyncIterator[Tuple[str, Optional[Product]]]:
+        """
+        Resolve many barcodes at once, yielding (barcode, product) pairs as
+        soon as each one is known. Unknown products are yielded as None.
+
+        Known barcodes are resolved with a single IN query. The rest are
+        fetched from OpenFoodFacts concurrently, each through the same
+        single-flight fetch and insert as get_product_by_barcode, so a
+        product is saved before it is yielded and a client disconnecting
+        mid-stream doesn't lose the fetches already under way.
+        """
+        pending = []
+        for barcode in dict.fromkeys(barcodes):
+            cached = product_cache.get(barcode)
+            if cached is not None:
+                product_lookups.inc("cache")
+                yield barcode, cached
+            elif product_cache.is_known_missing(barcode):
+                product_lookups.inc("negative_cache")
+                yield barcode, None
+            else:
+                pending.append(barcode)
+
+        if not pending:
+            return
+
+        # 1. One round trip for everything already in the database
+        statement = select(Product).where(Product.barcode.in_(pending))
+        found = set()
+        result = await self.db.execute(statement)
+        for product in result.scalars().all():
+            found.add(product.barcode)
+            product_lookups.inc("db")
+            product_cache.set(product)
+            yield product.barcode, product
+
+        missing = [barcode for barcode in pending if barcode not in found]
+        if not missing:
+            return
+
+        # 2. Fetch and store the rest, bounded by a semaphore
+        semaphore = asyncio.Semaphore(settings.off_batch_concurrency)
+
+        async def fetch(barcode: str):
+            async with semaphore:
+                try:
+                    return barcode, await _off_fetches.do(barcode, lambda: self._fetch_and_store(barcode))
+                except OpenFoodFactsUnavailable:
+                    # Not negative-cached; the next lookup asks OFF again
+                    return barcode, None
+
+        logger.info(f"Fetching {len(missing)} products from OpenFoodFacts")
+        tasks = [asyncio.ensure_future(fetch(barcode)) for barcode in missing]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # The shared fetches keep running and still save their products
+            for task in tasks:
+                task.cancel()
+
+    async def get_alternatives(
+        self, product: Product, limit: int = 5
+    ) -> List[Tuple[Product, Alternative]]:
+        """
+        Similar products in the same categories with a better skin score or
+        NOVA group, nearest nutrient profile first. Empty until the
+        alternatives index has been built; the first call starts the build
+        when startup didn't (fast_startup).
+        """
+        alternatives_index.start_build()
+        alternatives = alternatives_index.query(product, k=limit)
+        if not alternatives:
+            return []
+
+        products = {}
+        uncached = []
+        for alternative in alternatives:
+            cached = product_cache.get(alternative.barcode)
+            if cached is not None:
+                products[alternative.barcode] = cached
+            else:
+                uncached.append(alternative.barcode)
+        if uncached:
+            result = await self.db.execute(select(Product).where(Product.barcode.in_(uncached)))
+            for found in result.scalars().all():
+                product_cache.set(found)
+                products[found.barcode] = found
+
+        return [
+            (products[alternative.barcode], alternative)
+            for alternative in alternatives
+            if alternative.barcode in products
+        ]
+
+    async def search_products(
         self, 
         query: str, 
         limit: int = 20, 
@@ -58,17 +220,84 @@ class ProductService:
             offset: Pagination offset
             
         Returns:
-            List of matching products
+            List of matching products, best match first
         """
-        statement = (
-            select(Product)
-            .where(
-                (Product.name.ilike(f"%{query}%")) | 
-                (Product.brand.ilike(f"%{query}%"))
+        statement, _ = build_search_statement(query)
+        statement = statement.offset(offset).limit(limit)
+        
+        result = await self.db.execute(statement)
+        return [product for product, _ in result.all()]
+
+    async def search_products_page(
+        self,
+        query: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Product], Optional[str]]:
+        """
+        Keyset-paginated search by name or brand
+
+        Args:
+            query: Search query
+            limit: Maximum results to return
+            cursor: Opaque cursor returned by the previous page, if any
+
+        Returns:
+            The matching products and the cursor for the next page
+            (None when there are no more results)
+        """
+        statement, rank = build_search_statement(query)
+        if cursor:
+            last_rank, last_barcode = _decode_search_cursor(cursor)
+            statement = statement.where(
+                (rank < last_rank) | ((rank == last_rank) & (Product.barcode > last_barcode))
             )
-            .offset(offset)
-            .limit(limit)
+        result = await self.db.execute(statement.limit(limit))
+        rows = result.all()
+
+        next_cursor = None
+        if len(rows) == limit:
+            last_product, last_rank = rows[-1]
+            next_cursor = _encode_search_cursor(last_rank, last_product.barcode)
+        return [product for product, _ in rows], next_cursor
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def build_search_statement(query: str):
+    """
+    Build the product search statement and its ranking expression.
+
+    Matching uses ILIKE '%q%', which the pg_trgm GIN indexes on product_name
+    and brand can serve. Results are ranked by trigram similarity with the
+    barcode as a tie-breaker, which gives a stable order for keyset paging.
+    """
+    pattern = f"%{_escape_like(query)}%"
+    rank = func.greatest(
+        func.similarity(Product.product_name, query),
+        func.coalesce(func.similarity(Product.brand, query), 0),
+    ).label("rank")
+    statement = (
+        select(Product, rank)
+        .where(
+            (Product.product_name.ilike(pattern)) |
+            (Product.brand.ilike(pattern))
         )
-        
-        products = self.db.exec(statement).all()
-        return list(products)
\ No newline at end of file
+        .order_by(rank.desc(), Product.barcode)
+    )
+    return statement, rank
+
+
+def _encode_search_cursor(rank: float, barcode: str) -> str:
+    raw = json.dumps([rank, barcode]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def _decode_search_cursor(cursor: str) -> Tuple[float, str]:
+    try:
+        rank, barcode = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(rank), str(barcode)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid search cursor: {cursor}") from e
@@ -0,0 +1,157 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Sequence, Set, Tuple, Union
+
+from models.product import Product
+from services.ingredient_matcher import IngredientMatcher, annotation, ingredient_matcher, with_detected_allergens
+
+# numpy is imported where it is used, so loading the app doesn't pay for it
+if TYPE_CHECKING:
+    import numpy as np
+
+ProductLike = Union[Product, Dict[str, Any]]
+
+BASE_SCORE = 100
+
+
+@dataclass(frozen=True)
+class NutrientRule:
+    """Awards points once a column reaches a threshold; the first matching tier wins."""
+    id: str
+    label: str
+    column: str
+    tiers: Tuple[Tuple[float, int], ...]  # (minimum value, points), highest threshold first
+
+
+@dataclass(frozen=True)
+class IngredientRule:
+    """Awards points once if the ingredient matcher finds the group."""
+    id: str
+    label: str
+    points: int
+    group: str  # trigger group in services/ingredient_matcher.py
+
+
+NUTRIENT_RULES: Tuple[NutrientRule, ...] = (
+    NutrientRule("high_sugar", "High sugar", "sugar_100g", ((22.5, -25), (5.0, -10))),
+    NutrientRule("saturated_fat", "Saturated fat", "saturated_fat_100g", ((5.0, -10), (1.5, -5))),
+    NutrientRule("high_sodium", "High sodium", "sodium_100g", ((0.6, -5),)),
+    NutrientRule("fiber", "Source of fiber", "fiber_100g", ((6.0, 10), (3.0, 5))),
+    NutrientRule("ultra_processed", "Processing level (NOVA)", "nova_group", ((4, -15), (3, -5))),
+)
+
+INGREDIENT_RULES: Tuple[IngredientRule, ...] = (
+    IngredientRule("dairy", "Contains dairy", -15, "dairy"),
+    IngredientRule("high_glycemic_sweetener", "High-glycemic sweetener", -10, "high_glycemic_sweetener"),
+    IngredientRule("omega_3", "Omega-3 source", 5, "omega_3"),
+)
+
+
+@dataclass(frozen=True)
+class SkinEvaluation:
+    """A product's score plus what the ingredient matcher found in it."""
+    skin_score: int
+    breakdown: List[Dict[str, Any]]
+    allergens: List[str]  # allergen groups, see ingredient_matcher.ALLERGEN_TAGS
+    skin_triggers: List[str]
+
+
+class SkinScoreEngine:
+    """
+    Computes skin_score and skin_score_breakdown for many products at once.
+
+    Nutrient rules are evaluated column-wise over NumPy arrays. Ingredient
+    matching is not vectorized: each ingredient list is scanned once by the
+    shared ingredient matcher in a Python loop, which dominates at large
+    batch sizes.
+    """
+
+    def __init__(
+        self,
+        nutrient_rules: Sequence[NutrientRule] = NUTRIENT_RULES,
+        ingredient_rules: Sequence[IngredientRule] = INGREDIENT_RULES,
+        matcher: IngredientMatcher = ingredient_matcher,
+    ):
+        self.nutrient_rules = tuple(nutrient_rules)
+        self.ingredient_rules = tuple(ingredient_rules)
+        self.rules = self.nutrient_rules + self.ingredient_rules
+        self.matcher = matcher
+        self._ingredient_points = [rule.points for rule in ingredient_rules]
+        self._group_to_rule = {rule.group: index for index, rule in enumerate(ingredient_rules)}
+
+    def evaluate(self, products: Sequence[ProductLike]) -> List[SkinEvaluation]:
+        """Score and annotate each product, in order, with one matcher pass per product."""
+        if not products:
+            return []
+        import numpy as np
+
+        ingredient_points, groups = self._ingredient_matrix(products)
+        points = np.concatenate([self._nutrient_points(products), ingredient_points], axis=1)
+        scores = np.clip(BASE_SCORE + points.sum(axis=1), 0, 100)
+
+        breakdowns: List[List[Dict[str, Any]]] = [[] for _ in products]
+        for row, column in zip(*np.nonzero(points)):
+            rule = self.rules[column]
+            breakdowns[row].append({"rule": rule.id, "label": rule.label, "points": int(points[row, column])})
+        return [
+            SkinEvaluation(int(score), breakdown, **annotation(product_groups))
+            for score, breakdown, product_groups in zip(scores, breakdowns, groups)
+        ]
+
+    def score_batch(self, products: Sequence[ProductLike]) -> List[Tuple[int, List[Dict[str, Any]]]]:
+        """Return (skin_score, skin_score_breakdown) for each product, in order."""
+        return [(evaluation.skin_score, evaluation.breakdown) for evaluation in self.evaluate(products)]
+
+    def apply(self, products: Sequence[Product]) -> None:
+        """Score products in place and add detected allergens to allergen_tags."""
+        for product, evaluation in zip(products, self.evaluate(products)):
+            product.skin_score = evaluation.skin_score
+            product.skin_score_breakdown = evaluation.breakdown
+            product.allergen_tags = with_detected_allergens(product.allergen_tags, evaluation.allergens)
+
+    def _nutrient_points(self, products: Sequence[ProductLike]) -> "np.ndarray":
+        import numpy as np
+
+        points = np.zeros((len(products), len(self.nutrient_rules)), dtype=np.int32)
+        for column, rule in enumerate(self.nutrient_rules):
+            # Missing values become NaN, which never passes a threshold
+            values = np.array(
+                [_field(product, rule.column) for product in products], dtype=np.float64
+            )
+            conditions = [values >= threshold for threshold, _ in rule.tiers]
+            choices = [tier_points for _, tier_points in rule.tiers]
+            points[:, column] = np.select(conditions, choices, default=0)
+        return points
+
+    def _ingredient_matrix(self, products: Sequence[ProductLike]) -> Tuple["np.ndarray", List[Set[str]]]:
+        """Ingredient rule points per product, and the trigger groups each one matched."""
+        import numpy as np
+
+        hits = np.zeros((len(products), len(self.ingredient_rules)), dtype=bool)
+        groups = []
+        for row, product in enumerate(products):
+            text, taxonomy_ids = ingredient_text(product)
+            product_groups = self.matcher.match_groups(text, taxonomy_ids)
+            for group in product_groups:
+                rule_index = self._group_to_rule.get(group)
+                if rule_index is not None:
+                    hits[row, rule_index] = True
+            groups.append(product_groups)
+        return hits * np.array(self._ingredient_points, dtype=np.int32), groups
+
+
+def _field(product: ProductLike, name: str) -> Any:
+    value = product.get(name) if isinstance(product, dict) else getattr(product, name, None)
+    return float("nan") if value is None else value
+
+
+def ingredient_text(product: ProductLike) -> Tuple[str, List[str]]:
+    """All ingredient texts of a product as one lowercase string, plus their taxonomy ids."""
+    ingredients = product.get("ingredient_list") if isinstance(product, dict) else product.ingredient_list
+    if not ingredients:
+        return "", []
+    text = " ; ".join(ingredient.get("text", "") for ingredient in ingredients).lower()
+    return text, [ingredient["id"] for ingredient in ingredients if "id" in ingredient]
+
+
+# Shared by the scan path and batch jobs
+skin_score_engine = SkinScoreEngine()
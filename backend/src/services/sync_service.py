@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
+from sqlmodel import select
+from sqlalchemy import delete, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from config.settings import settings
+from dtos.food_entry_response import FoodEntryResponse
+from dtos.user_favorite_response import UserFavoriteResponse
+from models.food_entry import FoodEntry
+from models.sync_tombstone import FOOD_ENTRY, USER_FAVORITE, SyncTombstone
+from models.user_favorites import UserFavorite
+import base64
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+TOMBSTONE = "deleted"
+
+# Sync stream kind -> (model, change time column, response DTO), in the
+# order a page is emitted. Deletes come last so a client never sees an
+# entity again after its tombstone within one page.
+SYNC_SOURCES = {
+    FOOD_ENTRY: (FoodEntry, FoodEntry.updated_at, FoodEntryResponse),
+    USER_FAVORITE: (UserFavorite, UserFavorite.updated_at, UserFavoriteResponse),
+    TOMBSTONE: (SyncTombstone, SyncTombstone.deleted_at, None),
+}
+
+# Cursor position per kind: [change time (ISO 8601), id] of the last row sent
+SyncPosition = Dict[str, List[Any]]
+
+
+class SyncService:
+    """
+    Delta sync of a user's food entries and favorites for offline clients.
+
+    The opaque cursor holds a (change time, id) keyset position per table.
+    Each call reads every table with one range scan on its
+    (user_id, updated_at, id) index past that position, streams the rows as
+    they arrive and ends with the next cursor. Deletes are delivered from
+    sync_tombstones.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def iter_changes(
+        self, user_id: str, position: Optional[SyncPosition], limit: int
+    ) -> AsyncIterator[Dict[str, Any]]:
+        now = datetime.now(timezone.utc)
+        horizon = now - timedelta(seconds=settings.sync_settle_seconds)
+
+        if position is None:
+            # Full sync: current rows only, deletes from here on
+            position = {TOMBSTONE: [horizon.isoformat(), 0]}
+        else:
+            tombstones_seen = datetime.fromisoformat(position[TOMBSTONE][0])
+            if tombstones_seen < _aware(now - timedelta(days=settings.sync_tombstone_retention_days), tombstones_seen):
+                # Deletes since then may have been pruned
+                yield {"type": "reset"}
+                return
+
+        has_more = False
+        for kind, (model, changed_at, response) in SYNC_SOURCES.items():
+            statement = select(model).where(model.user_id == user_id, changed_at < horizon)
+            after = position.get(kind)
+            if after is not None:
+                statement = statement.where(
+                    tuple_(changed_at, model.id) > tuple_(datetime.fromisoformat(after[0]), after[1])
+                )
+            statement = statement.order_by(changed_at, model.id).limit(limit + 1)
+
+            sent = 0
+            result = await self.db.stream_scalars(statement)
+            async for row in result:
+                if sent == limit:
+                    has_more = True
+                    break
+                sent += 1
+                row_changed_at = getattr(row, changed_at.key)
+                position[kind] = [row_changed_at.isoformat(), row.id]
+                if response is None:
+                    yield {"type": TOMBSTONE, "entity": row.entity, "id": row.entity_id}
+                else:
+                    yield {"type": kind, "data": response.model_validate(row).model_dump(mode="json")}
+            await result.close()
+
+            if kind == TOMBSTONE and sent < limit:
+                # Every delete before the horizon has been seen. Move up to it
+                # so a user who never deletes anything doesn't end up with an
+                # old position and a spurious reset.
+                position[TOMBSTONE] = [horizon.isoformat(), 0]
+
+        yield {"type": "cursor", "cursor": encode_sync_cursor(position), "has_more": has_more}
+
+    async def prune_tombstones(self) -> int:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=settings.sync_tombstone_retention_days)
+        result = await self.db.execute(delete(SyncTombstone).where(SyncTombstone.deleted_at < cutoff))
+        await self.db.commit()
+        return result.rowcount
+
+
+def _aware(value: datetime, like: datetime) -> datetime:
+    """Match value's tzinfo to `like`, since rows may come back naive."""
+    return value if like.tzinfo is not None else value.replace(tzinfo=None)
+
+
+def encode_sync_cursor(position: SyncPosition) -> str:
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_sync_cursor(cursor: str) -> SyncPosition:
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        for kind, (changed_at, row_id) in position.items():
+            if kind not in SYNC_SOURCES:
+                raise ValueError(kind)
+            datetime.fromisoformat(changed_at)
+            int(row_id)
+        if TOMBSTONE not in position:
+            raise ValueError(TOMBSTONE)
+        return position
+    except (ValueError, TypeError, AttributeError) as e:
+        raise ValueError(f"Invalid sync cursor: {cursor}") from e
@@ -0,0 +1,53 @@
+"""POST /auth/sync when a concurrent first sync wins the insert."""
+import asyncio
+from types import SimpleNamespace
+
+from routers.auth_router import sync_user
+
+
+class _Result:
+    def __init__(self, row):
+        self._row = row
+
+    def one_or_none(self):
+        return self._row
+
+    def one(self):
+        assert self._row is not None
+        return self._row
+
+
+class FakeSession:
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.statements = []
+        self.committed = False
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return _Result(self.rows.pop(0))
+
+    async def commit(self):
+        self.committed = True
+
+
+TOKEN = {"uid": "user-1", "email": "user@example.com", "name": "User"}
+ROW = SimpleNamespace(id="user-1", email="user@example.com", display_name="User", inserted=False)
+
+
+def test_existing_row_comes_back_from_the_upsert():
+    db = FakeSession([ROW])
+    response = asyncio.run(sync_user(decoded_token=TOKEN, db=db))
+    assert response["status"] == "exists"
+    assert len(db.statements) == 1 and db.committed
+
+
+def test_row_inserted_by_a_concurrent_sync_is_read_again():
+    # The upsert's own fallback SELECT can't see the other transaction's row
+    db = FakeSession([None, ROW])
+    response = asyncio.run(sync_user(decoded_token=TOKEN, db=db))
+    assert response == {
+        "status": "exists",
+        "user": {"id": "user-1", "email": "user@example.com", "display_name": "User"},
+    }
+    assert len(db.statements) == 2 and db.committed
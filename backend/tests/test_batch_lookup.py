@@ -0,0 +1,129 @@
+"""
+ProductService.iter_products_by_barcodes with OFF and the database faked:
+products fetched from OFF are saved before they are yielded, fetches are
+shared with single lookups, and a client leaving mid-stream doesn't lose
+the fetches already under way.
+"""
+import asyncio
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from services import product_service as product_service_module
+from services.clients.open_food_facts_client import OpenFoodFactsUnavailable
+from services.product_cache import product_cache
+from services.product_service import ProductService
+
+
+class FakeOFF:
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.calls = []
+
+    async def get_product(self, barcode: str):
+        self.calls.append(barcode)
+        await asyncio.sleep(self.delay)
+        if barcode.startswith("missing"):
+            return None
+        if barcode.startswith("down"):
+            raise OpenFoodFactsUnavailable("down")
+        return {"barcode": barcode, "product_name": f"Product {barcode}", "ingredient_list": []}
+
+
+class _EmptyResult:
+    def scalars(self):
+        return self
+
+    def all(self):
+        return []
+
+    def first(self):
+        return None
+
+
+class FakeSession:
+    """Finds nothing; records the barcode of every insert into events."""
+
+    def __init__(self, events):
+        self.events = events
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def execute(self, statement):
+        if statement.is_insert:
+            params = statement.compile(dialect=postgresql.dialect()).params
+            self.events.append(("insert", params["barcode"]))
+        return _EmptyResult()
+
+    async def commit(self):
+        pass
+
+
+@pytest.fixture
+def events(monkeypatch):
+    events = []
+    monkeypatch.setattr(product_service_module, "AsyncSessionLocal", lambda: FakeSession(events))
+    yield events
+    product_cache.clear()
+
+
+def make_service(events, off):
+    service = ProductService(FakeSession(events))
+    service.off_client = off
+    return service
+
+
+async def collect(service, barcodes, events):
+    results = {}
+    async for barcode, product in service.iter_products_by_barcodes(barcodes):
+        events.append(("yield", barcode))
+        results[barcode] = product
+    return results
+
+
+def test_products_are_saved_before_they_are_yielded(events):
+    off = FakeOFF()
+    barcodes = ["001", "missing-1", "002", "down-1"]
+    results = asyncio.run(collect(make_service(events, off), barcodes, events))
+
+    assert set(results) == set(barcodes)
+    assert results["001"].product_name == "Product 001"
+    assert results["missing-1"] is None and results["down-1"] is None
+    for barcode in ("001", "002"):
+        assert events.index(("insert", barcode)) < events.index(("yield", barcode))
+    # Real misses are remembered, outages are not
+    assert product_cache.is_known_missing("missing-1")
+    assert not product_cache.is_known_missing("down-1")
+    assert product_cache.get("002").barcode == "002"
+
+
+def test_batch_and_single_lookups_share_one_fetch(events):
+    off = FakeOFF()
+
+    async def main():
+        single = make_service(events, off).get_product_by_barcode("003")
+        batch = collect(make_service(events, off), ["003", "004"], events)
+        return await asyncio.gather(single, batch)
+
+    product, results = asyncio.run(main())
+    assert product.barcode == "003" and results["003"].barcode == "003"
+    assert sorted(off.calls) == ["003", "004"]
+    assert events.count(("insert", "003")) == 1
+
+
+def test_fetches_under_way_are_saved_when_the_client_leaves(events):
+    off = FakeOFF()
+
+    async def main():
+        stream = make_service(events, off).iter_products_by_barcodes(["005", "006", "007"])
+        await stream.__anext__()
+        # Client disconnects after the first product
+        await stream.aclose()
+        await asyncio.sleep(off.delay * 2)
+
+    asyncio.run(main())
+    assert sorted(barcode for kind, barcode in events if kind == "insert") == ["005", "006", "007"]
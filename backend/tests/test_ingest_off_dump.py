@@ -0,0 +1,83 @@
+"""
+Dump ingestion over the committed fixtures in tests/fixtures: reading both
+export formats, normalization and scoring, and --dry-run resume from a
+checkpoint. No database is involved.
+"""
+import asyncio
+import os
+
+import pytest
+
+from scripts.ingest_off_dump import _csv_ingredients, _save_checkpoint, ingest, iter_raw_products
+from services.clients.off_normalizer import normalize_product
+from services.skin_score_engine import skin_score_engine
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+JSONL_DUMP = os.path.join(FIXTURES, "off_dump.jsonl")
+CSV_DUMP = os.path.join(FIXTURES, "off_dump.csv.gz")
+
+
+def test_jsonl_dump_keeps_one_record_per_line():
+    raw_products = list(iter_raw_products(JSONL_DUMP))
+    # The malformed line still counts, so checkpoints line up with the file
+    assert len(raw_products) == 6
+    assert raw_products[2] == {}
+    assert [raw.get("code") for raw in raw_products] == [
+        "3017620422003", "5449000000996", None, None, "0041570054161", "8076809513753",
+    ]
+
+
+def test_csv_dump_is_reshaped_like_the_api():
+    raw = next(iter_raw_products(CSV_DUMP))
+    assert raw["code"] == "3017620422003"
+    assert raw["nutriments"]["sugars_100g"] == 56.3
+    assert "fiber_100g" not in raw["nutriments"]
+    assert raw["allergens_tags"] == ["en:milk", "en:nuts", "en:soybeans"]
+
+    row = normalize_product(raw)
+    assert row["barcode"] == "3017620422003"
+    assert row["brand"] == "Ferrero"
+    assert row["categories"] == ["spreads", "sweet spreads", "hazelnut spreads"]
+    assert row["ingredient_list"][3] == {"text": "skimmed milk powder (8.7%)"}
+
+
+@pytest.mark.parametrize("dump", [JSONL_DUMP, CSV_DUMP])
+def test_ingredient_rules_apply_to_both_formats(dump):
+    rows = [normalize_product(raw) for raw in iter_raw_products(dump)]
+    nutella = next(row for row in rows if row["barcode"] == "3017620422003")
+    evaluation = skin_score_engine.evaluate([nutella])[0]
+    rules = {entry["rule"] for entry in evaluation.breakdown}
+    assert {"dairy", "high_glycemic_sweetener"} <= rules
+    assert "dairy" in evaluation.allergens
+
+
+def test_csv_ingredients_split_only_at_the_top_level():
+    assert _csv_ingredients("Sugar, chocolate (cocoa, _milk_), salt; water") == [
+        {"text": "Sugar"}, {"text": "chocolate (cocoa, milk)"}, {"text": "salt"}, {"text": "water"},
+    ]
+    assert _csv_ingredients("") == []
+
+
+def test_dry_run_reads_the_whole_dump(tmp_path):
+    stats = asyncio.run(ingest(JSONL_DUMP, batch_size=2, checkpoint_path=str(tmp_path / "checkpoint.json"), dry_run=True))
+    assert (stats["records"], stats["written"], stats["skipped"]) == (6, 4, 2)
+    # Dry runs never write a checkpoint
+    assert not (tmp_path / "checkpoint.json").exists()
+
+
+@pytest.mark.parametrize("dump, resume_from, written, skipped", [
+    (JSONL_DUMP, 3, 2, 1),
+    (CSV_DUMP, 2, 2, 0),
+])
+def test_dry_run_resumes_after_the_checkpoint(tmp_path, dump, resume_from, written, skipped):
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    _save_checkpoint(checkpoint_path, dump, resume_from)
+    stats = asyncio.run(ingest(dump, batch_size=2, checkpoint_path=checkpoint_path, dry_run=True))
+    assert (stats["written"], stats["skipped"]) == (written, skipped)
+
+
+def test_checkpoint_of_another_dump_is_ignored(tmp_path):
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    _save_checkpoint(checkpoint_path, CSV_DUMP, 3)
+    stats = asyncio.run(ingest(JSONL_DUMP, checkpoint_path=checkpoint_path, dry_run=True))
+    assert stats["written"] == 4
@@ -0,0 +1,44 @@
+"""Who gets to read GET /metrics."""
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from config.settings import settings
+from routers.metrics_router import metrics_exposed, router
+
+
+def get_metrics(headers=None) -> httpx.Response:
+    app = FastAPI()
+    app.include_router(router)
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/metrics", headers=headers)
+
+    return asyncio.run(main())
+
+
+def test_deployments_serve_metrics_only_with_a_token(monkeypatch):
+    monkeypatch.setattr(settings, "metrics_token_required", True)
+    monkeypatch.setattr(settings, "metrics_token", "")
+    assert not metrics_exposed()
+    monkeypatch.setattr(settings, "metrics_token", "secret")
+    assert metrics_exposed()
+
+
+def test_local_runs_serve_metrics_without_a_token(monkeypatch):
+    monkeypatch.setattr(settings, "metrics_token_required", False)
+    monkeypatch.setattr(settings, "metrics_token", "")
+    assert metrics_exposed()
+    response = get_metrics()
+    assert response.status_code == 200
+    assert "skineats_product_cache" in response.text
+
+
+def test_token_is_checked_when_set(monkeypatch):
+    monkeypatch.setattr(settings, "metrics_token", "secret")
+    assert get_metrics().status_code == 401
+    assert get_metrics({"Authorization": "Bearer wrong"}).status_code == 401
+    assert get_metrics({"Authorization": "Bearer secret"}).status_code == 200
@@ -0,0 +1,41 @@
+"""normalize_product over the payload corpus in benchmarks/off_corpus."""
+import json
+import os
+
+import pytest
+
+from services.clients.off_normalizer import normalize_product
+
+CORPUS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "off_corpus")
+BARCODES = sorted({name.split(".", 1)[0] for name in os.listdir(CORPUS)})
+
+
+def load(barcode: str, kind: str) -> dict:
+    with open(os.path.join(CORPUS, f"{barcode}.{kind}.json")) as f:
+        return json.load(f)["product"]
+
+
+@pytest.mark.parametrize("barcode", BARCODES)
+def test_trimmed_payload_normalizes_like_the_full_one(barcode):
+    assert normalize_product(load(barcode, "trimmed"), barcode) == normalize_product(load(barcode, "full"), barcode)
+
+
+def test_scanned_barcode_wins_over_off_code():
+    # OFF answers a 12-digit UPC scan with the zero-padded EAN-13
+    raw = load("0041570054161", "trimmed")
+    assert normalize_product(raw, "041570054161")["barcode"] == "041570054161"
+
+
+def test_dump_records_fall_back_to_off_code():
+    assert normalize_product(load("0041570054161", "trimmed"))["barcode"] == "0041570054161"
+
+
+def test_normalized_columns():
+    row = normalize_product(load("3017620422003", "trimmed"), "3017620422003")
+    assert row["product_name"] == "Nutella"
+    assert row["brand"] == "Ferrero"
+    assert row["sugar_100g"] == 56.3
+    assert row["nova_group"] == 4
+    assert row["allergen_tags"] == ["milk", "nuts", "soybeans"]
+    assert row["ingredient_list"][0] == {"text": "sugar", "id": "en:sugar"}
+    assert len(row["categories"]) == 5
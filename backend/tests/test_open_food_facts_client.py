@@ -0,0 +1,141 @@
+"""
+OpenFoodFactsClient against benchmarks/fake_off_server.py running on a
+local port: misses, retries, refusals, hedging and the circuit breaker.
+Responses are scripted through FakeOFFState.script.
+"""
+import asyncio
+import os
+import socket
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from fake_off_server import BackgroundServer, FakeOFFState
+from services.clients.circuit_breaker import CircuitBreaker
+from services.clients.open_food_facts_client import OpenFoodFactsClient, OpenFoodFactsUnavailable
+
+BARCODE = "3017620422003"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="module")
+def server():
+    with BackgroundServer(FakeOFFState(seed=1), port=_free_port()) as server:
+        yield server
+
+
+@pytest.fixture
+def off(server):
+    server.state.script.clear()
+    server.state.stats["requests"] = 0
+    return server
+
+
+def run(off, calls, max_retries=2, hedge_after=0.0, failure_threshold=5):
+    """Run calls(client) on a fresh client pointed at the fake server."""
+
+    async def main():
+        client = OpenFoodFactsClient(base_url=off.url)
+        client.max_retries = max_retries
+        client.retry_backoff = 0.0
+        client.hedge_after = hedge_after
+        client.breaker = CircuitBreaker(failure_threshold=failure_threshold, reset_timeout=60.0)
+        try:
+            return client, await calls(client)
+        finally:
+            await client.close()
+
+    return asyncio.run(main())
+
+
+def test_found_product_is_normalized_under_the_scanned_barcode(off):
+    client, product = run(off, lambda client: client.get_product(BARCODE))
+    assert product["barcode"] == BARCODE
+    assert product["product_name"] == f"Test product {BARCODE}"
+    assert client.stats["requests"] == 1
+
+
+def test_404_is_a_miss(off):
+    client, product = run(off, lambda client: client.get_product("missing-1"))
+    assert product is None
+    assert client.breaker.failures == 0
+
+
+def test_transient_errors_are_retried(off):
+    off.state.script.extend([(503, 0), (429, 0), (200, 0)])
+    client, product = run(off, lambda client: client.get_product(BARCODE))
+    assert product["barcode"] == BARCODE
+    assert client.stats["retries"] == 2
+    assert off.state.stats["requests"] == 3
+
+
+def test_gives_up_after_max_retries(off):
+    off.state.script.extend([(503, 0)] * 3)
+    with pytest.raises(OpenFoodFactsUnavailable, match="503"):
+        run(off, lambda client: client.get_product(BARCODE), max_retries=2)
+    assert off.state.stats["requests"] == 3
+
+
+@pytest.mark.parametrize("status_code", [400, 401, 403])
+def test_other_4xx_are_errors_not_misses(off, status_code):
+    off.state.script.append((status_code, 0))
+    with pytest.raises(OpenFoodFactsUnavailable, match=str(status_code)):
+        run(off, lambda client: client.get_product(BARCODE))
+    # Not retried: the same request would be refused again
+    assert off.state.stats["requests"] == 1
+
+
+def test_slow_request_is_hedged(off):
+    off.state.script.extend([(200, 1000), (200, 0)])
+
+    async def timed(client):
+        started = asyncio.get_running_loop().time()
+        product = await client.get_product(BARCODE)
+        return product, asyncio.get_running_loop().time() - started
+
+    client, (product, elapsed) = run(off, timed, hedge_after=0.05)
+    assert product["barcode"] == BARCODE
+    assert client.stats["hedges"] == 1
+    assert elapsed < 0.5
+
+
+def test_hedge_succeeds_when_the_first_attempt_fails(off):
+    off.state.script.extend([(503, 100), (200, 100)])
+    client, product = run(off, lambda client: client.get_product(BARCODE), max_retries=0, hedge_after=0.05)
+    assert product["barcode"] == BARCODE
+    assert client.stats["hedges"] == 1
+
+
+def test_fast_request_is_not_hedged(off):
+    client, product = run(off, lambda client: client.get_product(BARCODE), hedge_after=0.5)
+    assert product is not None
+    assert client.stats["hedges"] == 0
+    assert off.state.stats["requests"] == 1
+
+
+def test_breaker_opens_after_repeated_failures(off):
+    off.state.script.extend([(503, 0)] * 2)
+
+    async def calls(client):
+        outcomes = []
+        for _ in range(3):
+            try:
+                await client.get_product(BARCODE)
+                outcomes.append("ok")
+            except OpenFoodFactsUnavailable as e:
+                outcomes.append(str(e))
+        return outcomes
+
+    client, outcomes = run(off, calls, max_retries=0, failure_threshold=2)
+    assert outcomes[:2] == ["OpenFoodFacts returned 503"] * 2
+    # The third call never reaches the server
+    assert outcomes[2] == "Circuit breaker is open"
+    assert off.state.stats["requests"] == 2
+    assert client.stats["rejected"] == 1
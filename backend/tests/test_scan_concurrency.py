@@ -0,0 +1,101 @@
+"""
+Concurrent scans must run in parallel, each on its own AsyncSession.
+
+Requests go through the real app with get_db replaced by fake sessions
+whose queries sleep, so serialized scans or a shared session show up as
+wall-clock time or as overlapping calls on one session.
+"""
+import asyncio
+import time
+
+import httpx
+
+from auth.auth import get_current_user
+from db.db import get_db
+from main import app
+from models.product import Product
+from services.product_cache import product_cache
+
+QUERY_SECONDS = 0.1
+SCANS = 20
+
+
+class _Result:
+    def __init__(self, product):
+        self._product = product
+
+    def scalars(self):
+        return self
+
+    def first(self):
+        return self._product
+
+
+class FakeSession:
+    """Answers every query with a product after QUERY_SECONDS."""
+
+    sessions = []
+
+    def __init__(self):
+        self.in_flight = 0
+        self.overlapped = False
+        self.queries = 0
+        FakeSession.sessions.append(self)
+
+    async def execute(self, statement):
+        self.in_flight += 1
+        # An AsyncSession can't run two statements at once
+        self.overlapped = self.overlapped or self.in_flight > 1
+        try:
+            await asyncio.sleep(QUERY_SECONDS)
+            self.queries += 1
+            barcode = statement.compile().params["barcode_1"]
+            return _Result(Product(barcode=barcode, product_name=f"Product {barcode}"))
+        finally:
+            self.in_flight -= 1
+
+    async def close(self):
+        pass
+
+
+async def _fake_db():
+    session = FakeSession()
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+async def _scan_all(barcodes):
+    """Scan every barcode at once; returns (responses, seconds taken)."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        # Warm up first so one-off import and setup costs aren't timed
+        await client.get("/products/warmup")
+        FakeSession.sessions.clear()
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(client.get(f"/products/{barcode}") for barcode in barcodes))
+        return responses, time.perf_counter() - started
+
+
+def test_concurrent_scans_run_in_parallel_on_separate_sessions():
+    barcodes = [f"{index:013d}" for index in range(SCANS)]
+    for barcode in barcodes + ["warmup"]:
+        product_cache.invalidate(barcode)
+    app.dependency_overrides[get_db] = _fake_db
+    app.dependency_overrides[get_current_user] = lambda: {"uid": "tester"}
+    try:
+        responses, elapsed = asyncio.run(_scan_all(barcodes))
+    finally:
+        app.dependency_overrides.clear()
+        for barcode in barcodes + ["warmup"]:
+            product_cache.invalidate(barcode)
+
+    assert [response.status_code for response in responses] == [200] * SCANS
+    assert [response.json()["barcode"] for response in responses] == barcodes
+    # One session per request, never used by two scans at once
+    assert len(FakeSession.sessions) == SCANS
+    assert all(session.queries == 1 for session in FakeSession.sessions)
+    assert not any(session.overlapped for session in FakeSession.sessions)
+    # Serialized scans would take SCANS * QUERY_SECONDS (2s)
+    assert elapsed < SCANS * QUERY_SECONDS / 4
@@ -0,0 +1,130 @@
+"""
+FirebaseTokenVerifier against a locally generated RSA key pair, served
+through the fetch_certs injection point instead of Google's cert endpoint.
+"""
+import asyncio
+import time
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from auth import token_verifier as token_verifier_module
+from auth.token_verifier import FirebaseTokenVerifier, TokenVerificationError
+
+PROJECT_ID = "skineats-test"
+KID = "test-key"
+
+_private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+_public_pem = _private_key.public_key().public_bytes(
+    serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+).decode()
+
+
+def make_token(kid: str = KID, **overrides) -> str:
+    now = int(time.time())
+    claims = {
+        "iss": f"https://securetoken.google.com/{PROJECT_ID}",
+        "aud": PROJECT_ID,
+        "sub": "user-1",
+        "iat": now,
+        "auth_time": now,
+        "exp": now + 3600,
+    }
+    claims.update(overrides)
+    return jwt.encode(claims, _private_key, algorithm="RS256", headers={"kid": kid})
+
+
+def make_verifier(**kwargs) -> FirebaseTokenVerifier:
+    fetches = []
+
+    async def fetch_certs():
+        fetches.append(time.time())
+        return {KID: _public_pem}, 3600.0
+
+    verifier = FirebaseTokenVerifier(PROJECT_ID, fetch_certs=fetch_certs, **kwargs)
+    verifier.fetches = fetches
+    return verifier
+
+
+def verify(verifier: FirebaseTokenVerifier, token: str):
+    return asyncio.run(verifier.verify(token))
+
+
+def test_valid_token():
+    verifier = make_verifier()
+    claims = verify(verifier, make_token())
+    assert claims["uid"] == "user-1"
+    assert claims["aud"] == PROJECT_ID
+    assert len(verifier.fetches) == 1
+
+
+def test_expired_token():
+    verifier = make_verifier(clock_skew=0)
+    now = int(time.time())
+    with pytest.raises(TokenVerificationError, match="Invalid ID token"):
+        verify(verifier, make_token(iat=now - 7200, auth_time=now - 7200, exp=now - 3600))
+
+
+def test_expired_token_within_clock_skew_is_accepted():
+    verifier = make_verifier(clock_skew=60)
+    assert verify(verifier, make_token(exp=int(time.time()) - 10))["uid"] == "user-1"
+
+
+@pytest.mark.parametrize("claims", [
+    {"aud": "some-other-project"},
+    {"iss": "https://securetoken.google.com/some-other-project"},
+    {"iss": "https://accounts.google.com"},
+])
+def test_wrong_audience_or_issuer(claims):
+    with pytest.raises(TokenVerificationError, match="Invalid ID token"):
+        verify(make_verifier(), make_token(**claims))
+
+
+def test_unknown_kid():
+    verifier = make_verifier()
+    with pytest.raises(TokenVerificationError, match="unknown key"):
+        verify(verifier, make_token(kid="rotated-away"))
+
+
+def test_token_signed_by_another_key():
+    other_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    now = int(time.time())
+    token = jwt.encode(
+        {
+            "iss": f"https://securetoken.google.com/{PROJECT_ID}", "aud": PROJECT_ID,
+            "sub": "user-1", "iat": now, "exp": now + 3600,
+        },
+        other_key, algorithm="RS256", headers={"kid": KID},
+    )
+    with pytest.raises(TokenVerificationError, match="Invalid ID token"):
+        verify(make_verifier(), token)
+
+
+def test_malformed_token():
+    with pytest.raises(TokenVerificationError, match="Malformed ID token"):
+        verify(make_verifier(), "not-a-jwt")
+
+
+def test_cached_claims_skip_signature_verification(monkeypatch):
+    verifier = make_verifier()
+    token = make_token()
+    verify(verifier, token)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("jwt.decode called for a cached token")
+
+    monkeypatch.setattr(token_verifier_module.jwt, "decode", fail)
+    assert verify(verifier, token)["uid"] == "user-1"
+    assert len(verifier.fetches) == 1
+
+
+def test_cached_claims_expire_with_the_token():
+    verifier = make_verifier(clock_skew=0)
+    token = make_token(exp=int(time.time()) + 1)
+    assert verify(verifier, token)["uid"] == "user-1"
+    time.sleep(1.5)
+    # Gone from the cache, so the token is verified again and rejected
+    with pytest.raises(TokenVerificationError, match="Invalid ID token"):
+        verify(verifier, token)